@@ -1,10 +1,11 @@
-from typing import TYPE_CHECKING, cast, Callable, Iterable
+from typing import TYPE_CHECKING, cast, Callable, Iterable, Sequence
 import discord
-from discord import app_commands, Role
+from discord import app_commands
 from discord.ext import commands
 
+from core.instrumentation.command_timing import begin_command, finish_command, timed_stage
 from domain.guild_state import GuildState
-from domain.types import GuildId
+from domain.types import GuildId, RoleId, ChannelId
 from managers.logic.command_access import ChannelScope, PermissionScope
 from services.guild_repository_service import GuildNotCachedError
 
@@ -12,6 +13,26 @@ if TYPE_CHECKING:
     from bot.pickupbot import PickupBot
 
 
+def member_role_ids(member: discord.Member | discord.User) -> Sequence[RoleId]:
+    """
+    Role ids of a member, @everyone excluded, users outside of a guild have none.
+        - The only access to discord.py's private sorted snowflake array, read without resolving Role objects
+        - discord.py is pinned, check_member_roles fails the startup should the attribute go away
+    """
+    if isinstance(member, discord.Member):
+        return member._roles
+
+    return ()
+
+
+def check_member_roles() -> None:
+    """Fails at startup if discord.py's Member no longer keeps its role ids where member_role_ids reads them."""
+    if '_roles' not in discord.Member.__slots__:
+        raise RuntimeError(
+            f'discord.py {discord.__version__} has no Member._roles, member_role_ids must be updated'
+        )
+
+
 class BaseCog(commands.Cog):
     """
     Base class for all cogs.
@@ -33,6 +54,23 @@ class BaseCog(commands.Cog):
 
         return state
 
+    async def interaction_check(self, interaction: discord.Interaction, /) -> bool:
+        # First hook of every slash command of the cog, runs before the checks
+        begin_command(interaction.command.qualified_name, 'slash', interaction.guild_id)
+        return True
+
+    async def cog_check(self, ctx: commands.Context) -> bool:
+        begin_command(
+            ctx.command.qualified_name, 'slash' if ctx.interaction else 'prefix', ctx.guild.id if ctx.guild else None
+        )
+        return True
+
+    async def cog_after_invoke(self, ctx: commands.Context) -> None:
+        finish_command(self.bot.metrics, outcome='ok')
+
+    async def cog_command_error(self, ctx: commands.Context, error: Exception) -> None:
+        finish_command(self.bot.metrics, outcome='error')
+
     @commands.Cog.listener()
     async def on_command_error(self, ctx: commands.Context, error: Exception):
         if isinstance(error, commands.CheckFailure):
@@ -41,6 +79,8 @@ class BaseCog(commands.Cog):
         raise error
 
     async def cog_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        finish_command(self.bot.metrics, outcome='error')
+
         if isinstance(error, app_commands.CheckFailure):
             if interaction.response.is_done():
                 await interaction.followup.send("Unauthorized or wrong channel.", ephemeral=True)
@@ -53,29 +93,21 @@ class BaseCog(commands.Cog):
             self,
             guild_id: GuildId,
             current_channel_id: int,
-            guild_member_roles: list[Role],
+            member: discord.Member,
             is_admin: bool,
             command_name: str
     ) -> bool:
-        perms = self.bot.managers.guild_state_manager.permissions
+        sm = self.bot.managers.guild_state_manager
 
-        if not perms.check_channel_scope(
-                required_scope=self.channel_scope,
+        with timed_stage('check'):
+            return sm.permissions.check_command_access(
                 guild_id=guild_id,
-                current_channel_id=current_channel_id
-        ):
-            return False
-
-        if not perms.check_permission_scope(
-            required_scope=self.permission_scope,
-            guild_id=guild_id,
-            role_ids=[role.id for role in guild_member_roles],
-            is_admin=is_admin,
-            command_name=command_name
-        ):
-            return False
-
-        return True
+                policy=sm.command_policy(command_name, self.channel_scope, self.permission_scope),
+                current_channel_id=ChannelId(current_channel_id),
+                member_id=member.id,
+                role_ids=member_role_ids(member),
+                is_admin=is_admin
+            )
 
     @classmethod
     def require_slash(cls):
@@ -101,7 +133,7 @@ class BaseCog(commands.Cog):
             return cog._check(
                 guild_id=GuildId(interaction.guild.id),
                 current_channel_id=interaction.channel.id,
-                guild_member_roles=interaction.user.roles,
+                member=interaction.user,
                 is_admin=interaction.user.guild_permissions.administrator,
                 command_name=command_name
             )
@@ -126,7 +158,7 @@ class BaseCog(commands.Cog):
             return cog._check(
                 guild_id=GuildId(ctx.guild.id),
                 current_channel_id=ctx.channel.id,
-                guild_member_roles=member.roles,
+                member=member,
                 is_admin=member.guild_permissions.administrator,
                 command_name=ctx.command.qualified_name if ctx.command else "unknown"
             )
@@ -157,6 +189,23 @@ class BaseCog(commands.Cog):
 
         return app_commands.autocomplete(**mapping)
 
+    @staticmethod
+    def autocomplete_history(
+            field_current_value: str,
+            field_prefix: str,
+            interaction: discord.Interaction
+    ) -> set[str]:
+        """Lowercase values already entered in the other numbered fields."""
+        passed_history_lc = {
+            str(value).lower()
+            for name, value in vars(interaction.namespace).items()
+            if name.startswith(field_prefix) and value is not None
+        }
+
+        passed_history_lc.discard(field_current_value.lower())
+
+        return passed_history_lc
+
     @staticmethod
     def build_autocomplete_candidates(
             field_current_value: str,
@@ -168,13 +217,12 @@ class BaseCog(commands.Cog):
         """Filters allowed_values by current input and excludes already entered values."""
         current_lc = field_current_value.lower()
 
-        passed_history_lc = {
-            str(value).lower()
-            for name, value in vars(interaction.namespace).items()
-            if name.startswith(field_prefix) and value is not None
-        }
+        passed_history_lc = BaseCog.autocomplete_history(
+            field_current_value=field_current_value,
+            field_prefix=field_prefix,
+            interaction=interaction
+        )
 
-        passed_history_lc.discard(field_current_value.lower())
         disallowed_lc = {v.lower() for v in disallowed_values} if disallowed_values else set()
 
         # Determine base candidate pool
@@ -213,7 +261,8 @@ class BaseCog(commands.Cog):
         return perm.has_command_permission(
             command_name=command_permission,
             guild_id=guild.id,
-            role_ids=[r.id for r in getattr(member, "roles", [])],
+            member_id=member.id,
+            role_ids=member_role_ids(member),
             is_admin=getattr(
                 getattr(member, "guild_permissions", None),
                 "administrator",
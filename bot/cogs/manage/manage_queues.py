@@ -1,18 +1,51 @@
+import logging
 import re
-from typing import TYPE_CHECKING, Callable, cast
+import tempfile
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Literal, cast
 
+import aiohttp
 import discord
 from discord import app_commands, InteractionResponse
 
-from bot.cogs.base_cog import BaseCog
+from bot.cogs.base_cog import BaseCog, member_role_ids
 from bot.ui.embeds.queues_config_embed_factory import QueuesConfigEmbedFactory
 from bot.ui.embeds.views.confirm_remove_queues import ConfirmRemoveQueuesView
+from domain.queue_constants import MAX_QUEUE_EXPIRY
+from domain.types import GuildId, RoleId
+from managers.logic import queue_transfer
+from managers.logic.queue_transfer import PermissionRow
 from managers.logic.command_access import ChannelScope, PermissionScope
 from managers.logic.queue_config import QueueCreationData, RemoveQueuesPlan
+from managers.queue_transfer_manager import ImportSourceError
 
 if TYPE_CHECKING:
     from bot.pickupbot import PickupBot
 
+logger = logging.getLogger(__name__)
+
+# Imports are streamed, the size limit only bounds the work of a single command
+MAX_IMPORT_BYTES = 8 * 2**20
+
+# Exports are kept in memory up to this size, larger ones spill to a temporary file
+EXPORT_SPOOL_BYTES = 2**20
+
+
+async def _attachment_lines(session: aiohttp.ClientSession, attachment: discord.Attachment) -> AsyncIterator[str]:
+    """
+    Lines of an attachment, streamed from the CDN without reading the whole file.
+        - Failed or timed out downloads and lines longer than the stream's buffer raise ImportSourceError
+    """
+    try:
+        async with session.get(attachment.url) as response:
+            response.raise_for_status()
+
+            async for line in response.content:
+                yield line.decode('utf-8-sig', errors='replace')
+    except (aiohttp.ClientError, TimeoutError, ValueError) as e:
+        # ValueError for lines longer than the stream's buffer
+        raise ImportSourceError(f'attachment {attachment.filename} could not be read') from e
+
+
 class ManageQueues(BaseCog):
     channel_scope = ChannelScope.PICKUP_LISTEN
     permission_scope = PermissionScope.GATED
@@ -72,8 +105,6 @@ class ManageQueues(BaseCog):
     @staticmethod
     def make_queue_name_autocomplete() -> Callable[[discord.Interaction, str], "discord.utils.MISSING"]:
         async def autocomplete(interaction: discord.Interaction, current: str):
-            current_lc = current.lower()
-
             if not BaseCog.has_autocomplete_permission(
                     interaction=interaction,
                     command_permission="manage_queues",
@@ -82,21 +113,116 @@ class ManageQueues(BaseCog):
 
             bot = cast('PickupBot', interaction.client)
             sm = bot.managers.guild_state_manager
-            state = sm.get_guild_state(interaction.guild.id)
 
-            candidates = BaseCog.build_autocomplete_candidates(
-                field_current_value=current,
-                field_prefix="queue_",
-                allowed_values={q.queue_config.name for q in state.queues.values()},
-                interaction=interaction,
+            candidates = sm.autocomplete.queue_names(
+                guild_id=interaction.guild.id,
+                current=current,
+                excluded_lc=BaseCog.autocomplete_history(
+                    field_current_value=current,
+                    field_prefix="queue_",
+                    interaction=interaction
+                )
             )
 
-            candidates.sort(key=lambda q: (not q.lower().startswith(current_lc), q.lower()))
-
-            return [app_commands.Choice(name=n, value=n) for n in candidates[:25]]
+            return [app_commands.Choice(name=n, value=n) for n in candidates]
 
         return autocomplete
 
+    @BaseCog.require_slash()
+    @manage_queues.command(name="expire", description="Remove players queued for longer than the given minutes, 0 disables it")
+    @app_commands.autocomplete(queue=make_queue_name_autocomplete())
+    async def set_queue_expiry(
+            self,
+            interaction: discord.Interaction,
+            queue: str,
+            minutes: app_commands.Range[int, 0, MAX_QUEUE_EXPIRY // 60]
+    ):
+        result = await self.bot.managers.guild_state_manager.queue_configs.set_queue_expiry(
+            guild_id=GuildId(interaction.guild.id),
+            queue_name=queue,
+            expire_after=minutes * 60 or None
+        )
+
+        await interaction.response.send_message(
+            embed=QueuesConfigEmbedFactory.set_queue_expiry(result),
+            ephemeral=True
+        )
+
+    @BaseCog.require_slash()
+    @manage_queues.command(name="export", description="Export queues and role permissions as a file")
+    async def export_queues(
+            self,
+            interaction: discord.Interaction,
+            file_format: Literal['csv', 'ndjson'] = 'csv'
+    ):
+        lines = self.bot.managers.queue_transfer_manager.export_lines(
+            guild_id=GuildId(interaction.guild.id),
+            transfer_format=file_format,
+            role_names={RoleId(role.id): role.name for role in interaction.guild.roles}
+        )
+
+        with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES) as fp:
+            for line in lines:
+                fp.write(line.encode())
+
+            fp.seek(0)
+
+            await interaction.response.send_message(
+                file=discord.File(fp, filename=f'queues-{interaction.guild.id}.{file_format}'),
+                ephemeral=True
+            )
+
+    @BaseCog.require_slash()
+    @manage_queues.command(name="import", description="Import queues and role permissions from a csv or ndjson export")
+    async def import_queues(
+            self,
+            interaction: discord.Interaction,
+            file: discord.Attachment
+    ):
+        transfer_format = queue_transfer.format_of(file.filename)
+
+        if transfer_format is None or file.size > MAX_IMPORT_BYTES:
+            return await interaction.response.send_message(
+                embed=QueuesConfigEmbedFactory.invalid_import_file(MAX_IMPORT_BYTES),
+                ephemeral=True
+            )
+
+        # Large files outlive the interaction response deadline
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        roles_by_id = {role.id: role for role in interaction.guild.roles}
+        roles_by_name = {role.name.lower(): role for role in interaction.guild.roles}
+
+        # Same check as the permission group, manage_queues alone must not grant permissions
+        allow_permissions = self.bot.managers.guild_state_manager.permissions.has_command_permission(
+            command_name='permission',
+            guild_id=interaction.guild.id,
+            member_id=interaction.user.id,
+            role_ids=member_role_ids(interaction.user),
+            is_admin=interaction.user.guild_permissions.administrator
+        )
+
+        # Role ids of another guild don't match, their names might
+        def resolve_role(row: PermissionRow) -> RoleId | None:
+            role = roles_by_id.get(row.role_id) or roles_by_name.get((row.role_name or '').lower())
+            return RoleId(role.id) if role is not None and not role.is_default() else None
+
+        result = await self.bot.managers.queue_transfer_manager.import_lines(
+            guild_id=GuildId(interaction.guild.id),
+            lines=_attachment_lines(self.bot.attachment_session, file),
+            transfer_format=transfer_format,
+            valid_command_names=self.bot.gated_commands,
+            resolve_role=resolve_role,
+            allow_permissions=allow_permissions
+        )
+
+        if result.incomplete:
+            embed = QueuesConfigEmbedFactory.import_download_failed(result)
+        else:
+            embed = QueuesConfigEmbedFactory.import_queues(result)
+
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
     @BaseCog.require_slash()
     @manage_queues.command(name="remove", description="Remove stored queues")
     @BaseCog.autocompletes_numbered(
@@ -131,13 +257,18 @@ class ManageQueues(BaseCog):
             queues=[q for q in queues if q is not None]
         )
 
-        print(result.to_remove)
-        print(result.invalid_queues)
+        logger.debug('queue removal previewed', extra={
+            'guild_id': interaction.guild_id,
+            'command': interaction.command.qualified_name,
+            'to_remove': result.to_remove,
+            'invalid_queues': result.invalid_queues
+        })
 
         view = ConfirmRemoveQueuesView(
             interaction=interaction,
             plan=result,
-            guild_state_manager=self.bot.managers.guild_state_manager
+            guild_state_manager=self.bot.managers.guild_state_manager,
+            prompt_lease_manager=self.bot.managers.prompt_lease_manager
         )
 
         await view.dialog()
\ No newline at end of file
@@ -3,7 +3,7 @@ from typing import TYPE_CHECKING, Callable, Literal, cast
 import discord
 from discord import app_commands, InteractionResponse
 
-from bot.cogs.base_cog import BaseCog
+from bot.cogs.base_cog import BaseCog, member_role_ids
 from bot.ui.embeds.permission_embed_factory import PermissionEmbedFactory
 from domain.types import GuildId, RoleId
 from managers.logic.command_access import ChannelScope, PermissionScope
@@ -47,18 +47,17 @@ class Permission(BaseCog):
             role_existing = {c.lower() for c in state.role_command_permissions.get(role.id, [])}
 
             if mode == "add":
-                valid_commands = bot.gated_commands
-
-                candidates = BaseCog.build_autocomplete_candidates(
-                    field_current_value=current,
-                    field_prefix='command_',
-                    interaction=interaction,
-                    allowed_values=valid_commands,
-                    disallowed_values=role_existing
+                candidates = sm.autocomplete.command_names(
+                    guild_id=interaction.guild_id,
+                    current=current,
+                    excluded_lc=role_existing | BaseCog.autocomplete_history(
+                        field_current_value=current,
+                        field_prefix='command_',
+                        interaction=interaction
+                    )
                 )
 
-                candidates.sort(key=lambda n: (not n.lower().startswith(current_lc), n.lower()))
-                return [app_commands.Choice(name=n, value=n) for n in candidates[:25]]
+                return [app_commands.Choice(name=n, value=n) for n in candidates]
 
             # Remove
             candidates = BaseCog.build_autocomplete_candidates(
@@ -176,7 +175,8 @@ class Permission(BaseCog):
         if not perm.has_command_permission(
             command_name=group.qualified_name.lower(),
             guild_id=interaction.guild.id,
-            role_ids=[role.id for role in interaction.user.roles],
+            member_id=interaction.user.id,
+            role_ids=member_role_ids(interaction.user),
             is_admin=interaction.user.guild_permissions.administrator
         ):
             return [app_commands.Choice(name='Unauthorized', value='Unauthorized')]
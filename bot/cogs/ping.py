@@ -15,13 +15,6 @@ class Ping(BaseCog):
     def __init__(self, bot: PickupBot):
         super().__init__(bot)
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot:
-            return
-
-        print(message.content)
-
     """
     @commands.command(name='ping')
     async def ping_prefix(self, ctx):
@@ -42,11 +35,22 @@ class Ping(BaseCog):
         elif mode in ('loud', 'lo'):
             await ctx.reply('PONG!', mention_author=False)
         elif mode in ('latency', 'lat', 'ms'):
-            ms = round(ctx.bot.latency * 1000)
+            shard = ctx.bot.get_shard(ctx.guild.shard_id) if ctx.guild else None
+            ms = round((shard.latency if shard else ctx.bot.latency) * 1000)
             await ctx.reply(f"pong ({ms} ms)", mention_author=False)
+        elif mode in ('shards', 'sh'):
+            guild_counts = self.bot.managers.guild_state_manager.shard_guild_counts()
+            lines = [
+                f'Shard {shard_id}: {round(latency * 1000)} ms, {guild_counts.get(shard_id, 0)} guilds'
+                for shard_id, latency in sorted(ctx.bot.latencies)
+            ]
+            await ctx.reply('\n'.join(lines) or 'No shards connected', mention_author=False)
+        elif mode in ('loop', 'lag'):
+            lag_ms = self.bot.loop_lag_sampler.last_lag * 1000
+            await ctx.reply(f'Event loop lag {lag_ms:.1f} ms', mention_author=False)
         else:
             await ctx.reply(
-                f'Unknown mode `{mode}`. Try: normal, loud, latency.',
+                f'Unknown mode `{mode}`. Try: normal, loud, latency, shards, loop.',
                 mention_author=False,
             )
 
@@ -60,6 +64,8 @@ class Ping(BaseCog):
             ('normal', 'normal'),
             ('loud', 'loud'),
             ('latency (ms)', 'latency'),
+            ('shards', 'shards'),
+            ('event loop lag', 'loop'),
         ]
 
         current_l = (current or '').lower()
@@ -0,0 +1,63 @@
+from typing import TYPE_CHECKING, Literal
+
+from discord import app_commands
+from discord.ext import commands
+
+from bot.cogs.base_cog import BaseCog
+from core.instrumentation.profiler import (
+    profile_cpu, profile_memory, ProfileAlreadyRunning, ProfilerUnavailable, MAX_PROFILE_SECONDS, DEFAULT_SAMPLE_INTERVAL
+)
+from managers.logic.command_access import ChannelScope, PermissionScope
+
+if TYPE_CHECKING:
+    from bot.pickupbot import PickupBot
+
+class Profiling(BaseCog):
+    channel_scope = ChannelScope.GLOBAL
+    permission_scope = PermissionScope.ADMIN
+
+    def __init__(self, bot: PickupBot):
+        super().__init__(bot)
+
+    @commands.hybrid_command(name='profile', description='Profile the bot process, cpu samples the event loop, memory traces allocations')
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.guild_only()
+    @commands.has_permissions(administrator=True)
+    @BaseCog.require_cmd()
+    async def profile(
+            self,
+            ctx: commands.Context,
+            mode: Literal['cpu', 'memory'] = 'cpu',
+            seconds: commands.Range[int, 1, MAX_PROFILE_SECONDS] = 10
+    ):
+        # Profiles outlive the interaction response deadline
+        await ctx.defer(ephemeral=True)
+
+        try:
+            if mode == 'cpu':
+                cpu = await profile_cpu(self.bot.profile_dir, seconds)
+                lines = [f'{share:>6.1%}  {function}' for function, share in cpu.top_functions]
+
+                summary = (
+                    f'CPU profile over {cpu.seconds} s, {cpu.samples} samples'
+                    f' ({cpu.samples * DEFAULT_SAMPLE_INTERVAL:.2f} s of CPU time)\n'
+                    f'Folded stacks: `{cpu.path}`'
+                )
+            else:
+                memory = await profile_memory(self.bot.profile_dir, seconds)
+                lines = [f'{size / 1024:>9.1f} KiB  {site}' for site, size in memory.top_allocations]
+
+                summary = (
+                    f'Memory profile over {memory.seconds} s, traced {memory.traced_bytes / 2**20:.1f} MiB,'
+                    f' peak {memory.peak_bytes / 2**20:.1f} MiB\n'
+                    f'Allocation report: `{memory.path}`'
+                )
+        except ProfileAlreadyRunning:
+            await ctx.send('A profile is already running, try again once it finished.', ephemeral=True)
+            return
+        except ProfilerUnavailable as e:
+            await ctx.send(f'CPU profiling is unavailable: {e}', ephemeral=True)
+            return
+
+        top = '\n'.join(lines) or 'No samples'
+        await ctx.send(f'{summary}\n```\n{top}\n```', ephemeral=True)
@@ -1,5 +1,5 @@
 from pyexpat.errors import messages
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, cast
 
 import discord
 from discord import app_commands, InteractionResponse
@@ -14,6 +14,29 @@ from managers.logic.command_access import ChannelScope, PermissionScope
 if TYPE_CHECKING:
     from bot.pickupbot import PickupBot
 
+async def joinable_queue_autocomplete(interaction: discord.Interaction, current: str):
+    bot = cast('PickupBot', interaction.client)
+    sm = bot.managers.guild_state_manager
+
+    candidates = sm.autocomplete.queue_names(
+        guild_id=interaction.guild.id,
+        current=current,
+        excluded_lc={name.lower() for name in sm.queue_players.queues_of(interaction.guild.id, interaction.user.id)}
+    )
+
+    return [app_commands.Choice(name=n, value=n) for n in candidates]
+
+async def joined_queue_autocomplete(interaction: discord.Interaction, current: str):
+    bot = cast('PickupBot', interaction.client)
+    sm = bot.managers.guild_state_manager
+    current_lc = current.lower()
+
+    # A member is in a handful of queues at most, no index needed
+    joined = sorted(name for name in sm.queue_players.queues_of(interaction.guild.id, interaction.user.id)
+                    if current_lc in name.lower())
+
+    return [app_commands.Choice(name=n, value=n) for n in joined[:sm.autocomplete.MAX_CHOICES]]
+
 # TODO: Allow additional filtering for future disabled queues; Display if rated
 
 class Queue(BaseCog):
@@ -66,4 +89,57 @@ class Queue(BaseCog):
 
     @commands.command(name='queues', description='List all queues')
     async def queue_list_command(self, ctx: commands.Context):
-        await self._queue_list_handler(ctx)
\ No newline at end of file
+        await self._queue_list_handler(ctx)
+
+    @BaseCog.require_slash()
+    @queue.command(name='join', description='Join a queue')
+    @app_commands.autocomplete(queue=joinable_queue_autocomplete)
+    async def queue_join_slash(self, interaction: discord.Interaction, queue: str):
+        result = self.bot.managers.guild_state_manager.queue_players.join_queue(
+            guild_id=GuildId(interaction.guild.id),
+            member_id=MemberId(interaction.user.id),
+            queue_name=queue
+        )
+
+        if not result.ok:
+            await interaction.response.send_message(result.error, ephemeral=True)
+            return
+
+        self.bot.on_queue_join(GuildId(interaction.guild.id), MemberId(interaction.user.id))
+
+        await interaction.response.send_message(
+            f'{interaction.user.mention} joined **{result.queue_name}** ({result.player_count}/{result.capacity})',
+            allowed_mentions=discord.AllowedMentions.none()
+        )
+
+    @BaseCog.require_slash()
+    @queue.command(name='leave', description='Leave a queue, or all queues if none is given')
+    @app_commands.autocomplete(queue=joined_queue_autocomplete)
+    async def queue_leave_slash(self, interaction: discord.Interaction, queue: str | None = None):
+        queue_players = self.bot.managers.guild_state_manager.queue_players
+        guild_id = GuildId(interaction.guild.id)
+        member_id = MemberId(interaction.user.id)
+
+        if queue is None:
+            left = queue_players.remove_players(guild_id=guild_id, member_ids=[member_id]).get(member_id)
+
+            if not left:
+                await interaction.response.send_message('Not in any queue.', ephemeral=True)
+                return
+
+            await interaction.response.send_message(
+                f'{interaction.user.mention} left {", ".join(f"**{name}**" for name in sorted(left))}',
+                allowed_mentions=discord.AllowedMentions.none()
+            )
+            return
+
+        result = queue_players.leave_queue(guild_id=guild_id, member_id=member_id, queue_name=queue)
+
+        if not result.ok:
+            await interaction.response.send_message(result.error, ephemeral=True)
+            return
+
+        await interaction.response.send_message(
+            f'{interaction.user.mention} left **{result.queue_name}** ({result.player_count}/{result.capacity})',
+            allowed_mentions=discord.AllowedMentions.none()
+        )
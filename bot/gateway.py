@@ -0,0 +1,35 @@
+from typing import Any
+
+import discord
+
+
+def gateway_options(lean: bool, presences: bool = True) -> dict[str, Any]:
+    """
+    Intents and cache options of the discord.py client.
+        - Full mode subscribes to members and presences and lets discord.py cache every member
+        - Lean mode only subscribes to what the bot consumes, no member chunking, member cache or message cache
+        - Presences are only needed for the away removal of queued players, consumed as raw events in both modes
+    """
+    if not lean:
+        intents = discord.Intents.default()
+        intents.members = True
+        intents.presences = True
+        intents.message_content = True
+
+        return {'intents': intents, 'enable_raw_presences': True}
+
+    intents = discord.Intents.none()
+    intents.guilds = True  # Guild, channel and role cache
+    intents.members = True  # Member removals, players leaving the guild are removed from queues
+    intents.guild_messages = True
+    intents.message_content = True  # Prefix commands
+    intents.presences = presences
+
+    return {
+        'intents': intents,
+        'enable_raw_presences': True,
+        'member_cache_flags': discord.MemberCacheFlags.none(),
+        'chunk_guilds_at_startup': False,
+        'max_messages': None
+    }
+
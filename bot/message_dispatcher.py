@@ -0,0 +1,93 @@
+import logging
+from typing import TYPE_CHECKING
+
+import discord
+
+from domain.types import GuildId, ChannelId, MemberId
+from managers.facades.queue_players import QueuePlayersResult
+from managers.logic.command_access import CHANNEL_PICKUP
+from managers.logic.queue_shortcuts import ShortcutPlan
+
+if TYPE_CHECKING:
+    from bot.pickupbot import PickupBot
+
+# First characters of queue shortcuts, +name joins and -name leaves a queue, ++ and -- every queue
+SHORTCUT_CHARS = '+-'
+
+logger = logging.getLogger(__name__)
+
+
+def _format_queues(results: list[QueuePlayersResult]) -> str:
+    return ', '.join(f'**{result.queue_name}** ({result.player_count}/{result.capacity})' for result in results)
+
+
+class MessageDispatcher:
+    """
+    Single entry point of every message, most messages are dropped after two dict lookups.
+        - Prefixed messages go to discord.py's command framework, commands check their channel scope themselves
+        - Other messages are only read in the pickup channel, +name / -name joins or leaves queues
+        - Shortcut messages are matched against a per guild token lookup, chat starting with + or - costs one dict lookup
+        - Routing is logged at DEBUG, sampled by LOG_SAMPLING, the message path never writes synchronously
+    """
+
+    def __init__(self, bot: PickupBot) -> None:
+        self._bot = bot
+
+        # Static prefixes are checked here, callable prefixes are left to the command framework
+        prefix = bot.command_prefix
+        self._prefixes: tuple[str, ...] | None = (
+            (prefix,) if isinstance(prefix, str) else tuple(prefix) if isinstance(prefix, (list, tuple)) else None
+        )
+
+    def _is_command(self, content: str) -> bool:
+        return self._prefixes is None or content.startswith(self._prefixes)
+
+    async def dispatch(self, message: discord.Message) -> None:
+        content = message.content
+
+        if not content or message.author.bot:
+            return
+
+        if message.guild is None:
+            if self._is_command(content):
+                await self._bot.process_commands(message)
+            return
+
+        guild_id = GuildId(message.guild.id)
+        channel_role = self._bot.managers.guild_state_manager.channel_role(guild_id, ChannelId(message.channel.id))
+
+        if self._is_command(content):
+            route = 'command'
+            await self._bot.process_commands(message)
+        elif channel_role & CHANNEL_PICKUP and content[0] in SHORTCUT_CHARS and (
+            plan := self._bot.managers.guild_state_manager.queue_players.parse_shortcuts(guild_id, content)
+        ) is not None:
+            route = 'shortcut'
+            await self._handle_queue_shortcuts(message, guild_id, plan)
+        else:
+            logger.debug('message ignored', extra={'guild_id': guild_id, 'channel_role': channel_role})
+            return
+
+        logger.debug('message routed', extra={'route': route, 'guild_id': guild_id})
+
+    async def _handle_queue_shortcuts(self, message: discord.Message, guild_id: GuildId, plan: ShortcutPlan) -> None:
+        """Applies the joins and leaves of a message at once and answers with a single line per outcome."""
+        result = await self._bot.managers.guild_state_manager.queue_players.apply_shortcuts(
+            guild_id=guild_id,
+            member_id=MemberId(message.author.id),
+            plan=plan
+        )
+
+        if result.joined:
+            self._bot.on_queue_join(guild_id, MemberId(message.author.id))
+
+        lines = [
+            f'{message.author.mention} {action} {_format_queues(results)}'
+            for action, results in (('left', result.left), ('joined', result.joined)) if results
+        ]
+        lines.extend(result.errors)
+
+        if not lines:
+            return
+
+        await message.channel.send('\n'.join(lines), allowed_mentions=discord.AllowedMentions.none())
@@ -1,51 +1,143 @@
+import asyncio
+import hashlib
+import json
+import logging
+from contextlib import nullcontext
 from typing import cast
 
+import aiohttp
 import discord
 from discord import Guild, app_commands
 from discord.ext import commands
 from sqlalchemy.ext.asyncio import AsyncEngine
 
-from bot.cogs.base_cog import BaseCog
+from bot.cogs.base_cog import BaseCog, check_member_roles, member_role_ids
 from bot.cogs.guild_configuration import GuildConfiguration
 from bot.cogs.manage.manage_queues import ManageQueues
 from bot.cogs.permission import Permission
 from bot.cogs.ping import Ping
+from bot.cogs.profiling import Profiling
 from bot.cogs.queue import Queue
+from bot.message_dispatcher import MessageDispatcher
 from core.dto.guild_info import GuildInfo
 from core.dto.manager_context import ManagerContext
-from db.init_tables import init_db
-from domain.types import GuildId
-from managers.logic.command_access import PermissionScope
+from core.instrumentation.command_timing import finish_command
+from core.instrumentation.exporter import MetricsServer
+from core.instrumentation.loop_lag import LoopLagSampler
+from core.instrumentation.metrics import Metrics
+from core.instrumentation.startup_timing import StartupTimer
+from db.init_tables import init_db, read_metadata, write_metadata
+from domain.types import GuildId, ShardId, MemberId
+from managers.logic.command_access import PermissionScope, ChannelScope
+from managers.queue_presence_manager import PresenceTickResult, QueueRemoval, RemovalReason
+from services.guild_repository_service import GuildNotCachedError
+
+logger = logging.getLogger(__name__)
 
 dev = True
+DEV_GUILD_ID = 1467241111402840299
+
+# Statuses counting as away for the automatic queue removal
+AWAY_STATUSES = frozenset((discord.Status.offline, discord.Status.idle))
+
+# Shown after the name of a player removed automatically
+REMOVAL_REASONS: dict[RemovalReason, str] = {
+    'away': 'offline or idle',
+    'left': 'left the server',
+    'expired': 'queue time expired',
+}
 
-class PickupBot(commands.Bot):
+class PickupBot(commands.AutoShardedBot):
     def __init__(self,
                  *,
                  manager_context: ManagerContext,
                  engine: AsyncEngine,
+                 metrics: Metrics,
+                 metrics_port: int | None = None,
+                 profile_dir: str = 'profiles',
+                 force_command_sync: bool = False,
+                 startup_timer: StartupTimer | None = None,
                  **kwargs):
+        check_member_roles()
         super().__init__(**kwargs)
         self._managers = manager_context
         self._engine = engine
+        self._metrics = metrics
+        self._loop_lag_sampler = LoopLagSampler(metrics)
+        self._metrics_server = MetricsServer(metrics, metrics_port) if metrics_port else None
+        self._profile_dir = profile_dir
+        self._force_command_sync = force_command_sync
+        self._startup_timer = startup_timer or StartupTimer()
         self._gated_commands: list[str] = []
+        self._ready_shards: set[int] = set()
+
+        # Removal announcements in flight, sent next to the presence and timer ticks instead of inside them
+        self._announcements: set[asyncio.Task] = set()
+
+        # Downloads of attachments, created on first use, traced like the client's own requests
+        self._attachment_session: aiohttp.ClientSession | None = None
+
+        self._message_dispatcher = MessageDispatcher(self)
 
     async def setup_hook(self) -> None:
+        timer = self._startup_timer
+        timer.mark('login')
+
+        await self.load_cogs()
+        timer.mark('load_cogs')
+
+        init_result = await init_db(self._engine, self._gated_commands)
+        timer.mark(
+            'init_db',
+            None if init_result.schema_initialized or init_result.permissions_seeded else 'skipped, up to date'
+        )
+
+        synced = await self.sync_command_tree()
+        timer.mark('command_sync', None if synced else 'skipped, unchanged')
+
+        await self._managers.guild_state_manager.start_invalidation()
+
+        self._managers.queue_presence_manager.start(on_tick=self._on_presence_tick)
+        self._managers.queue_expiry_manager.start(on_expired=self._on_queue_expiry)
+        self._managers.guild_purge_manager.start()
+        self._managers.timer_scheduler.start()
+        self._loop_lag_sampler.start()
+
+        if self._metrics_server is not None:
+            await self._metrics_server.start()
+
+        timer.mark('background_tasks')
+
+    async def sync_command_tree(self) -> bool:
+        """Syncs the command tree, skipped if it matches the tree this application synced last."""
+        guild = discord.Object(id=DEV_GUILD_ID) if dev else None
+
+        if guild is not None:
+            self.tree.copy_global_to(guild=guild)
+
+        # Same payload tree.sync uploads
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands(guild=guild)]
+        tree_hash = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+        key = f'command_tree:{self.application_id}:{guild.id if guild else "global"}'
+
+        if not self._force_command_sync and (await read_metadata(self._engine)).get(key) == tree_hash:
+            return False
+
+        await self.tree.sync(guild=guild)
+        await write_metadata(self._engine, {key: tree_hash})
+        return True
+
+    async def load_cogs(self) -> None:
+        """Adds the cogs and compiles command scopes and gated commands, needs no gateway connection."""
         await self.add_cog(Ping(self))
         await self.add_cog(GuildConfiguration(self))
         await self.add_cog(Permission(self))
         await self.add_cog(ManageQueues(self))
         await self.add_cog(Queue(self))
-
-        if dev:
-            DEV_GUILD_ID = 1467241111402840299
-            guild = discord.Object(id=DEV_GUILD_ID)
-            self.tree.copy_global_to(guild=guild)
-            await self.tree.sync(guild=guild)
-        else:
-            await self.tree.sync()
+        await self.add_cog(Profiling(self))
 
         gated_commands = set()
+        command_scopes: dict[str, tuple[ChannelScope, PermissionScope]] = {}
 
         # Store gated command names
         # Slash cmds
@@ -53,6 +145,8 @@ class PickupBot(commands.Bot):
             cog = cast(BaseCog, cog)
 
             for cmd in cog.walk_commands():
+                command_scopes[cmd.qualified_name] = (cog.channel_scope, cog.permission_scope)
+
                 if cog.permission_scope == PermissionScope.GATED:
                     gated_commands.add(cmd.qualified_name)
 
@@ -67,57 +161,207 @@ class PickupBot(commands.Bot):
 
             cog = cast(BaseCog, cog_obj)
 
-            if cog.permission_scope == PermissionScope.GATED:
-                root = cmd
+            root = cmd
+            parent = root.parent
+
+            while parent is not None:
+                root = parent
                 parent = root.parent
 
-                while parent is not None:
-                    root = parent
-                    parent = root.parent
+            command_scopes[root.name] = (cog.channel_scope, cog.permission_scope)
 
+            if cog.permission_scope == PermissionScope.GATED:
                 gated_commands.add(root.name)
 
         self._gated_commands = list(gated_commands)
-
-        await init_db(self._engine, self._gated_commands)
+        self._managers.guild_state_manager.set_gated_commands(self._gated_commands)
+        self._managers.guild_state_manager.set_command_scopes(command_scopes)
 
     async def on_ready(self) -> None:
-        print(f'Logged in as {self.user} (ID: {self.user.id})')
+        logger.info('logged in', extra={'user': str(self.user), 'user_id': self.user.id, 'shards': sorted(self.shards)})
 
-        await self._managers.guild_state_manager.register_guilds(
-            [GuildInfo(guild_id=GuildId(guild.id), name=guild.name) for guild in self.guilds]
-        )
+    async def on_shard_ready(self, shard_id: int) -> None:
+        timer = self._startup_timer
+        starting = timer.finished_at is None
+
+        if starting and not self._ready_shards:
+            timer.mark('gateway')
+
+        guilds = [
+            GuildInfo(guild_id=GuildId(guild.id), name=guild.name, shard_id=ShardId(shard_id))
+            for guild in self.guilds if guild.shard_id == shard_id
+        ]
 
-        guild = self._managers.guild_state_manager.get_guild_state(GuildId(1467241111402840299))
-        print(f'Guild: {guild.settings.prefix}')
+        # Hydrates all guilds of the shard at once, guilds rejoined while the bot was offline keep their data
+        with timer.stage(f'hydration shard {shard_id}') if starting else nullcontext():
+            await self._managers.guild_purge_manager.keep_guilds([guild.guild_id for guild in guilds])
+            await self._managers.guild_state_manager.register_guilds(guilds)
+
+        self._ready_shards.add(shard_id)
+
+        guild_count = self._managers.guild_state_manager.shard_guild_counts().get(ShardId(shard_id), 0)
+        logger.info('shard ready', extra={'shard_id': shard_id, 'guilds': guild_count})
+
+        if starting and self._ready_shards.issuperset(self.shards):
+            logger.info('startup finished', extra={'breakdown': timer.finish(self._metrics)})
 
     async def on_guild_available(self, guild: Guild) -> None:
+        # Dispatched for every guild before the shard is ready, covered by the bulk hydration in on_shard_ready
+        if guild.shard_id not in self._ready_shards:
+            return
+
         await self._managers.guild_state_manager.register_guild(
             GuildInfo(
                 guild_id=GuildId(guild.id),
-                name=guild.name
+                name=guild.name,
+                shard_id=ShardId(guild.shard_id)
             )
         )
 
     async def on_guild_join(self, guild: Guild) -> None:
+        await self._managers.guild_purge_manager.keep_guilds([GuildId(guild.id)])
         await self._managers.guild_state_manager.register_guild(
             GuildInfo(
                 guild_id=GuildId(guild.id),
-                name=guild.name)
+                name=guild.name,
+                shard_id=ShardId(guild.shard_id))
         )
 
+    async def on_message(self, message: discord.Message) -> None:
+        await self._message_dispatcher.dispatch(message)
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command) -> None:
+        finish_command(self._metrics, outcome='ok')
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member) -> None:
+        if member_role_ids(before) != member_role_ids(after):
+            self._managers.guild_state_manager.permissions.invalidate_member(
+                GuildId(after.guild.id),
+                MemberId(after.id)
+            )
+
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent) -> None:
+        self._managers.guild_state_manager.permissions.invalidate_member(
+            GuildId(payload.guild_id),
+            MemberId(payload.user.id)
+        )
+        self._managers.queue_presence_manager.on_member_remove(GuildId(payload.guild_id), MemberId(payload.user.id))
+
+    async def on_raw_presence_update(self, payload: discord.RawPresenceUpdateEvent) -> None:
+        # Raw events arrive without a cached member, repeated statuses of activity changes are no-ops
+        if payload.guild_id is None:
+            return
+
+        self._managers.queue_presence_manager.on_presence(
+            GuildId(payload.guild_id),
+            MemberId(payload.user_id),
+            payload.client_status.status in AWAY_STATUSES
+        )
+
+    def on_queue_join(self, guild_id: GuildId, member_id: MemberId) -> None:
+        """Seeds the away timeout of a member who joined a queue from their cached presence."""
+        # Lean mode caches no presences, the member counts as active until their next presence update
+        guild = self.get_guild(guild_id)
+        member = guild.get_member(member_id) if guild is not None else None
+
+        self._managers.queue_presence_manager.on_join(
+            guild_id,
+            member_id,
+            member is not None and member.status in AWAY_STATUSES
+        )
+
+    async def _on_presence_tick(self, result: PresenceTickResult) -> None:
+        self._metrics.observe('presence_tick_events', result.events)
+        self._spawn_announcements(result.removals)
+
+    async def _on_queue_expiry(self, removals: dict[GuildId, list[QueueRemoval]]) -> None:
+        self._spawn_announcements(removals)
+
+    def _spawn_announcements(self, removals: dict[GuildId, list[QueueRemoval]]) -> None:
+        for guild_id, guild_removals in removals.items():
+            task = asyncio.create_task(self._announce_queue_removals(guild_id, guild_removals))
+            self._announcements.add(task)
+            task.add_done_callback(self._on_announcement_done)
+
+    def _on_announcement_done(self, task: asyncio.Task) -> None:
+        self._announcements.discard(task)
+
+        if not task.cancelled() and task.exception() is not None:
+            logger.error('queue removal announcement failed', exc_info=task.exception())
+
+    async def _announce_queue_removals(self, guild_id: GuildId, removals: list[QueueRemoval]) -> None:
+        """One message per guild and tick in the pickup channel, removed players are mentioned without a ping."""
+        try:
+            state = self._managers.guild_state_manager.get_guild_state(guild_id)
+        except GuildNotCachedError:
+            return
+
+        channel_id = state.settings.pickup_channel_id
+        channel = self.get_channel(channel_id) if channel_id is not None else None
+
+        if not isinstance(channel, discord.abc.Messageable):
+            return
+
+        # Mentions render the member's name without fetching them
+        lines = [
+            f'<@{removal.member_id}> removed from {", ".join(sorted(removal.queue_names))} '
+            f'({REMOVAL_REASONS[removal.reason]})'
+            for removal in removals
+        ]
+
+        try:
+            await channel.send('\n'.join(lines), allowed_mentions=discord.AllowedMentions.none())
+        except discord.HTTPException:
+            pass
+
     async def on_guild_remove(self, guild: Guild) -> None:
-        await self._managers.guild_state_manager.evict_guild(GuildId(guild.id))
-        # TODO: Clear states in db
+        # Evicts the state right away, the stored data is deleted in the background after a grace period
+        await self._managers.guild_purge_manager.on_guild_remove(GuildId(guild.id))
 
     async def close(self) -> None:
+        self._loop_lag_sampler.stop()
+        self._managers.queue_presence_manager.stop()
+        self._managers.queue_expiry_manager.stop()
+        self._managers.guild_purge_manager.stop()
+        self._managers.timer_scheduler.stop()
+
+        for task in self._announcements:
+            task.cancel()
+
+        if self._metrics_server is not None:
+            await self._metrics_server.close()
+
+        if self._attachment_session is not None:
+            await self._attachment_session.close()
+
         await super().close()
+        await self._managers.guild_state_manager.close_invalidation()
         await self._engine.dispose()
 
     @property
     def managers(self):
         return self._managers
 
+    @property
+    def metrics(self) -> Metrics:
+        return self._metrics
+
+    @property
+    def loop_lag_sampler(self) -> LoopLagSampler:
+        return self._loop_lag_sampler
+
+    @property
+    def attachment_session(self) -> aiohttp.ClientSession:
+        if self._attachment_session is None or self._attachment_session.closed:
+            trace = self.http.http_trace
+            self._attachment_session = aiohttp.ClientSession(trace_configs=[trace] if trace is not None else None)
+
+        return self._attachment_session
+
+    @property
+    def profile_dir(self) -> str:
+        return self._profile_dir
+
     @property
     def gated_commands(self):
         return self._gated_commands
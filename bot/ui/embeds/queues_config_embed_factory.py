@@ -1,7 +1,8 @@
 import discord
 
 from domain.queue_constants import MAX_QUEUE_NAME_LENGTH
-from managers.facades.queue_configs import CreateQueuesResult
+from managers.facades.queue_configs import CreateQueuesResult, SetQueueExpiryResult
+from managers.queue_transfer_manager import ImportResult
 
 class QueuesConfigEmbedFactory:
     @staticmethod
@@ -59,6 +60,74 @@ class QueuesConfigEmbedFactory:
 
         return embed
 
+    @staticmethod
+    def set_queue_expiry(result: SetQueueExpiryResult) -> discord.Embed:
+        if not result.ok:
+            return discord.Embed(
+                title='Queue expiry failed',
+                color=discord.Color.red(),
+                description=result.error,
+            )
+
+        queue_config = result.queue_config
+
+        if queue_config.expire_after is None:
+            description = f'Players stay in **{queue_config.name}** until they leave.'
+        else:
+            description = (
+                f'Players are removed from **{queue_config.name}** '
+                f'after {queue_config.expire_after // 60} minutes in the queue.'
+            )
+
+        return discord.Embed(
+            title='Queue expiry',
+            color=discord.Color.green(),
+            description=description,
+        )
+
+    @staticmethod
+    def import_queues(result: ImportResult) -> discord.Embed:
+        embed = discord.Embed(
+            title='Queue import',
+            description=(
+                f'{result.rows} rows read, {result.queues_created} queues created, '
+                f'{result.permissions_added} role permissions added.'
+            ),
+            color=discord.Color.green() if not result.error_count else discord.Color.orange(),
+        )
+
+        if result.errors:
+            hidden = result.error_count - len(result.errors)
+
+            embed.add_field(
+                name=f'Skipped rows ({result.error_count})',
+                value='\n'.join(result.errors + ([f'... and {hidden} more'] if hidden else []))[:1024],
+                inline=False,
+            )
+
+        return embed
+
+    @staticmethod
+    def invalid_import_file(max_bytes: int) -> discord.Embed:
+        return discord.Embed(
+            title='Queue import failed',
+            color=discord.Color.red(),
+            description=f'Attach a .csv or .ndjson file of up to {max_bytes // 2**20} MiB, e.g. from /manage_queues export.',
+        )
+
+    @staticmethod
+    def import_download_failed(result: ImportResult) -> discord.Embed:
+        description = 'The file could not be downloaded to the end or has overlong lines, no queues were created.'
+
+        # Batches written before the failure stay, importing the file again skips what they added
+        if result.permissions_added:
+            description += (
+                f' {result.permissions_added} role permissions of the first {result.rows} rows were already added,'
+                f' importing the file again skips them.'
+            )
+
+        return discord.Embed(title='Queue import failed', color=discord.Color.red(), description=description)
+
     @staticmethod
     def no_valid_queues_provided():
         return discord.Embed(
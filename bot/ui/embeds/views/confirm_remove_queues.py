@@ -3,6 +3,7 @@ from discord import ui, Interaction
 
 from domain.types import GuildId
 from managers.guild_state_manager import GuildStateManager
+from managers.prompt_lease_manager import PromptLeaseManager, PromptLease
 from managers.logic.queue_config import RemoveQueuesPlan
 
 class ConfirmRemoveQueuesView(ui.View):
@@ -10,12 +11,15 @@ class ConfirmRemoveQueuesView(ui.View):
             self,
             interaction: Interaction,
             guild_state_manager: GuildStateManager,
+            prompt_lease_manager: PromptLeaseManager,
             plan: RemoveQueuesPlan,
     ):
         super().__init__(timeout=60)
         self.interaction = interaction
         self.facade = guild_state_manager.queue_configs
         self.guild_state_manager = guild_state_manager
+        self.prompt_lease_manager = prompt_lease_manager
+        self.prompt_lease: PromptLease | None = None
         self.plan = plan
         self.message: discord.InteractionMessage | None = None
 
@@ -70,18 +74,19 @@ class ConfirmRemoveQueuesView(ui.View):
     async def dialog(self) -> None:
         assert self.interaction.guild_id is not None
 
-        prompt_lease = self.guild_state_manager.try_acquire_prompt_lease(
+        self.prompt_lease = self.prompt_lease_manager.try_acquire(
             guild_id=GuildId(self.interaction.guild_id),
             prompt_type='QueueRemovalPrompt'
         )
 
-        if not prompt_lease:
+        if self.prompt_lease is None:
             await self.interaction.response.send_message(
                 'A queue removal prompt is already in progress.\nPlease wait until the operation is completed.',
                 ephemeral=True)
             return None
 
         if len(self.plan.to_remove) == 0:
+            self._release_prompt_lease()
             await self.interaction.response.send_message(embed=self._generate_no_removes_embed(), ephemeral=True)
             return None
 
@@ -105,10 +110,9 @@ class ConfirmRemoveQueuesView(ui.View):
         return None
 
     def _release_prompt_lease(self):
-        self.guild_state_manager.release_prompt_lease(
-            guild_id=GuildId(self.interaction.guild_id),
-            prompt_type='QueueRemovalPrompt'
-        )
+        if self.prompt_lease is not None:
+            self.prompt_lease_manager.release(self.prompt_lease)
+            self.prompt_lease = None
 
     async def on_timeout(self):
             await self.message.edit(
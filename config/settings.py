@@ -1,10 +1,25 @@
 from dataclasses import dataclass
+import logging
 import os
 
 @dataclass(frozen=True)
 class Settings:
     DISCORD_TOKEN: str
     DATABASE_URL: str
+    INVALIDATION_URL: str | None = None
+    SHARD_COUNT: int | None = None
+    SHARD_IDS: list[int] | None = None
+    METRICS_PORT: int | None = None
+    SLOW_QUERY_THRESHOLD_MS: int = 100
+    PROFILE_DIR: str = 'profiles'
+    FORCE_COMMAND_SYNC: bool = False
+    QUEUE_AWAY_TIMEOUT: int = 600
+    LEAN_GATEWAY: bool = False
+    GUILD_PURGE_GRACE_PERIOD: int = 7 * 24 * 3600
+    LOG_LEVEL: str = 'INFO'
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10_000
+    LOG_SAMPLING: str = ''
 
 def load_settings() -> Settings:
     """Load settings from environment variables."""
@@ -19,4 +34,63 @@ def load_settings() -> Settings:
     if token_db is None or len(token_db) == 0:
         raise RuntimeError('DATABASE_URL not set')
 
-    return Settings(token_dt, token_db)
\ No newline at end of file
+    # Only required when multiple bot processes share one database
+    invalidation_url = os.getenv("INVALIDATION_URL") or None
+
+    # Sharding, unset lets discord decide the shard count and runs all shards in this process
+    shard_count = os.getenv("SHARD_COUNT")
+    shard_ids = os.getenv("SHARD_IDS")
+
+    if shard_ids and not shard_count:
+        raise RuntimeError('SHARD_IDS requires SHARD_COUNT')
+
+    # Local Prometheus text endpoint, disabled when unset
+    metrics_port = os.getenv("METRICS_PORT")
+
+    # Statements slower than this are logged with their parameters
+    slow_query_threshold_ms = os.getenv("SLOW_QUERY_THRESHOLD_MS")
+
+    # Output of the admin profile command
+    profile_dir = os.getenv("PROFILE_DIR") or 'profiles'
+
+    # Command tree sync is skipped while the tree matches the last synced one, set to sync regardless
+    force_command_sync = os.getenv("FORCE_COMMAND_SYNC", "").lower() in ("1", "true", "yes")
+
+    # Seconds a queued player may stay offline or idle before being removed, 0 disables it
+    queue_away_timeout = os.getenv("QUEUE_AWAY_TIMEOUT")
+
+    # Minimal intents, no member chunking and no member or message cache
+    lean_gateway = os.getenv("LEAN_GATEWAY", "").lower() in ("1", "true", "yes")
+
+    # Seconds the data of a guild the bot was removed from is kept, a rejoin within it keeps the configuration
+    guild_purge_grace_period = os.getenv("GUILD_PURGE_GRACE_PERIOD")
+
+    # Records are written as JSON lines unless LOG_FORMAT=text, records beyond the queue size are dropped
+    log_level = (os.getenv("LOG_LEVEL") or 'INFO').upper()
+    log_json = os.getenv("LOG_FORMAT", "json").lower() != "text"
+    log_queue_size = os.getenv("LOG_QUEUE_SIZE")
+
+    if not isinstance(logging.getLevelName(log_level), int):
+        raise RuntimeError(f'Unknown LOG_LEVEL {log_level}')
+
+    # Per level sampling, e.g. "DEBUG=100,INFO=10" keeps one in 100 debug and one in 10 info records
+    log_sampling = os.getenv("LOG_SAMPLING") or ''
+
+    return Settings(
+        token_dt,
+        token_db,
+        invalidation_url,
+        int(shard_count) if shard_count else None,
+        [int(shard_id) for shard_id in shard_ids.split(',')] if shard_ids else None,
+        int(metrics_port) if metrics_port else None,
+        int(slow_query_threshold_ms) if slow_query_threshold_ms else 100,
+        profile_dir,
+        force_command_sync,
+        int(queue_away_timeout) if queue_away_timeout else 600,
+        lean_gateway,
+        int(guild_purge_grace_period) if guild_purge_grace_period else 7 * 24 * 3600,
+        log_level,
+        log_json,
+        int(log_queue_size) if log_queue_size else 10_000,
+        log_sampling
+    )
\ No newline at end of file
@@ -3,42 +3,91 @@ from dataclasses import dataclass
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 from core.dto.manager_context import ManagerContext
+from core.instrumentation.db_timing import StatementTiming, attach_db_timing
+from core.instrumentation.metrics import Metrics
 from core.service_context import ServiceContext
+from db.compile_cache_stats import CompileCacheStats
 from db.engine import get_async_engine
+from db.query_tracer import QueryTracer
 from db.session import init_sessionmaker
+from managers.guild_purge_manager import GuildPurgeManager
 from managers.guild_state_manager import GuildStateManager
+from managers.prompt_lease_manager import PromptLeaseManager
 from managers.queue_config_manager import QueueConfigManager
+from managers.queue_expiry_manager import QueueExpiryManager
+from managers.queue_presence_manager import QueuePresenceManager
+from managers.queue_transfer_manager import QueueTransferManager
+from managers.timer_scheduler import TimerScheduler
+from services.guild_purge_service import GuildPurgeService
 from services.guild_queue_service import GuildQueueService
 from services.guild_repository_service import GuildRepositoryService
+from services.invalidation_channel import create_invalidation_channel
 
 @dataclass(frozen=True)
 class AppContext:
     engine: AsyncEngine
+    compile_cache_stats: CompileCacheStats
+    metrics: Metrics
+    query_tracer: QueryTracer
     service_context: ServiceContext
     manager_context: ManagerContext
 
-def setup(db_url: str) -> AppContext:
-    # DB
-    engine = get_async_engine(db_url)
+def setup(
+        db_url: str,
+        invalidation_url: str | None = None,
+        slow_query_threshold: float = 0.1,
+        queue_away_timeout: float = 600,
+        guild_purge_grace_period: float = 7 * 24 * 3600
+) -> AppContext:
+    # Instrumentation
+    metrics = Metrics()
+    query_tracer = QueryTracer(slow_query_threshold=slow_query_threshold)
+    compile_cache_stats = CompileCacheStats()
+
+    # DB, one set of cursor listeners feeds every statement observer
+    engine = get_async_engine(db_url, (query_tracer, StatementTiming(metrics), compile_cache_stats))
     sessionmaker = init_sessionmaker(engine)
+    attach_db_timing(engine, metrics)
 
     # Services
     guild_repository_service = GuildRepositoryService(sessionmaker=sessionmaker)
     guild_queue_service = GuildQueueService(sessionmaker=sessionmaker)
+    guild_purge_service = GuildPurgeService(sessionmaker=sessionmaker)
 
-    # Managers
-    guild_state_manager = GuildStateManager(guild_repository_service, guild_queue_service)
+    # Managers, timers of every manager share one scheduler
+    timer_scheduler = TimerScheduler()
+    invalidation_channel = create_invalidation_channel(invalidation_url, engine)
+    guild_state_manager = GuildStateManager(
+        guild_repository_service, guild_queue_service, invalidation_channel, timer_scheduler
+    )
     queue_config_manager = QueueConfigManager(guild_queue_service, guild_state_manager)
+    queue_presence_manager = QueuePresenceManager(guild_state_manager, away_timeout=queue_away_timeout)
+    prompt_lease_manager = PromptLeaseManager(timer_scheduler)
+    queue_expiry_manager = QueueExpiryManager(guild_state_manager, timer_scheduler)
+    queue_transfer_manager = QueueTransferManager(guild_state_manager)
+    guild_purge_manager = GuildPurgeManager(
+        guild_state_manager, guild_purge_service, grace_period=guild_purge_grace_period
+    )
 
     return AppContext(
         engine=engine,
+        compile_cache_stats=compile_cache_stats,
+        metrics=metrics,
+        query_tracer=query_tracer,
         service_context=ServiceContext(
             guild_repository_service=guild_repository_service,
             guild_queue_service=guild_queue_service,
+            guild_purge_service=guild_purge_service,
         ),
         manager_context=ManagerContext(
             guild_state_manager=guild_state_manager,
             queue_config_manager=queue_config_manager,
+            queue_presence_manager=queue_presence_manager,
+            guild_purge_manager=guild_purge_manager,
+            timer_scheduler=timer_scheduler,
+            prompt_lease_manager=prompt_lease_manager,
+            queue_expiry_manager=queue_expiry_manager,
+            queue_transfer_manager=queue_transfer_manager,
         )
     )
 
@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 
-from domain.types import GuildId
+from domain.types import GuildId, ShardId
 
 
 @dataclass(frozen=True)
 class GuildInfo:
     guild_id: GuildId
-    name: str
\ No newline at end of file
+    name: str
+    shard_id: ShardId | None = None
\ No newline at end of file
@@ -0,0 +1,27 @@
+import json
+from dataclasses import dataclass, asdict
+
+from domain.guild_state import GuildStateField
+from domain.types import GuildId
+
+
+@dataclass(frozen=True)
+class InvalidationEvent:
+    guild_id: GuildId
+    field: GuildStateField
+    version: int
+    origin: str
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, payload: str | bytes) -> InvalidationEvent:
+        data = json.loads(payload)
+
+        return cls(
+            guild_id=GuildId(data['guild_id']),
+            field=data['field'],
+            version=data['version'],
+            origin=data['origin']
+        )
@@ -1,9 +1,21 @@
 from dataclasses import dataclass
 
+from managers.guild_purge_manager import GuildPurgeManager
 from managers.guild_state_manager import GuildStateManager
+from managers.prompt_lease_manager import PromptLeaseManager
 from managers.queue_config_manager import QueueConfigManager
+from managers.queue_expiry_manager import QueueExpiryManager
+from managers.queue_presence_manager import QueuePresenceManager
+from managers.queue_transfer_manager import QueueTransferManager
+from managers.timer_scheduler import TimerScheduler
 
 @dataclass
 class ManagerContext:
     guild_state_manager: GuildStateManager
-    queue_config_manager: QueueConfigManager
\ No newline at end of file
+    queue_config_manager: QueueConfigManager
+    queue_presence_manager: QueuePresenceManager
+    guild_purge_manager: GuildPurgeManager
+    timer_scheduler: TimerScheduler
+    prompt_lease_manager: PromptLeaseManager
+    queue_expiry_manager: QueueExpiryManager
+    queue_transfer_manager: QueueTransferManager
\ No newline at end of file
@@ -0,0 +1,6 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class PurgeChunkResult:
+    deleted: int
+    done: bool  # Guild fully purged, or its purge was cancelled
@@ -5,4 +5,5 @@ from dataclasses import dataclass
 class QueueConfig:
     name: str
     player_count: int
-    team_count: int
\ No newline at end of file
+    team_count: int
+    expire_after: int | None = None  # Seconds until queued players are removed, None never
\ No newline at end of file
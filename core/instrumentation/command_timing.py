@@ -0,0 +1,94 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Literal, TypeAlias
+
+from core.instrumentation.metrics import Metrics
+
+CommandPath: TypeAlias = Literal['prefix', 'slash']
+MeasuredStage: TypeAlias = Literal['check', 'db', 'response']
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass()
+class CommandTiming:
+    """Wall time of one command invocation, split by stage."""
+    command: str
+    path: CommandPath
+    guild_id: int | None = None
+    started_at: float = field(default_factory=time.perf_counter)
+    check: float = 0.0
+    db: float = 0.0
+    response: float = 0.0
+    finished: bool = False
+
+
+# Set per invocation, asyncio tasks and SQLAlchemy's greenlets inherit it
+_current: ContextVar[CommandTiming | None] = ContextVar('command_timing', default=None)
+
+
+def begin_command(command: str, path: CommandPath, guild_id: int | None = None) -> CommandTiming:
+    """Starts timing a command, an invocation already being timed is kept."""
+    timing = _current.get()
+
+    if timing is None or timing.finished:
+        timing = CommandTiming(command=command, path=path, guild_id=guild_id)
+        _current.set(timing)
+
+    return timing
+
+
+def add_stage_time(stage: MeasuredStage, seconds: float) -> None:
+    timing = _current.get()
+
+    if timing is not None and not timing.finished:
+        setattr(timing, stage, getattr(timing, stage) + seconds)
+
+
+@contextmanager
+def timed_stage(stage: MeasuredStage) -> Iterator[None]:
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        add_stage_time(stage, time.perf_counter() - start)
+
+
+def finish_command(metrics: Metrics, outcome: Literal['ok', 'error']) -> None:
+    """
+    Records the current invocation, later calls for the same invocation are ignored.
+        - manager is the remaining time, the command body and state manager without DB and Discord calls
+        - Every invocation is logged at INFO with its guild, command and latency, sample INFO on busy processes
+    """
+    timing = _current.get()
+
+    if timing is None or timing.finished:
+        return
+
+    timing.finished = True
+    total = time.perf_counter() - timing.started_at
+
+    stages = {
+        'check': timing.check,
+        'db': timing.db,
+        'response': timing.response,
+        'manager': max(total - timing.check - timing.db - timing.response, 0.0),
+    }
+
+    metrics.observe('command_duration_seconds', total, command=timing.command, path=timing.path, outcome=outcome)
+
+    for stage, seconds in stages.items():
+        metrics.observe('command_stage_seconds', seconds, command=timing.command, path=timing.path, stage=stage)
+
+    logger.info('command finished', extra={
+        'guild_id': timing.guild_id,
+        'command': timing.command,
+        'path': timing.path,
+        'outcome': outcome,
+        'latency_ms': round(total * 1000, 2),
+        'db_ms': round(timing.db * 1000, 2)
+    })
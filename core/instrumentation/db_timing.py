@@ -0,0 +1,52 @@
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.instrumentation.command_timing import add_stage_time
+from core.instrumentation.metrics import Metrics
+
+
+class StatementTiming:
+    """Cursor observer recording statement durations, statement time is added to the running command."""
+
+    def __init__(self, metrics: Metrics) -> None:
+        self._metrics = metrics
+        metrics.describe('db_statement_seconds', 'Cursor execution time per statement')
+
+    def on_statement(
+            self,
+            statement: str,
+            parameters: Any,
+            context: ExecutionContext | None,
+            elapsed: float
+    ) -> None:
+        self._metrics.observe('db_statement_seconds', elapsed)
+        add_stage_time('db', elapsed)
+
+
+def attach_db_timing(engine: AsyncEngine, metrics: Metrics) -> None:
+    """Records transaction durations, statements are timed by StatementTiming."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, 'begin')
+    def _begin(conn) -> None:
+        conn.info['transaction_started_at'] = time.perf_counter()
+
+    @event.listens_for(sync_engine, 'commit')
+    def _commit(conn) -> None:
+        _end_transaction(conn, 'commit')
+
+    @event.listens_for(sync_engine, 'rollback')
+    def _rollback(conn) -> None:
+        _end_transaction(conn, 'rollback')
+
+    def _end_transaction(conn, outcome: str) -> None:
+        started_at = conn.info.pop('transaction_started_at', None)
+
+        if started_at is not None:
+            metrics.observe('db_transaction_seconds', time.perf_counter() - started_at, outcome=outcome)
+
+    metrics.describe('db_transaction_seconds', 'Time from BEGIN to COMMIT or ROLLBACK')
@@ -0,0 +1,40 @@
+import asyncio
+
+from core.instrumentation.metrics import Metrics
+
+
+class MetricsServer:
+    """Serves the metrics in the Prometheus text format on every path, meant for localhost scraping."""
+
+    def __init__(self, metrics: Metrics, port: int, host: str = '127.0.0.1') -> None:
+        self._metrics = metrics
+        self._host = host
+        self._port = port
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, host=self._host, port=self._port)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            # Request line and headers are ignored
+            while await reader.readline() not in (b'\r\n', b'\n', b''):
+                pass
+
+            body = self._metrics.render().encode()
+
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Type: text/plain; version=0.0.4\r\n'
+                + f'Content-Length: {len(body)}\r\n'.encode()
+                + b'Connection: close\r\n\r\n'
+                + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
@@ -0,0 +1,34 @@
+import time
+
+import aiohttp
+
+from core.instrumentation.command_timing import add_stage_time
+from core.instrumentation.metrics import Metrics
+
+
+def create_http_trace(metrics: Metrics) -> aiohttp.TraceConfig:
+    """Times Discord REST calls, including interaction responses, for the client's http_trace."""
+    trace = aiohttp.TraceConfig()
+
+    async def on_request_start(session, trace_config_ctx, params) -> None:
+        trace_config_ctx.started_at = time.perf_counter()
+
+    async def on_request_end(session, trace_config_ctx, params) -> None:
+        _record(trace_config_ctx, params.method, str(params.response.status))
+
+    async def on_request_exception(session, trace_config_ctx, params) -> None:
+        _record(trace_config_ctx, params.method, 'exception')
+
+    def _record(trace_config_ctx, method: str, status: str) -> None:
+        elapsed = time.perf_counter() - trace_config_ctx.started_at
+
+        metrics.observe('discord_request_seconds', elapsed, method=method, status=status)
+        add_stage_time('response', elapsed)
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_request_end.append(on_request_end)
+    trace.on_request_exception.append(on_request_exception)
+
+    metrics.describe('discord_request_seconds', 'Discord REST request time')
+
+    return trace
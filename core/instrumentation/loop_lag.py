@@ -0,0 +1,32 @@
+import asyncio
+
+from core.instrumentation.metrics import Metrics
+
+
+class LoopLagSampler:
+    """Measures how late the event loop wakes up a sleeping task, blocking code shows up as lag."""
+
+    def __init__(self, metrics: Metrics, interval: float = 0.25) -> None:
+        self._metrics = metrics
+        self._interval = interval
+        self._task: asyncio.Task | None = None
+        self.last_lag = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            scheduled_at = loop.time() + self._interval
+            await asyncio.sleep(self._interval)
+
+            self.last_lag = max(loop.time() - scheduled_at, 0.0)
+            self._metrics.observe('event_loop_lag_seconds', self.last_lag)
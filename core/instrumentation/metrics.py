@@ -0,0 +1,78 @@
+from bisect import bisect_left
+
+Labels = tuple[tuple[str, str], ...]
+
+# Seconds, from sub millisecond cache hits up to Discord's interaction deadline
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    """Bucketed distribution of observed values, buckets are upper bounds."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)  # Last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Registry of labelled histograms, rendered in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._descriptions: dict[str, str] = {}
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+
+    def describe(self, name: str, description: str) -> None:
+        self._descriptions[name] = description
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        series = self._histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+
+        histogram = series.get(key)
+
+        if histogram is None:
+            histogram = series[key] = Histogram()
+
+        histogram.observe(value)
+
+    def histograms(self, name: str) -> dict[Labels, Histogram]:
+        return self._histograms.get(name, {})
+
+    def render(self) -> str:
+        lines: list[str] = []
+
+        for name, series in sorted(self._histograms.items()):
+            if name in self._descriptions:
+                lines.append(f'# HELP {name} {self._descriptions[name]}')
+
+            lines.append(f'# TYPE {name} histogram')
+
+            for labels, histogram in sorted(series.items()):
+                cumulative = 0
+
+                for bound, count in zip((*histogram.buckets, '+Inf'), histogram.bucket_counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels((*labels, ("le", str(bound))))} {cumulative}')
+
+                lines.append(f'{name}_sum{_format_labels(labels)} {histogram.sum}')
+                lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
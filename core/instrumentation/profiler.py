@@ -0,0 +1,208 @@
+import asyncio
+import os
+import signal
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass
+from types import CodeType, FrameType
+from typing import Callable
+
+# 200 Hz of CPU time, a stack walk per sample keeps the overhead well below one percent
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Upper bound of a single profile, keeps a forgotten profile from running for hours
+MAX_PROFILE_SECONDS = 120
+
+_profile_lock = asyncio.Lock()
+
+
+class ProfileAlreadyRunning(RuntimeError):
+    pass
+
+
+class ProfilerUnavailable(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class CpuProfileSummary:
+    path: str
+    samples: int
+    seconds: float
+    top_functions: list[tuple[str, float]]  # Function, share of samples it was running in
+
+
+@dataclass(frozen=True)
+class MemoryProfileSummary:
+    path: str
+    seconds: float
+    traced_bytes: int
+    peak_bytes: int
+    top_allocations: list[tuple[str, int]]  # File:line, bytes allocated during the profile
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler of the main thread, the event loop thread of the bot, driven by a SIGPROF interval timer.
+        - The signal handler runs between bytecodes of the interrupted code and records its exact stack
+        - ITIMER_PROF counts process CPU time, time idling in select() is not sampled
+        - Folded stacks are root first and ';' separated, the input format of flamegraph.pl and speedscope
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+        self._interval = interval
+        self._previous_handler: signal.Handlers | Callable | int | None = None
+        self._labels: dict[CodeType, str] = {}
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._running = False
+
+    def start(self) -> None:
+        if not hasattr(signal, 'setitimer'):
+            raise ProfilerUnavailable('Interval timers are not supported on this platform')
+
+        if threading.current_thread() is not threading.main_thread():
+            raise ProfilerUnavailable('Signal handlers can only be installed from the main thread')
+
+        self._running = True
+        self._previous_handler = signal.signal(signal.SIGPROF, self._on_sample)
+        signal.setitimer(signal.ITIMER_PROF, self._interval, self._interval)
+
+    def stop(self) -> None:
+        # A signal pending while the timer is disabled must not touch the stacks anymore
+        self._running = False
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+
+    def _on_sample(self, signum: int, frame: FrameType | None) -> None:
+        if self._running and frame is not None:
+            self.stacks[self._fold(frame)] += 1
+            self.samples += 1
+
+    def _fold(self, frame: FrameType | None) -> str:
+        labels: list[str] = []
+
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+
+            if label is None:
+                label = self._labels[code] = (
+                    f'{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+                )
+
+            labels.append(label)
+            frame = frame.f_back
+
+        return ';'.join(reversed(labels))
+
+    def top_functions(self, limit: int) -> list[tuple[str, float]]:
+        """Leaf functions by share of samples, where the thread was running when sampled."""
+        leaves: Counter[str] = Counter()
+
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+
+        return [(label, count / self.samples) for label, count in leaves.most_common(limit)] if self.samples else []
+
+
+def _write_folded(path: str, stacks: Counter[str]) -> None:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, count in stacks.most_common():
+            f.write(f'{stack} {count}\n')
+
+
+def _write_allocations(path: str, statistics: list[tracemalloc.StatisticDiff], traced: int, peak: int) -> None:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'traced {traced} bytes, peak {peak} bytes\n\n')
+
+        for stat in statistics:
+            f.write(f'{stat.size_diff:+} bytes {stat.count_diff:+} blocks, {stat.size} bytes total\n')
+
+            for line in stat.traceback.format():
+                f.write(f'    {line}\n')
+
+
+def _profile_path(directory: str, kind: str, extension: str) -> str:
+    return os.path.join(directory, f'{kind}-{time.strftime("%Y%m%d-%H%M%S")}.{extension}')
+
+
+async def profile_cpu(directory: str, seconds: float, top: int = 5) -> CpuProfileSummary:
+    """Samples the CPU time of the event loop thread for seconds, writes a folded stack file to directory."""
+    if _profile_lock.locked():
+        raise ProfileAlreadyRunning()
+
+    async with _profile_lock:
+        seconds = min(seconds, MAX_PROFILE_SECONDS)
+        profiler = SamplingProfiler()
+
+        profiler.start()
+
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+
+        # Written from a snapshot, the writer thread never iterates the counter the signal handler updated
+        stacks = Counter(profiler.stacks)
+        path = _profile_path(directory, 'cpu', 'folded')
+        await asyncio.to_thread(_write_folded, path, stacks)
+
+        return CpuProfileSummary(
+            path=path,
+            samples=profiler.samples,
+            seconds=seconds,
+            top_functions=profiler.top_functions(top)
+        )
+
+
+async def profile_memory(directory: str, seconds: float, top: int = 5, frames: int = 1) -> MemoryProfileSummary:
+    """
+    Traces allocations for seconds, writes the top allocation sites grown during the profile to directory.
+        - Tracing slows allocating code down roughly 15x with one frame per traceback and twice that with more
+    """
+    if _profile_lock.locked():
+        raise ProfileAlreadyRunning()
+
+    async with _profile_lock:
+        seconds = min(seconds, MAX_PROFILE_SECONDS)
+
+        # Tracing was already enabled elsewhere, leave it running afterwards
+        was_tracing = tracemalloc.is_tracing()
+
+        if not was_tracing:
+            tracemalloc.start(frames)
+
+        try:
+            before = tracemalloc.take_snapshot()
+            await asyncio.sleep(seconds)
+            after = tracemalloc.take_snapshot()
+            traced, peak = tracemalloc.get_traced_memory()
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+
+        # Comparing snapshots walks every traced block, off the event loop
+        statistics = await asyncio.to_thread(after.compare_to, before, 'traceback')
+        statistics = [stat for stat in statistics if stat.size_diff > 0][:50]
+
+        path = _profile_path(directory, 'memory', 'txt')
+        await asyncio.to_thread(_write_allocations, path, statistics, traced, peak)
+
+        return MemoryProfileSummary(
+            path=path,
+            seconds=seconds,
+            traced_bytes=traced,
+            peak_bytes=peak,
+            top_allocations=[
+                # Frames are oldest first, the last one is the allocation site
+                (f'{os.path.basename(stat.traceback[-1].filename)}:{stat.traceback[-1].lineno}', stat.size_diff)
+                for stat in statistics[:top]
+            ]
+        )
@@ -0,0 +1,47 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from core.instrumentation.metrics import Metrics
+
+
+class StartupTimer:
+    """
+    Wall time of the startup stages, from process start until every shard is hydrated.
+        - mark closes a sequential stage, it lasted since the previous mark
+        - stage times a block running alongside others, e.g. the hydration of one shard
+    """
+
+    def __init__(self, started_at: float | None = None) -> None:
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self._last_mark = self.started_at
+        self.stages: list[tuple[str, float, str | None]] = []
+        self.finished_at: float | None = None
+
+    def mark(self, stage: str, note: str | None = None) -> None:
+        now = time.perf_counter()
+        self.stages.append((stage, now - self._last_mark, note))
+        self._last_mark = now
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.stages.append((stage, time.perf_counter() - start, None))
+
+    def finish(self, metrics: Metrics) -> str:
+        """Stops the timer, records the stages and returns the breakdown as one line."""
+        self.finished_at = time.perf_counter()
+
+        for stage, seconds, _ in self.stages:
+            metrics.observe('startup_stage_seconds', seconds, stage=stage)
+
+        stages = ', '.join(
+            f'{stage} {seconds:.2f} s' + (f' ({note})' if note else '')
+            for stage, seconds, note in self.stages
+        )
+
+        return f'Startup took {self.finished_at - self.started_at:.2f} s: {stages}'
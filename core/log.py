@@ -0,0 +1,216 @@
+import copy
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Mapping
+
+_RESERVED_FIELDS = frozenset(logging.makeLogRecord({}).__dict__) | {'message', 'asctime'}
+
+DEFAULT_QUEUE_SIZE = 10_000
+
+
+def _extra_fields(record: logging.LogRecord) -> dict[str, Any]:
+    return {key: value for key, value in record.__dict__.items() if key not in _RESERVED_FIELDS}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+
+    return str(value)
+
+
+def _snapshot(value: Any) -> Any:
+    """Copy of mutable containers, the listener renders them after the caller may have changed them."""
+    if isinstance(value, dict):
+        return {key: _snapshot(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_snapshot(item) for item in value]
+    if isinstance(value, set):
+        return set(value)
+
+    return value
+
+
+class StructuredFormatter(logging.Formatter):
+    """Renders the record's message followed by its extra fields as key=value pairs."""
+
+    def __init__(self) -> None:
+        super().__init__('%(asctime)s %(levelname)s %(name)s %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = ' '.join(f'{key}={value}' for key, value in _extra_fields(record).items())
+
+        return f'{line} {fields}' if fields else line
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Renders a record as one JSON object per line.
+        - Extra fields are top level keys, e.g. guild_id, command and latency_ms
+        - Sets are rendered as sorted lists, other values JSON can't represent with str
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            'ts': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage(),
+            **_extra_fields(record)
+        }
+
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=_json_default)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Queue handler that never blocks, records are dropped and counted while the queue is full.
+        - The message is merged with its args and mutable extras are copied when the record is queued
+        - Formatting and traceback rendering happen on the listener thread
+        - The drop count is reported with the next record that fits into the queue
+    """
+
+    def __init__(self, records: queue.Queue) -> None:
+        super().__init__(records)
+        self.dropped = 0
+        self._unreported = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Records that are dropped anyway skip the copy, a put that still finds the queue full drops in enqueue
+        if self.queue.full():
+            self._drop()
+            return
+
+        super().emit(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # A copy, other handlers of the logger still see the record the caller made
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        for key, value in _extra_fields(record).items():
+            record.__dict__[key] = _snapshot(value)
+
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._drop()
+            return
+
+        if self._unreported:
+            self._report_dropped()
+
+    def _drop(self) -> None:
+        self.dropped += 1
+        self._unreported += 1
+
+    def _report_dropped(self) -> None:
+        report = logging.makeLogRecord({
+            'name': __name__,
+            'levelno': logging.WARNING,
+            'levelname': 'WARNING',
+            'msg': 'log records dropped',
+            'dropped': self._unreported,
+            'dropped_total': self.dropped
+        })
+
+        try:
+            self.queue.put_nowait(report)
+        except queue.Full:
+            return
+
+        self._unreported = 0
+
+
+class _DrainingListener(QueueListener):
+    """Waits for room for the stop sentinel, the queue may be full while the process shuts down."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+class LevelSampler(logging.Filter):
+    """
+    Passes one in every n records of a level, levels without a rate pass every record.
+        - Meant for DEBUG and INFO on busy processes, warnings and errors should not be sampled
+        - Passed records carry the sampling rate
+    """
+
+    def __init__(self, every: Mapping[int, int]) -> None:
+        super().__init__()
+        self._every = {level: rate for level, rate in every.items() if rate > 1}
+        self._counts: dict[int, int] = dict.fromkeys(self._every, 0)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        every = self._every.get(record.levelno)
+
+        if every is None:
+            return True
+
+        count = self._counts[record.levelno]
+        self._counts[record.levelno] = count + 1
+
+        if count % every:
+            return False
+
+        record.sampled_every = every
+        return True
+
+
+def parse_sampling(value: str) -> dict[int, int]:
+    """Parses sampling rates like "DEBUG=100,INFO=10" into levels and rates."""
+    rates: dict[int, int] = {}
+
+    for part in filter(None, (part.strip() for part in value.split(','))):
+        level_name, _, rate = part.partition('=')
+        level = logging.getLevelName(level_name.strip().upper())
+
+        if not isinstance(level, int):
+            raise ValueError(f'Unknown log level {level_name}')
+
+        rates[level] = int(rate)
+
+    return rates
+
+
+def configure_logging(
+        level: int = logging.INFO,
+        json_format: bool = True,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        sample_every: Mapping[int, int] | None = None
+) -> QueueListener:
+    """
+    Routes every record through a bounded queue, formatting and writing happen on the listener thread.
+        - The event loop only pays for creating the record, sampling it and enqueueing it, never for a full queue
+        - The returned listener is started, stop it on shutdown to flush the queue
+    """
+    records: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=queue_size)
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if json_format else StructuredFormatter())
+
+    queue_handler = DroppingQueueHandler(records)
+
+    if sample_every:
+        queue_handler.addFilter(LevelSampler(sample_every))
+
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = _DrainingListener(records, handler, respect_handler_level=True)
+    listener.start()
+
+    return listener
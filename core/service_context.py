@@ -1,9 +1,11 @@
 from dataclasses import dataclass
 
+from services.guild_purge_service import GuildPurgeService
 from services.guild_queue_service import GuildQueueService
 from services.guild_repository_service import GuildRepositoryService
 
 @dataclass
 class ServiceContext:
     guild_repository_service: GuildRepositoryService
-    guild_queue_service: GuildQueueService
\ No newline at end of file
+    guild_queue_service: GuildQueueService
+    guild_purge_service: GuildPurgeService
\ No newline at end of file
@@ -0,0 +1,43 @@
+from collections import Counter
+from typing import Any
+
+from sqlalchemy.engine import ExecutionContext
+from sqlalchemy.engine.interfaces import CacheStats
+
+
+class CompileCacheStats:
+    """Counts SQL compilation cache hits and misses of an engine, as a cursor observer."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+        self.compiled_by_statement: Counter[str] = Counter()
+
+    def reset(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+        self.compiled_by_statement.clear()
+
+    def on_statement(
+            self,
+            statement: str,
+            parameters: Any,
+            context: ExecutionContext | None,
+            elapsed: float
+    ) -> None:
+        # Statements executed without an execution context carry no cache information
+        if context is None:
+            return
+
+        match context.cache_hit:
+            case CacheStats.CACHE_HIT:
+                self.hits += 1
+            case CacheStats.CACHE_MISS:
+                self.misses += 1
+                self.compiled_by_statement[statement] += 1
+            case _:
+                # Compiled on every execution
+                self.uncached += 1
+                self.compiled_by_statement[statement] += 1
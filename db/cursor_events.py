@@ -0,0 +1,43 @@
+import time
+from typing import Any, Protocol, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, ExecutionContext
+
+
+class CursorObserver(Protocol):
+    def on_statement(
+            self,
+            statement: str,
+            parameters: Any,
+            context: ExecutionContext | None,
+            elapsed: float
+    ) -> None:
+        ...
+
+
+def attach_cursor_observers(sync_engine: Engine, observers: Sequence[CursorObserver]) -> None:
+    """
+    One set of cursor listeners for every statement observer of an engine, e.g. tracing, timing and cache stats.
+        - Statements are timed once, each observer gets the statement with its duration
+        - Failed statements skip after_cursor_execute, handle_error drops their start time
+    """
+    observers = tuple(observers)
+
+    @event.listens_for(sync_engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault('statement_started_at', []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info['statement_started_at'].pop()
+
+        for observer in observers:
+            observer.on_statement(statement, parameters, context, elapsed)
+
+    @event.listens_for(sync_engine, 'handle_error')
+    def _handle_error(exception_context) -> None:
+        conn = exception_context.connection
+
+        if conn is not None and conn.info.get('statement_started_at'):
+            conn.info['statement_started_at'].pop()
@@ -0,0 +1,40 @@
+from typing import AsyncIterator, Any, Mapping, Sequence
+
+from sqlalchemy import Table, Executable, Row, Dialect
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql.dml import Insert
+
+# Keeps expanding IN lists well below the bound parameter limits of every backend
+MAX_IN_CLAUSE_SIZE = 500
+
+
+def insert_ignore(dialect: Dialect, table: Table) -> Insert:
+    """INSERT skipping rows which conflict with an existing key."""
+    # Deferred, importing every dialect package costs startup time, the engine loads the one in use
+    match dialect.name:
+        case 'postgresql':
+            from sqlalchemy.dialects import postgresql
+            return postgresql.insert(table).on_conflict_do_nothing()
+        case 'sqlite':
+            from sqlalchemy.dialects import sqlite
+            return sqlite.insert(table).on_conflict_do_nothing()
+        case _:
+            raise NotImplementedError(f'Unsupported dialect {dialect.name}')
+
+
+async def stream_partitions(
+        conn: AsyncConnection,
+        stmt: Executable,
+        params: Mapping[str, Any] | None = None,
+        partition_size: int = 1000
+) -> AsyncIterator[Sequence[Row]]:
+    """Streams a result in partitions, backed by a server side cursor where the driver supports it."""
+    result = await conn.stream(stmt.execution_options(yield_per=partition_size), params)
+
+    async for partition in result.partitions(partition_size):
+        yield partition
+
+
+def chunked(values: Sequence, size: int = MAX_IN_CLAUSE_SIZE) -> list[Sequence]:
+    """Splits values into chunks, used to bound IN lists."""
+    return [values[i:i + size] for i in range(0, len(values), size)]
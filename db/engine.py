@@ -1,9 +1,16 @@
+from typing import Sequence
+
 from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 
-def get_async_engine(url: str) -> AsyncEngine:
+from db.cursor_events import CursorObserver, attach_cursor_observers
+
+def get_async_engine(url: str, cursor_observers: Sequence[CursorObserver] = ()) -> AsyncEngine:
     engine = create_async_engine(url)
 
+    if cursor_observers:
+        attach_cursor_observers(engine.sync_engine, cursor_observers)
+
     # for SQLite on delete cascade
     if url.startswith("sqlite"):
         @event.listens_for(engine.sync_engine, "connect")
@@ -1,17 +1,102 @@
-from typing import Iterable
+import hashlib
+from dataclasses import dataclass
+from typing import Iterable, Mapping
 
 from sqlalchemy.ext.asyncio import AsyncEngine
-from sqlalchemy import insert
+from sqlalchemy import Connection, Dialect, delete, inspect, insert, select, text
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
 
 from db.base import Base
+from db.dialect import insert_ignore
 import db.models
 from db.models.permission import Permission
+from db.models.schema_metadata import SchemaMetadata
+
+SCHEMA_VERSION_KEY = 'schema_version'
+SEEDED_COMMANDS_KEY = 'seeded_gated_commands'
+
+_schema_metadata = SchemaMetadata.__table__
+
+# Indexes replaced by a new definition under a new name, dropped on schema initialization
+_SUPERSEDED_INDEXES = ('ix_queue_configs_guild_covering',)
+
+
+@dataclass(frozen=True)
+class InitDbResult:
+    schema_initialized: bool
+    permissions_seeded: bool
+
+
+def schema_fingerprint(dialect: Dialect) -> str:
+    """Hash of the DDL of every table and index, changes with every model change."""
+    digest = hashlib.sha256()
+
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+
+        for index in sorted(table.indexes, key=lambda i: i.name or ''):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+
+    return digest.hexdigest()
+
+
+async def read_metadata(engine: AsyncEngine) -> dict[str, str]:
+    """Stored metadata, empty for a database without the metadata table."""
+    async with engine.connect() as conn:
+        if not await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table(_schema_metadata.name)):
+            return {}
+
+        result = await conn.execute(select(_schema_metadata.c.key, _schema_metadata.c.value))
+        return {key: value for key, value in result.all()}
+
+
+async def write_metadata(engine: AsyncEngine, values: Mapping[str, str]) -> None:
+    if not values:
+        return
+
+    async with engine.begin() as conn:
+        await conn.execute(delete(_schema_metadata).where(_schema_metadata.c.key.in_(list(values))))
+        await conn.execute(insert(_schema_metadata), [{'key': key, 'value': value} for key, value in values.items()])
+
+
+def _add_missing_columns(sync_conn: Connection) -> None:
+    """create_all never alters existing tables, add nullable columns introduced later on."""
+    inspector = inspect(sync_conn)
+
+    for table in Base.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+
+        for column in table.columns:
+            if column.name in existing:
+                continue
+
+            if not column.nullable:
+                raise RuntimeError(f'Column {table.name}.{column.name} is not nullable and needs a migration')
+
+            sync_conn.execute(text(
+                f'ALTER TABLE {table.name} ADD COLUMN {CreateColumn(column).compile(dialect=sync_conn.dialect)}'
+            ))
+
+
+def _drop_superseded_indexes(sync_conn: Connection) -> None:
+    for name in _SUPERSEDED_INDEXES:
+        sync_conn.execute(text(f'DROP INDEX IF EXISTS {name}'))
+
+
+def _create_missing_indexes(sync_conn: Connection) -> None:
+    """create_all only creates indexes along with new tables, add indexes introduced later on."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
 
 
 async def init_schema(engine: AsyncEngine) -> None:
     """Create missing tables or the entire database."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_drop_superseded_indexes)
+        await conn.run_sync(_create_missing_indexes)
 
 
 async def seed_permissions(engine: AsyncEngine, gated_command_names: Iterable[str]) -> None:
@@ -21,13 +106,32 @@ async def seed_permissions(engine: AsyncEngine, gated_command_names: Iterable[st
     if not values:
         return
 
-    stmt = insert(Permission).values(values)
-    stmt = stmt.prefix_with("OR IGNORE")
-
     async with engine.begin() as conn:
-        await conn.execute(stmt)
+        await conn.execute(insert_ignore(conn.dialect, Permission.__table__), values)
+
+
+async def init_db(engine: AsyncEngine, gated_command_names: Iterable[str]) -> InitDbResult:
+    """Creates the schema and seeds gated commands, both are skipped when the stored metadata is current."""
+    gated_command_names = sorted(set(gated_command_names))
+
+    metadata = await read_metadata(engine)
+    fingerprint = schema_fingerprint(engine.dialect)
+    seeded_commands = ','.join(gated_command_names)
+
+    updates: dict[str, str] = {}
+
+    schema_initialized = metadata.get(SCHEMA_VERSION_KEY) != fingerprint
+
+    if schema_initialized:
+        await init_schema(engine)
+        updates[SCHEMA_VERSION_KEY] = fingerprint
+
+    permissions_seeded = schema_initialized or metadata.get(SEEDED_COMMANDS_KEY) != seeded_commands
+
+    if permissions_seeded:
+        await seed_permissions(engine, gated_command_names)
+        updates[SEEDED_COMMANDS_KEY] = seeded_commands
 
+    await write_metadata(engine, updates)
 
-async def init_db(engine: AsyncEngine, gated_command_names: Iterable[str]) -> None:
-    await init_schema(engine)
-    await seed_permissions(engine, gated_command_names)
\ No newline at end of file
+    return InitDbResult(schema_initialized=schema_initialized, permissions_seeded=permissions_seeded)
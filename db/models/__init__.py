@@ -2,4 +2,6 @@ from db.models import guild
 from db.models import permission
 from db.models import role_permission
 from db.models import guild_role_permission
-from db.models import queue_config
\ No newline at end of file
+from db.models import queue_config
+from db.models import schema_metadata
+from db.models import guild_purge
\ No newline at end of file
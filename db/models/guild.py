@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, func, Text
+from sqlalchemy import BigInteger, DateTime, func, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from db.base import Base
@@ -9,9 +9,9 @@ class Guild(Base):
     """ORM model representing a guild."""
     __tablename__ = 'guilds'
 
-    guild_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    guild_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
     name: Mapped[str] = mapped_column(nullable=False)
-    prefix: Mapped[str] = mapped_column(Text(10), nullable=False, default='!')
+    prefix: Mapped[str] = mapped_column(String(10), nullable=False, default='!')
     pickup_channel_id: Mapped[int | None] = mapped_column(BigInteger)
     listen_channel_id: Mapped[int | None] = mapped_column(BigInteger)
 
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class GuildPurge(Base):
+    """ORM model of a pending deletion of a removed guild's data, the row is the purge's resume point."""
+    __tablename__ = 'guild_purges'
+
+    # No foreign key, the guild row is deleted before this one
+    guild_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+
+    removed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    purge_after: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
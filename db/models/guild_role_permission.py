@@ -1,8 +1,7 @@
 from typing import List
 
 from sqlalchemy import BigInteger, ForeignKey
-from sqlalchemy.orm import Mapped, relationship
-from sqlalchemy.testing.schema import mapped_column
+from sqlalchemy.orm import Mapped, relationship, mapped_column
 
 from db.base import Base
 
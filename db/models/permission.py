@@ -1,7 +1,6 @@
 from typing import List
 
-from sqlalchemy.orm import Mapped, relationship
-from sqlalchemy.testing.schema import mapped_column
+from sqlalchemy.orm import Mapped, relationship, mapped_column
 
 from db.base import Base
 
@@ -1,4 +1,4 @@
-from sqlalchemy import BigInteger, ForeignKey, UniqueConstraint
+from sqlalchemy import BigInteger, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from db.base import Base
@@ -17,8 +17,11 @@ class QueueConfigModel(Base):
     name: Mapped[str] = mapped_column()
     player_count: Mapped[int] = mapped_column()
     team_count: Mapped[int] = mapped_column()
+    expire_after: Mapped[int | None] = mapped_column(nullable=True)  # Seconds until queued players are removed, None never
 
     __table_args__ = (
         UniqueConstraint('guild_id','name', name='uq_queue_configs_guild_name'),
+        # Covering index for guild hydration, serves fetch_queues without touching the table
+        Index('ix_queue_configs_guild_hydration', 'guild_id', 'name', 'player_count', 'team_count', 'expire_after'),
     )
 
@@ -1,6 +1,5 @@
 from sqlalchemy import BigInteger, ForeignKey, ForeignKeyConstraint
-from sqlalchemy.orm import Mapped, relationship
-from sqlalchemy.testing.schema import mapped_column
+from sqlalchemy.orm import Mapped, relationship, mapped_column
 
 from db.base import Base
 
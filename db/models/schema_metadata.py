@@ -0,0 +1,12 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class SchemaMetadata(Base):
+    """ORM model of startup bookkeeping, e.g. the schema version and the last synced command tree."""
+    __tablename__ = 'schema_metadata'
+
+    key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    value: Mapped[str] = mapped_column(nullable=False)
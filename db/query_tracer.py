@@ -0,0 +1,130 @@
+import functools
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Callable, Awaitable, TypeVar, ParamSpec
+
+from sqlalchemy.engine import ExecutionContext
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec('P')
+R = TypeVar('R')
+
+
+@dataclass()
+class TracedOperation:
+    """Statements executed during one logical operation, e.g. a facade call."""
+    name: str
+    statements: list[str] = field(default_factory=list)
+    tracer: QueryTracer | None = None
+
+
+_current_operation: ContextVar[TracedOperation | None] = ContextVar('traced_operation', default=None)
+
+
+@contextmanager
+def trace_operation(name: str) -> Iterator[TracedOperation]:
+    """Attributes statements to an operation, nested operations count towards the outermost one."""
+    operation = _current_operation.get()
+
+    if operation is not None:
+        yield operation
+        return
+
+    operation = TracedOperation(name=name)
+    token = _current_operation.set(operation)
+
+    try:
+        yield operation
+    finally:
+        _current_operation.reset(token)
+
+        if operation.tracer is not None:
+            operation.tracer.record_operation(operation)
+
+
+def traced_operation(name: str) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """Decorator form of trace_operation for coroutine functions."""
+    def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with trace_operation(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class QueryTracer:
+    """
+    Cursor level query tracing of an engine, as a cursor observer.
+        - Counts statements per traced operation, catches N+1 patterns
+        - Logs statements slower than slow_query_threshold with their parameters
+    """
+
+    def __init__(self, slow_query_threshold: float = 0.1) -> None:
+        self.slow_query_threshold = slow_query_threshold
+        self.statement_count = 0
+        self.operation_calls: Counter[str] = Counter()
+        self.operation_statements: Counter[str] = Counter()
+        self.operation_max_statements: dict[str, int] = {}
+
+    def record_operation(self, operation: TracedOperation) -> None:
+        count = len(operation.statements)
+
+        self.operation_calls[operation.name] += 1
+        self.operation_statements[operation.name] += count
+        self.operation_max_statements[operation.name] = max(
+            self.operation_max_statements.get(operation.name, 0), count
+        )
+
+    def on_statement(
+            self,
+            statement: str,
+            parameters: Any,
+            context: ExecutionContext | None,
+            elapsed: float
+    ) -> None:
+        self.statement_count += 1
+
+        operation = _current_operation.get()
+
+        if operation is not None:
+            operation.tracer = self
+            operation.statements.append(statement)
+
+        if elapsed >= self.slow_query_threshold:
+            logger.warning(
+                'Slow query %.1f ms in %s: %s parameters=%r',
+                elapsed * 1000,
+                operation.name if operation is not None else 'untraced operation',
+                ' '.join(statement.split()),
+                parameters
+            )
+
+
+class StatementBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_max_statements(max_statements: int, name: str = 'assert_max_statements') -> Iterator[TracedOperation]:
+    """Fails if the block executes more than max_statements, the engine needs an attached QueryTracer."""
+    operation = TracedOperation(name=name)
+    token = _current_operation.set(operation)
+
+    try:
+        yield operation
+    finally:
+        _current_operation.reset(token)
+
+    if len(operation.statements) > max_statements:
+        statements = '\n'.join(f'  {" ".join(statement.split())}' for statement in operation.statements)
+
+        raise StatementBudgetExceeded(
+            f'{name} executed {len(operation.statements)} statements, expected at most {max_statements}:\n{statements}'
+        )
@@ -1,4 +1,3 @@
-from datetime import datetime
 from dataclasses import dataclass, field
 from typing import TypeAlias, Literal
 
@@ -8,6 +7,7 @@ from domain.types import GuildId, RoleId, MemberId
 GuildStateField: TypeAlias = Literal[
     'settings',
     'role_command_permissions',
+    'role_permission_masks',
     'queues',
 ]
 
@@ -34,5 +34,5 @@ class GuildState:
     """Container for cached guild state."""
     settings: GuildSettings
     role_command_permissions: dict[RoleId, set[str]] = field(default_factory=dict)
-    queues: dict[str, QueueState] = field(default_factory=dict) # Key: Queue name Value: State
-    active_prompts: dict[ActiveGuildPrompt, datetime] = field(default_factory=dict) # Key: Prompt Value: created at time
\ No newline at end of file
+    role_permission_masks: dict[RoleId, int] = field(default_factory=dict) # Compiled from role_command_permissions
+    queues: dict[str, QueueState] = field(default_factory=dict) # Key: Queue name Value: State
\ No newline at end of file
@@ -4,4 +4,8 @@ MIN_PLAYER_COUNT = 2
 MAX_PLAYER_COUNT = 64
 MAX_TEAM_COUNT = 8
 MIN_TEAM_COUNT = 1
-MAX_GUILD_QUEUE_COUNT = 50
\ No newline at end of file
+MAX_GUILD_QUEUE_COUNT = 50
+MAX_QUEUE_EXPIRY = 7 * 24 * 3600
+
+# Timer kind of queued players' expiry, key: (kind, guild_id, member_id, queue_name)
+QUEUE_EXPIRY_TIMER = 'queue_expiry'
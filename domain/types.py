@@ -3,4 +3,5 @@ from typing import NewType
 GuildId = NewType("GuildId", int)
 ChannelId = NewType("ChannelId", int)
 RoleId = NewType("RoleId", int)
-MemberId = NewType("MemberId", int)
\ No newline at end of file
+MemberId = NewType("MemberId", int)
+ShardId = NewType("ShardId", int)
\ No newline at end of file
@@ -1,24 +1,57 @@
-import discord
+import logging
+import time
+
+# Taken before the remaining imports, the startup breakdown includes them
+STARTED_AT = time.perf_counter()
+
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, AsyncEngine
 
+from bot.gateway import gateway_options
 from bot.pickupbot import PickupBot
 from config.settings import load_settings
 from core.app_context import setup
+from core.log import configure_logging, parse_sampling
+from core.instrumentation.http_timing import create_http_trace
+from core.instrumentation.startup_timing import StartupTimer
 def main():
+    startup_timer = StartupTimer(STARTED_AT)
+    startup_timer.mark('imports')
+
     settings = load_settings()
-    app_context = setup(settings.DATABASE_URL)
 
-    intents = discord.Intents.default()
-    intents.members = True
-    intents.presences = True
-    intents.message_content = True
+    log_listener = configure_logging(
+        level=logging.getLevelName(settings.LOG_LEVEL),
+        json_format=settings.LOG_JSON,
+        queue_size=settings.LOG_QUEUE_SIZE,
+        sample_every=parse_sampling(settings.LOG_SAMPLING)
+    )
+    app_context = setup(
+        settings.DATABASE_URL,
+        settings.INVALIDATION_URL,
+        settings.SLOW_QUERY_THRESHOLD_MS / 1000,
+        settings.QUEUE_AWAY_TIMEOUT,
+        settings.GUILD_PURGE_GRACE_PERIOD
+    )
+    startup_timer.mark('app_context')
 
     bot = PickupBot(manager_context=app_context.manager_context,
                     engine=app_context.engine,
+                    metrics=app_context.metrics,
+                    metrics_port=settings.METRICS_PORT,
+                    profile_dir=settings.PROFILE_DIR,
+                    force_command_sync=settings.FORCE_COMMAND_SYNC,
+                    startup_timer=startup_timer,
+                    http_trace=create_http_trace(app_context.metrics),
                     command_prefix="!",
-                    intents=intents)
+                    **gateway_options(settings.LEAN_GATEWAY, presences=settings.QUEUE_AWAY_TIMEOUT > 0),
+                    shard_count=settings.SHARD_COUNT,
+                    shard_ids=settings.SHARD_IDS)
 
-    bot.run(settings.DISCORD_TOKEN)
+    try:
+        # discord.py logs through the root logger's queue handler
+        bot.run(settings.DISCORD_TOKEN, log_handler=None)
+    finally:
+        log_listener.stop()
 
 if __name__ == "__main__":
     main()
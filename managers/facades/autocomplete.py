@@ -0,0 +1,64 @@
+from typing import Collection, TYPE_CHECKING
+
+from domain.types import GuildId
+from services.autocomplete_cache import AutocompleteCache
+from services.name_index import NameIndex
+
+if TYPE_CHECKING:
+    from managers.guild_state_manager import GuildStateManager
+
+class AutocompleteFacade:
+    # Discord accepts at most 25 choices
+    MAX_CHOICES = 25
+
+    # Cached matches per input, leaves room for values excluded by the interaction
+    CACHED_MATCHES = 50
+
+    def __init__(self, guild_state_manager: GuildStateManager) -> None:
+        self._sm = guild_state_manager
+        self._cache = AutocompleteCache()
+
+    def queue_names(self, guild_id: GuildId, current: str, excluded_lc: Collection[str] = ()) -> list[str]:
+        """Queue names of a guild matching the current input, prefix matches first."""
+        return self._search(
+            guild_id=guild_id,
+            field='queues',
+            index=self._sm._queue_name_index(guild_id),
+            current=current,
+            excluded_lc=excluded_lc
+        )
+
+    def command_names(self, guild_id: GuildId, current: str, excluded_lc: Collection[str] = ()) -> list[str]:
+        """Gated command names matching the current input, prefix matches first."""
+        return self._search(
+            guild_id=guild_id,
+            field='commands',
+            index=self._sm._command_name_index,
+            current=current,
+            excluded_lc=excluded_lc
+        )
+
+    def _search(
+            self,
+            guild_id: GuildId,
+            field: str,
+            index: NameIndex,
+            current: str,
+            excluded_lc: Collection[str]
+    ) -> list[str]:
+        current_lc = current.lower()
+        key = (guild_id, field, current_lc)
+
+        matches = self._cache.get(key, index.version)
+
+        if matches is None:
+            matches = index.search(current_lc, limit=self.CACHED_MATCHES)
+            self._cache.set(key, index.version, matches)
+
+        names = [name for name_lc, name in matches if name_lc not in excluded_lc]
+
+        # Exclusions ate into a truncated result, fall back to the full search
+        if len(names) < self.MAX_CHOICES and len(matches) == self.CACHED_MATCHES:
+            names = [name for name_lc, name in index.search(current_lc) if name_lc not in excluded_lc]
+
+        return names[:self.MAX_CHOICES]
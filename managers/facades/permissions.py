@@ -4,7 +4,9 @@ from typing import Collection, Iterable, TYPE_CHECKING
 import managers.logic.permission as permission
 import managers.logic.command_access as command_access
 
-from domain.types import GuildId, RoleId, ChannelId
+from db.query_tracer import traced_operation
+from domain.types import GuildId, RoleId, ChannelId, MemberId
+from services.member_permission_cache import role_fingerprint
 
 if TYPE_CHECKING:
     from managers.guild_state_manager import GuildStateManager
@@ -23,6 +25,7 @@ class PermissionsFacade:
     def __init__(self, guild_state_manager: GuildStateManager) -> None:
         self._sm: GuildStateManager = guild_state_manager
 
+    @traced_operation('permissions.add_role_permissions')
     async def add_role_permissions(
             self,
             guild_id: GuildId,
@@ -52,13 +55,69 @@ class PermissionsFacade:
                 role_command_permissions = dict(state.role_command_permissions)  # Copy
                 role_command_permissions[role_id] = set(plan.new_role_perms)
 
+                role_permission_masks = dict(state.role_permission_masks)
+                role_permission_masks[role_id] = permission.compile_role_mask(
+                    plan.new_role_perms,
+                    self._sm.command_bits
+                )
+
                 self._sm._mutate_state(guild_id, 'role_command_permissions', role_command_permissions)
+                self._sm._replace_state_field(guild_id, 'role_permission_masks', role_permission_masks)
 
             return AddPermissionUpdateResult(
                 added_permissions=plan.to_add,
                 new_role_permissions=plan.new_role_perms,
             )
 
+    @traced_operation('permissions.import_role_permissions')
+    async def import_role_permissions(
+            self,
+            guild_id: GuildId,
+            grants: dict[RoleId, set[str]],
+            valid_command_names: list[str]
+    ) -> dict[RoleId, frozenset[str]]:
+        """
+        Bulk variant of add_role_permissions, returns the permissions added per role.
+            - One database write and one cache update for all roles
+        """
+        async with self._sm.acquire_lock(guild_id=guild_id):
+            state = self._sm._require_state(guild_id=guild_id)
+
+            plans = [
+                permission.plan_add_role_permissions(
+                    state=state,
+                    role_id=role_id,
+                    command_names=list(command_names),
+                    valid_command_names=valid_command_names
+                )
+                for role_id, command_names in grants.items()
+            ]
+
+            plans = [plan for plan in plans if plan.to_add]
+
+            if plans:
+                await self._sm._repository_service.import_role_permissions(
+                    guild_id=guild_id,
+                    grants={plan.role_id: plan.to_add for plan in plans}
+                )
+
+                # Update cache
+                role_command_permissions = dict(state.role_command_permissions)
+                role_permission_masks = dict(state.role_permission_masks)
+
+                for plan in plans:
+                    role_command_permissions[plan.role_id] = set(plan.new_role_perms)
+                    role_permission_masks[plan.role_id] = permission.compile_role_mask(
+                        plan.new_role_perms,
+                        self._sm.command_bits
+                    )
+
+                self._sm._mutate_state(guild_id, 'role_command_permissions', role_command_permissions)
+                self._sm._replace_state_field(guild_id, 'role_permission_masks', role_permission_masks)
+
+            return {plan.role_id: plan.to_add for plan in plans}
+
+    @traced_operation('permissions.remove_role_permissions')
     async def remove_role_permissions(
             self,
             guild_id: GuildId,
@@ -85,19 +144,27 @@ class PermissionsFacade:
 
                 # Cache
                 role_command_permissions = dict(state.role_command_permissions)
+                role_permission_masks = dict(state.role_permission_masks)
 
                 if not plan.new_role_perms:
                     role_command_permissions.pop(role_id, None)
+                    role_permission_masks.pop(role_id, None)
                 else:
                     role_command_permissions[role_id] = set(plan.new_role_perms)
+                    role_permission_masks[role_id] = permission.compile_role_mask(
+                        plan.new_role_perms,
+                        self._sm.command_bits
+                    )
 
                 self._sm._mutate_state(guild_id, 'role_command_permissions', role_command_permissions)
+                self._sm._replace_state_field(guild_id, 'role_permission_masks', role_permission_masks)
 
             return RemovePermissionUpdateResult(
                 removed_permissions=plan.to_remove,
                 new_role_permissions=plan.new_role_perms,
             )
 
+    @traced_operation('permissions.remove_elevated_roles')
     async def remove_elevated_roles(
             self,
             guild_id: GuildId,
@@ -117,61 +184,69 @@ class PermissionsFacade:
                 )
 
                 role_command_permissions = dict(state.role_command_permissions)
+                role_permission_masks = dict(state.role_permission_masks)
 
                 for role_id in plan.role_ids:
                     role_command_permissions.pop(role_id, None)
+                    role_permission_masks.pop(role_id, None)
 
                 self._sm._mutate_state(guild_id, 'role_command_permissions', role_command_permissions)
+                self._sm._replace_state_field(guild_id, 'role_permission_masks', role_permission_masks)
 
             return set(plan.role_ids)
 
+    def member_command_mask(
+            self,
+            guild_id: GuildId,
+            member_id: MemberId,
+            role_ids: Iterable[RoleId]
+    ) -> int:
+        """Effective command mask of a member, memoized per role set until permissions change."""
+        fingerprint = role_fingerprint(role_ids)
+        mask = self._sm._member_permissions.get(guild_id, member_id, fingerprint)
+
+        if mask is None:
+            state = self._sm._require_state(guild_id=guild_id)
+            mask = permission.effective_command_mask(state=state, role_ids=role_ids)
+
+            self._sm._member_permissions.set(guild_id, member_id, fingerprint, mask)
+
+        return mask
+
+    def invalidate_member(self, guild_id: GuildId, member_id: MemberId) -> None:
+        """Drops the memoized command mask of a member, e.g. after a role change."""
+        self._sm._member_permissions.invalidate_member(guild_id, member_id)
+
     def has_command_permission(
             self,
             guild_id: GuildId,
             command_name: str,
+            member_id: MemberId,
             role_ids: Iterable[RoleId],
             is_admin: bool
     ):
         """Checks if a user with given roles is allowed to execute given command."""
-        state = self._sm._require_state(guild_id=guild_id)
-
-        return permission.has_command_permission(
-            state=state,
+        return permission.mask_has_command_permission(
+            command_bits=self._sm.command_bits,
             command_name=command_name,
-            role_ids=role_ids,
+            command_mask=0 if is_admin else self.member_command_mask(guild_id, member_id, role_ids),
             is_admin=is_admin
         )
 
-    def check_channel_scope(
+    def check_command_access(
             self,
             guild_id: GuildId,
-            required_scope: command_access.ChannelScope,
-            current_channel_id: ChannelId
-    ) -> bool:
-        """Command level check for the correct channel."""
-        state = self._sm._require_state(guild_id=guild_id)
-
-        return command_access.check_channel_scope(
-            state=state,
-            required_scope=required_scope,
-            current_channel_id=current_channel_id
-        )
-
-    def check_permission_scope(
-            self,
-            guild_id: GuildId,
-            required_scope: command_access.PermissionScope,
-            role_ids: Collection[RoleId],
-            is_admin: bool,
-            command_name: str
+            policy: command_access.CommandPolicy,
+            current_channel_id: ChannelId,
+            member_id: MemberId,
+            role_ids: Iterable[RoleId],
+            is_admin: bool
     ) -> bool:
-        """Performs a permission check against the provided roles and command."""
-        state = self._sm._require_state(guild_id=guild_id)
-
-        return command_access.check_permission_scope(
-            state=state,
-            required_scope=required_scope,
-            role_ids=role_ids,
+        """Command level check for the correct channel and the member's permissions."""
+        return command_access.check_command_access(
+            policy=policy,
+            channel_table=self._sm._channel_table(guild_id),
+            current_channel_id=current_channel_id,
             is_admin=is_admin,
-            command_name=command_name
-        )
\ No newline at end of file
+            command_mask=lambda: self.member_command_mask(guild_id, member_id, role_ids)
+        )
@@ -1,8 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Collection, TYPE_CHECKING, Iterable
 
 from core.dto.queue_config import QueueConfig
+from db.query_tracer import traced_operation
 from domain.guild_state import QueueState
+from domain.queue_constants import MAX_QUEUE_EXPIRY
 from domain.types import GuildId
 from managers.logic import queue_config
 from managers.logic.queue_config import QueueCreationData, RemoveQueuesPlan
@@ -15,10 +17,17 @@ class CreateQueuesResult:
     added_queues: frozenset[QueueCreationData]
     errors: dict[str, list[str]]
 
+@dataclass(frozen=True)
+class SetQueueExpiryResult:
+    ok: bool
+    queue_config: QueueConfig | None
+    error: str | None
+
 class QueueConfigsFacade:
     def __init__(self, guild_state_manager: GuildStateManager):
         self._sm = guild_state_manager
 
+    @traced_operation('queue_configs.create_queues')
     async def create_queues(
             self,
             guild_id: GuildId,
@@ -54,6 +63,53 @@ class QueueConfigsFacade:
                 errors=plan.errors
             )
 
+    @traced_operation('queue_configs.set_queue_expiry')
+    async def set_queue_expiry(
+            self,
+            guild_id: GuildId,
+            queue_name: str,
+            expire_after: int | None
+    ) -> SetQueueExpiryResult:
+        """
+        Sets the seconds until players of a queue are removed, None disables it.
+            - Players queued already restart their timer with the new expiry
+        """
+        if expire_after is not None and not 0 < expire_after <= MAX_QUEUE_EXPIRY:
+            return SetQueueExpiryResult(
+                ok=False,
+                queue_config=None,
+                error=f'Expiry has to be between 1 second and {MAX_QUEUE_EXPIRY // 3600} hours.'
+            )
+
+        async with self._sm.acquire_lock(guild_id=guild_id):
+            state = self._sm._require_state(guild_id=guild_id)
+            queue = state.queues.get(queue_name.lower())
+
+            if queue is None:
+                return SetQueueExpiryResult(ok=False, queue_config=None, error=f'Queue {queue_name} does not exist.')
+
+            updated = await self._sm._queue_service.update_queue_expiry(
+                guild_id=guild_id,
+                name=queue.queue_config.name,
+                expire_after=expire_after
+            )
+
+            if not updated:
+                return SetQueueExpiryResult(
+                    ok=False,
+                    queue_config=None,
+                    error='Something went wrong updating the database.'
+                )
+
+            # Cache, the player set is kept and the state manager reschedules the timers of its players
+            queue_config = replace(queue.queue_config, expire_after=expire_after)
+            cached_queues = dict(state.queues)
+            cached_queues[queue_config.name] = QueueState(queue_config=queue_config, player_ids=queue.player_ids)
+
+            self._sm._mutate_state(guild_id, 'queues', cached_queues)
+
+            return SetQueueExpiryResult(ok=True, queue_config=queue_config, error=None)
+
     def preview_remove_queues(
             self,
             guild_id: GuildId,
@@ -65,12 +121,12 @@ class QueueConfigsFacade:
             queue_names=queues
         )
 
+    @traced_operation('queue_configs.apply_remove_queues')
     async def apply_remove_queues(
             self,
             guild_id: GuildId,
             queues: Iterable[str]
     ) -> RemoveQueuesPlan:
-        # TODO: Queue state handling
         async with self._sm.acquire_lock(guild_id=guild_id):
             state = self._sm._require_state(guild_id=guild_id)
 
@@ -83,7 +139,7 @@ class QueueConfigsFacade:
                     queues=plan.to_remove
                 )
 
-                # Cache
+                # Cache, players of removed queues are dropped from the player index
                 cached_queues = dict(state.queues)
 
                 for queue_to_remove in plan.to_remove:
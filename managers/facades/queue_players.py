@@ -0,0 +1,205 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable
+
+from domain.types import GuildId, MemberId
+from managers.logic.queue_shortcuts import ShortcutPlan, parse_shortcuts
+
+if TYPE_CHECKING:
+    from managers.guild_state_manager import GuildStateManager
+
+@dataclass(frozen=True)
+class QueuePlayersResult:
+    ok: bool
+    queue_name: str
+    player_count: int
+    capacity: int
+    error: str | None
+
+@dataclass(frozen=True)
+class QueueShortcutsResult:
+    joined: list[QueuePlayersResult]
+    left: list[QueuePlayersResult]
+    errors: list[str]
+
+class QueuePlayersFacade:
+    """
+    Queue membership of players, runtime state only.
+        - Single mutations have no awaits and need no guild lock
+        - Joining a queue with expire_after starts the player's expiry timer, leaving cancels it
+        - Shortcut plans are applied under the guild lock, so their joins and leaves never interleave with config changes
+    """
+
+    def __init__(self, guild_state_manager: GuildStateManager) -> None:
+        self._sm = guild_state_manager
+
+    def join_queue(self, guild_id: GuildId, member_id: MemberId, queue_name: str) -> QueuePlayersResult:
+        queue_name = queue_name.lower()
+        queue = self._sm._require_state(guild_id=guild_id).queues.get(queue_name)
+
+        if queue is None:
+            return QueuePlayersResult(
+                ok=False, queue_name=queue_name, player_count=0, capacity=0, error=f'Queue {queue_name} does not exist.'
+            )
+
+        error = None
+
+        if member_id in queue.player_ids:
+            error = f'Already in {queue_name}.'
+        elif len(queue.player_ids) >= queue.queue_config.player_count:
+            error = f'{queue_name} is full.'
+        else:
+            queue.player_ids.add(member_id)
+            self._sm._queue_players.add(guild_id, member_id, queue_name)
+
+            if queue.queue_config.expire_after is not None:
+                self._sm._schedule_queue_expiry(guild_id, member_id, queue)
+
+        return QueuePlayersResult(
+            ok=error is None,
+            queue_name=queue_name,
+            player_count=len(queue.player_ids),
+            capacity=queue.queue_config.player_count,
+            error=error
+        )
+
+    def leave_queue(self, guild_id: GuildId, member_id: MemberId, queue_name: str) -> QueuePlayersResult:
+        queue_name = queue_name.lower()
+        queue = self._sm._require_state(guild_id=guild_id).queues.get(queue_name)
+
+        if queue is None or member_id not in queue.player_ids:
+            return QueuePlayersResult(
+                ok=False,
+                queue_name=queue_name,
+                player_count=len(queue.player_ids) if queue else 0,
+                capacity=queue.queue_config.player_count if queue else 0,
+                error=f'Not in {queue_name}.'
+            )
+
+        queue.player_ids.discard(member_id)
+        self._sm._queue_players.discard(guild_id, member_id, queue_name)
+
+        if queue.queue_config.expire_after is not None:
+            self._sm._cancel_queue_expiries(guild_id, queue_name, (member_id,))
+
+        return QueuePlayersResult(
+            ok=True,
+            queue_name=queue_name,
+            player_count=len(queue.player_ids),
+            capacity=queue.queue_config.player_count,
+            error=None
+        )
+
+    def remove_players(self, guild_id: GuildId, member_ids: Iterable[MemberId]) -> dict[MemberId, frozenset[str]]:
+        """Removes members from all their queues, returns the queues each removed member was in."""
+        state = self._sm._cache[guild_id]
+
+        # Evicted in the meantime, the index entries went with it
+        if state is None:
+            return {}
+
+        removed: dict[MemberId, frozenset[str]] = {}
+
+        for member_id in member_ids:
+            queue_names = self._sm._queue_players.pop_member(guild_id, member_id)
+
+            for queue_name in queue_names:
+                queue = state.queues[queue_name]
+                queue.player_ids.discard(member_id)
+
+                if queue.queue_config.expire_after is not None:
+                    self._sm._cancel_queue_expiries(guild_id, queue_name, (member_id,))
+
+            if queue_names:
+                removed[member_id] = frozenset(queue_names)
+
+        return removed
+
+    def expire_players(
+            self,
+            guild_id: GuildId,
+            expired: Iterable[tuple[MemberId, str]]
+    ) -> dict[MemberId, frozenset[str]]:
+        """Removes members from queues their expiry timer fired for, returns the queues each member was removed from."""
+        state = self._sm._cache[guild_id]
+
+        if state is None:
+            return {}
+
+        removed: dict[MemberId, set[str]] = {}
+
+        for member_id, queue_name in expired:
+            queue = state.queues.get(queue_name)
+
+            # Left or removed since the timer fired
+            if queue is None or member_id not in queue.player_ids:
+                continue
+
+            queue.player_ids.discard(member_id)
+            self._sm._queue_players.discard(guild_id, member_id, queue_name)
+            removed.setdefault(member_id, set()).add(queue_name)
+
+        return {member_id: frozenset(queue_names) for member_id, queue_names in removed.items()}
+
+    def parse_shortcuts(self, guild_id: GuildId, content: str) -> ShortcutPlan | None:
+        """Queue shortcuts of a message, None for chat and guilds not cached."""
+        lookup = self._sm._shortcut_lookups.get(guild_id)
+
+        if lookup is None:
+            if self._sm._cache[guild_id] is None:
+                return None
+
+            lookup = self._sm._shortcut_lookup(guild_id)
+
+        return parse_shortcuts(content, lookup)
+
+    async def apply_shortcuts(self, guild_id: GuildId, member_id: MemberId, plan: ShortcutPlan) -> QueueShortcutsResult:
+        """
+        Applies a shortcut plan in one locked mutation.
+            - ++ joins every queue the member is not in and that is not full, -- leaves every queue
+            - Queues removed since the plan was parsed are reported as errors
+        """
+        async with self._sm.acquire_lock(guild_id):
+            joined: list[QueuePlayersResult] = []
+            left: list[QueuePlayersResult] = []
+            errors: list[str] = []
+            state = self._sm._require_state(guild_id)
+
+            leave = plan.leave
+            join = plan.join
+
+            # Queues named by a token keep the token's action
+            named = {*join, *leave}
+
+            if plan.every is False:
+                leave = (*(name for name in sorted(self.queues_of(guild_id, member_id)) if name not in named), *leave)
+            elif plan.every is True:
+                join = (*(
+                    name for name, queue in sorted(state.queues.items())
+                    if name not in named
+                    and member_id not in queue.player_ids
+                    and len(queue.player_ids) < queue.queue_config.player_count
+                ), *join)
+
+            for queue_name in leave:
+                result = self.leave_queue(guild_id=guild_id, member_id=member_id, queue_name=queue_name)
+
+                if result.ok:
+                    left.append(result)
+                else:
+                    errors.append(result.error)
+
+            for queue_name in join:
+                result = self.join_queue(guild_id=guild_id, member_id=member_id, queue_name=queue_name)
+
+                if result.ok:
+                    joined.append(result)
+                else:
+                    errors.append(result.error)
+
+            return QueueShortcutsResult(joined=joined, left=left, errors=errors)
+
+    def queues_of(self, guild_id: GuildId, member_id: MemberId) -> frozenset[str]:
+        return self._sm._queue_players.queues(guild_id, member_id)
+
+    def is_queued(self, guild_id: GuildId, member_id: MemberId) -> bool:
+        return self._sm._queue_players.is_queued(guild_id, member_id)
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Collection
+
+from domain.types import GuildId
+from managers.guild_state_manager import GuildStateManager
+from services.guild_purge_service import GuildPurgeService
+
+logger = logging.getLogger(__name__)
+
+
+class GuildPurgeManager:
+    """
+    Deletes the stored data of guilds the bot was removed from, in the background.
+        - The cached state is evicted right away, stored rows are kept for grace_period seconds
+        - Guilds the bot rejoins or finds on startup keep their data, their pending purge is cancelled
+        - Rows are deleted in chunks, one short transaction each with a pause in between, mass removals queue up
+          instead of holding locks other guilds wait for
+        - Pending purges are stored, a restarted process resumes them where they stopped
+    """
+
+    def __init__(
+            self,
+            guild_state_manager: GuildStateManager,
+            guild_purge_service: GuildPurgeService,
+            grace_period: float = 7 * 24 * 3600,
+            interval: float = 60,
+            chunk_pause: float = 0.05
+    ) -> None:
+        self._sm = guild_state_manager
+        self._service = guild_purge_service
+        self._grace_period = timedelta(seconds=grace_period)
+        self._interval = interval
+        self._chunk_pause = chunk_pause
+        self._task: asyncio.Task | None = None
+
+    async def on_guild_remove(self, guild_id: GuildId) -> None:
+        await self._sm.evict_guild_state(guild_id)
+        await self._service.schedule(guild_id, datetime.now(timezone.utc) + self._grace_period)
+
+    async def keep_guilds(self, guild_ids: Collection[GuildId]) -> None:
+        """Cancels pending purges of guilds the bot is in, call before their state is loaded."""
+        await self._service.cancel(guild_ids)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.purge_due()
+            except Exception:
+                logger.exception('guild purge failed')
+
+            await asyncio.sleep(self._interval)
+
+    async def purge_due(self) -> int:
+        """Purges every guild past its grace period, returns the number of deleted rows."""
+        deleted = 0
+
+        for guild_id in await self._service.fetch_due(datetime.now(timezone.utc)):
+            # Rejoined while its purge was pending and not cancelled, e.g. during a restart
+            if self._sm._cache[guild_id] is not None:
+                await self._service.cancel([guild_id])
+                continue
+
+            deleted += await self._purge_guild(guild_id)
+
+        return deleted
+
+    async def _purge_guild(self, guild_id: GuildId) -> int:
+        deleted = 0
+        chunks = 0
+
+        while True:
+            result = await self._service.purge_chunk(guild_id, datetime.now(timezone.utc))
+            deleted += result.deleted
+            chunks += 1
+
+            if result.done:
+                break
+
+            await asyncio.sleep(self._chunk_pause)
+
+        logger.info('guild purged', extra={'guild_id': guild_id, 'deleted_rows': deleted, 'chunks': chunks})
+        return deleted
@@ -1,29 +1,142 @@
 import asyncio
-from datetime import timedelta, timezone, datetime
+from contextlib import AsyncExitStack
 from dataclasses import replace
 from typing import Iterable
 
 from core.dto.guild_config_update_result import GuildConfigUpdateResult
 from core.dto.guild_info import GuildInfo
-from domain.guild_state import GuildState, GuildSettings, QueueState, GuildStateField, ActiveGuildPrompt
-from domain.types import GuildId, RoleId
+from core.dto.invalidation_event import InvalidationEvent
+from core.dto.queue_config import QueueConfig
+from db.query_tracer import traced_operation
+from db.dialect import chunked
+from domain.guild_state import GuildState, GuildSettings, QueueState, GuildStateField
+from domain.queue_constants import QUEUE_EXPIRY_TIMER
+from domain.types import GuildId, RoleId, ShardId, ChannelId, MemberId
+from managers.facades.autocomplete import AutocompleteFacade
 from managers.facades.permissions import PermissionsFacade
 from managers.facades.queue_configs import QueueConfigsFacade
+from managers.facades.queue_players import QueuePlayersFacade
+from managers.logic import permission, command_access
+from managers.logic.command_access import ChannelScope, PermissionScope, CommandPolicy
+from managers.logic.queue_shortcuts import ShortcutLookup, build_shortcut_lookup
+from managers.timer_scheduler import TimerScheduler
 from services.guild_queue_service import GuildQueueService
 from services.guild_repository_service import GuildRepositoryService, GuildNotCachedError
 from services.guild_state_cache import GuildStateCache
+from services.invalidation_channel import InvalidationChannel
+from services.member_permission_cache import MemberPermissionCache
+from services.name_index import NameIndex
+from services.queue_player_index import QueuePlayerIndex
 
 
 class GuildStateManager:
-    def __init__(self, guild_repository_service: GuildRepositoryService, guild_queue_service: GuildQueueService) -> None:
+    def __init__(
+            self,
+            guild_repository_service: GuildRepositoryService,
+            guild_queue_service: GuildQueueService,
+            invalidation_channel: InvalidationChannel | None = None,
+            timer_scheduler: TimerScheduler | None = None
+    ) -> None:
         self._cache = GuildStateCache()
         self._repository_service = guild_repository_service
         self._queue_service = guild_queue_service
         self._locks: dict[GuildId, asyncio.Lock] = {}
+        self._shard_guilds: dict[ShardId, set[GuildId]] = {}
+        self._command_bits: dict[str, int] = {}
+        self._command_scopes: dict[str, tuple[ChannelScope, PermissionScope]] = {}
+        self._command_policies: dict[str, CommandPolicy] = {}
+        self._channel_tables: dict[GuildId, dict[ChannelId, int]] = {}
+        self._member_permissions = MemberPermissionCache()
+
+        # Autocomplete indexes, queue name indexes are built on first use and kept in sync with the state
+        self._queue_name_indexes: dict[GuildId, NameIndex] = {}
+        self._command_name_index = NameIndex()
+
+        # Queues of each queued member, kept in sync with QueueState.player_ids
+        self._queue_players = QueuePlayerIndex()
+
+        # Expiry timers of queued players in queues with expire_after, without a scheduler queues never expire
+        self._timer_scheduler = timer_scheduler
+
+        # Queue shortcut tokens of each guild, built on first use and rebuilt when the queue set changes
+        self._shortcut_lookups: dict[GuildId, ShortcutLookup] = {}
+
+        # Cross process invalidation, versions are per origin and only used to drop duplicate events
+        self._invalidation = invalidation_channel or InvalidationChannel()
+        self._versions: dict[tuple[GuildId, GuildStateField], int] = {}
+        self._remote_versions: dict[tuple[str, GuildId, GuildStateField], int] = {}
 
         # Facades
         self.permissions = PermissionsFacade(self)
         self.queue_configs = QueueConfigsFacade(self)
+        self.queue_players = QueuePlayersFacade(self)
+        self.autocomplete = AutocompleteFacade(self)
+
+    @property
+    def command_bits(self) -> dict[str, int]:
+        return self._command_bits
+
+    def set_gated_commands(self, command_names: Iterable[str]) -> None:
+        """Assigns permission mask bits to the gated commands and recompiles cached masks."""
+        self._command_bits = permission.build_command_bits(command_names)
+        self._command_name_index = NameIndex(self._command_bits)
+        self._compile_command_policies()
+
+        for guild_id in self._cache.guild_ids():
+            state = self._cache[guild_id]
+
+            self._replace_state_field(
+                GuildId(guild_id),
+                'role_permission_masks',
+                permission.compile_role_permission_masks(state.role_command_permissions, self._command_bits)
+            )
+
+    def set_command_scopes(self, command_scopes: dict[str, tuple[ChannelScope, PermissionScope]]) -> None:
+        """Compiles the channel and permission scopes of every command into access policies."""
+        self._command_scopes = dict(command_scopes)
+        self._compile_command_policies()
+
+    def command_policy(
+            self,
+            command_name: str,
+            channel_scope: ChannelScope,
+            permission_scope: PermissionScope
+    ) -> CommandPolicy:
+        """Compiled policy of a command, commands unknown at startup are compiled on first use."""
+        policy = self._command_policies.get(command_name)
+
+        if policy is None:
+            self._command_scopes[command_name] = (channel_scope, permission_scope)
+            policy = command_access.compile_command_policy(
+                channel_scope, permission_scope, self._command_bits, command_name
+            )
+            self._command_policies[command_name] = policy
+
+        return policy
+
+    def _compile_command_policies(self) -> None:
+        self._command_policies = {
+            command_name: command_access.compile_command_policy(
+                channel_scope, permission_scope, self._command_bits, command_name
+            )
+            for command_name, (channel_scope, permission_scope) in self._command_scopes.items()
+        }
+
+    def _channel_table(self, guild_id: GuildId) -> dict[ChannelId, int]:
+        table = self._channel_tables.get(guild_id)
+
+        if table is None:
+            table = command_access.build_channel_table(self._require_state(guild_id).settings)
+            self._channel_tables[guild_id] = table
+
+        return table
+
+    def channel_role(self, guild_id: GuildId, channel_id: ChannelId) -> int:
+        """Channel role bits of a channel, CHANNEL_OTHER for unconfigured channels and guilds not cached."""
+        if self._cache[guild_id] is None:
+            return command_access.CHANNEL_OTHER
+
+        return self._channel_table(guild_id).get(channel_id, command_access.CHANNEL_OTHER)
 
     def acquire_lock(self, guild_id: GuildId) -> asyncio.Lock:
         return self._locks.setdefault(guild_id, asyncio.Lock())
@@ -37,14 +150,200 @@ class GuildStateManager:
         return state
 
     def _mutate_state(self, guild_id: GuildId, field: GuildStateField, value) -> GuildState:
+        """Replaces a state field after a database write and notifies other processes."""
+        new_state = self._replace_state_field(guild_id, field, value)
+
+        version = self._versions.get((guild_id, field), 0) + 1
+        self._versions[(guild_id, field)] = version
+
+        self._invalidation.publish(InvalidationEvent(
+            guild_id=guild_id,
+            field=field,
+            version=version,
+            origin=self._invalidation.origin
+        ))
+
+        return new_state
+
+    def _replace_state_field(self, guild_id: GuildId, field: GuildStateField, value) -> GuildState:
         state = self._require_state(guild_id)
         new_state = replace(state, **{field: value})  # type: ignore[misc]
         self._cache[guild_id] = new_state
 
+        if field == 'role_permission_masks':
+            self._member_permissions.invalidate_guild(guild_id)
+
+        if field == 'settings':
+            self._channel_tables[guild_id] = command_access.build_channel_table(value)
+
+        if field == 'queues':
+            removed_queues = state.queues.keys() - value.keys()
+
+            for queue_name in removed_queues:
+                self._queue_players.drop_queue(guild_id, queue_name, state.queues[queue_name].player_ids)
+                self._cancel_queue_expiries(guild_id, queue_name, state.queues[queue_name].player_ids)
+
+            # Expiry changed, locally or by another process, players queued already restart their timers now
+            for queue_name, queue in value.items():
+                previous = state.queues.get(queue_name)
+
+                if previous is not None and previous.queue_config.expire_after != queue.queue_config.expire_after:
+                    for member_id in queue.player_ids:
+                        self._schedule_queue_expiry(guild_id, member_id, queue)
+
+            if value.keys() != state.queues.keys():
+                self._shortcut_lookups.pop(guild_id, None)
+
+            if guild_id in self._queue_name_indexes:
+                self._queue_name_indexes[guild_id].update(
+                    added=value.keys() - state.queues.keys(),
+                    removed=removed_queues
+                )
+
         return new_state
 
+    def _schedule_queue_expiry(self, guild_id: GuildId, member_id: MemberId, queue: QueueState) -> None:
+        """Starts or restarts a queued player's expiry timer, cancels it if the queue does not expire."""
+        if self._timer_scheduler is None:
+            return
+
+        key = (QUEUE_EXPIRY_TIMER, guild_id, member_id, queue.queue_config.name)
+
+        if queue.queue_config.expire_after is None:
+            self._timer_scheduler.cancel(key)
+        else:
+            self._timer_scheduler.schedule(key, queue.queue_config.expire_after)
+
+    def _cancel_queue_expiries(self, guild_id: GuildId, queue_name: str, member_ids: Iterable[MemberId]) -> None:
+        if self._timer_scheduler is None:
+            return
+
+        for member_id in member_ids:
+            self._timer_scheduler.cancel((QUEUE_EXPIRY_TIMER, guild_id, member_id, queue_name))
+
+    def _queue_name_index(self, guild_id: GuildId) -> NameIndex:
+        index = self._queue_name_indexes.get(guild_id)
+
+        if index is None:
+            index = NameIndex(self._require_state(guild_id).queues.keys())
+            self._queue_name_indexes[guild_id] = index
+
+        return index
+
+    def _shortcut_lookup(self, guild_id: GuildId) -> ShortcutLookup:
+        lookup = self._shortcut_lookups.get(guild_id)
+
+        if lookup is None:
+            lookup = build_shortcut_lookup(self._require_state(guild_id).queues.keys())
+            self._shortcut_lookups[guild_id] = lookup
+
+        return lookup
+
+    async def start_invalidation(self) -> None:
+        await self._invalidation.start(
+            on_event=self._on_invalidation_event,
+            on_resync=self._on_invalidation_resync
+        )
+
+    async def close_invalidation(self) -> None:
+        await self._invalidation.close()
+
+    async def _on_invalidation_event(self, event: InvalidationEvent) -> None:
+        """Refreshes a state field mutated by another process."""
+        # Guild owned by another process
+        if self._cache[event.guild_id] is None:
+            return
+
+        version_key = (event.origin, event.guild_id, event.field)
+
+        if self._remote_versions.get(version_key, 0) >= event.version:
+            return
+
+        self._remote_versions[version_key] = event.version
+
+        async with self.acquire_lock(guild_id=event.guild_id):
+            await self._refresh_guilds([event.guild_id], fields=(event.field,))
+
+    async def _on_invalidation_resync(self) -> None:
+        """Events might have been missed, refreshes every cached guild."""
+        for guild_ids in chunked(sorted(self._cache.guild_ids())):
+            async with AsyncExitStack() as stack:
+                for guild_id in guild_ids:
+                    await stack.enter_async_context(self.acquire_lock(guild_id=GuildId(guild_id)))
+
+                await self._refresh_guilds(
+                    list(guild_ids),
+                    fields=('settings', 'role_command_permissions', 'queues')
+                )
+
+    @traced_operation('guild_state.refresh_guilds')
+    async def _refresh_guilds(self, guild_ids: list[GuildId], fields: Iterable[GuildStateField]) -> None:
+        """Reloads the given fields from the database, runtime queue state is kept."""
+        fields = set(fields)
+        fetched: dict[GuildStateField, dict] = {}
+
+        if 'settings' in fields:
+            fetched['settings'] = await self._repository_service.fetch_guilds_settings(
+                guild_infos=[GuildInfo(guild_id=guild_id, name='') for guild_id in guild_ids],
+                create_missing=False
+            )
+
+        if 'role_command_permissions' in fields:
+            fetched['role_command_permissions'] = await self._repository_service.fetch_guilds_role_permissions(
+                guild_ids=guild_ids
+            )
+
+        if 'queues' in fields:
+            fetched['queues'] = await self._queue_service.fetch_guilds_queues(guild_ids=guild_ids)
+
+        for guild_id in guild_ids:
+            state = self._cache[guild_id]
+
+            if state is None:
+                continue
+
+            if 'settings' in fetched:
+                settings = fetched['settings'].get(guild_id)
+
+                # Removed by another process
+                if settings is None:
+                    self._drop_guild(guild_id)
+                    continue
+
+                state = self._replace_state_field(guild_id, 'settings', settings)
+
+            if 'role_command_permissions' in fetched:
+                role_command_permissions = fetched['role_command_permissions'].get(guild_id, {})
+
+                self._replace_state_field(guild_id, 'role_command_permissions', role_command_permissions)
+                state = self._replace_state_field(
+                    guild_id,
+                    'role_permission_masks',
+                    permission.compile_role_permission_masks(role_command_permissions, self._command_bits)
+                )
+
+            if 'queues' in fetched:
+                self._replace_state_field(guild_id, 'queues', {
+                    config.name: QueueState(
+                        queue_config=config,
+                        player_ids=state.queues[config.name].player_ids if config.name in state.queues else set()
+                    )
+                    for config in fetched['queues'].get(guild_id, [])
+                })
+
+    def _track_shard(self, guild: GuildInfo) -> None:
+        if guild.shard_id is not None:
+            self._shard_guilds.setdefault(guild.shard_id, set()).add(guild.guild_id)
+
+    def shard_guild_counts(self) -> dict[ShardId, int]:
+        """Cached guild count of each shard owned by this process."""
+        return {shard_id: len(guild_ids) for shard_id, guild_ids in self._shard_guilds.items()}
+
+    @traced_operation('guild_state.register_guild')
     async def register_guild(self, guild: GuildInfo) -> None:
         """Loads and caches guild state if necessary."""
+        self._track_shard(guild)
+
         # Only register if not in cache
         if self._cache[guild.guild_id] is not None:
             return
@@ -59,21 +358,65 @@ class GuildStateManager:
             guild_role_permissions = await self._repository_service.fetch_guild_role_permissions(guild_id=guild.guild_id)
             guild_queue_configs = await self._queue_service.fetch_queues(guild_id=guild.guild_id)
 
-            self._cache[guild.guild_id] = GuildState(
+            self._cache[guild.guild_id] = self._build_guild_state(
                 settings=guild_settings,
                 role_command_permissions=guild_role_permissions,
-                queues= {
-                    config.name: QueueState(
-                        queue_config=config, player_ids=set()
-                    )
-                    for config in guild_queue_configs
-                }
+                queue_configs=guild_queue_configs
             )
 
+    @traced_operation('guild_state.register_guilds')
     async def register_guilds(self, guilds: Iterable[GuildInfo]) -> None:
+        """Loads and caches the state of multiple guilds with a fixed amount of bulk queries."""
+        uncached_guilds: list[GuildInfo] = []
+
         for guild in guilds:
-            await self.register_guild(guild)
+            self._track_shard(guild)
+
+            if self._cache[guild.guild_id] is None:
+                uncached_guilds.append(guild)
+
+        if not uncached_guilds:
+            return
+
+        guild_ids = [guild.guild_id for guild in uncached_guilds]
 
+        guilds_settings = await self._repository_service.fetch_guilds_settings(guild_infos=uncached_guilds)
+        guilds_role_permissions = await self._repository_service.fetch_guilds_role_permissions(guild_ids=guild_ids)
+        guilds_queue_configs = await self._queue_service.fetch_guilds_queues(guild_ids=guild_ids)
+
+        for guild_id in guild_ids:
+            # Registered individually in the meantime
+            if self._cache[guild_id] is not None:
+                continue
+
+            self._cache[guild_id] = self._build_guild_state(
+                settings=guilds_settings[guild_id],
+                role_command_permissions=guilds_role_permissions.get(guild_id, {}),
+                queue_configs=guilds_queue_configs.get(guild_id, [])
+            )
+
+    def _build_guild_state(
+            self,
+            settings: GuildSettings,
+            role_command_permissions: dict[RoleId, set[str]],
+            queue_configs: Iterable[QueueConfig]
+    ) -> GuildState:
+        return GuildState(
+            settings=settings,
+            role_command_permissions=role_command_permissions,
+            role_permission_masks=permission.compile_role_permission_masks(
+                role_command_permissions,
+                self._command_bits
+            ),
+            queues={
+                config.name: QueueState(
+                    queue_config=config, player_ids=set()
+                )
+                for config in queue_configs
+            }
+        )
+
+    @traced_operation('guild_state.update_guild_config')
     async def update_guild_config(self, guild_settings: GuildSettings) -> GuildConfigUpdateResult:
         """Updates guild settings in database and cache."""
         if guild_settings.listen_channel_id == guild_settings.pickup_channel_id:
@@ -101,8 +444,7 @@ class GuildStateManager:
                 listen_channel_id=guild_settings.listen_channel_id
             )
 
-            new_state = replace(state, settings=new_settings)
-            self._cache[guild_settings.guild_id] = new_state
+            self._mutate_state(guild_settings.guild_id, 'settings', new_settings)
 
             return GuildConfigUpdateResult(ok=True, settings=new_settings, error=None)
 
@@ -112,31 +454,22 @@ class GuildStateManager:
     async def evict_guild_state(self, guild_id: GuildId) -> None:
         lock = self._locks.setdefault(guild_id, asyncio.Lock())
         async with lock:
-            if self._cache[guild_id] is not None:
-                del self._cache[guild_id]
-
-    def try_acquire_prompt_lease(self,
-                          guild_id: GuildId,
-                          prompt_type: ActiveGuildPrompt
-    ) -> bool:
-        """Attempts to lock a prompt, if in use returns False, on TTL expiration relocks."""
-        state = self._require_state(guild_id)
-        prompt_locks = state.active_prompts
+            self._drop_guild(guild_id)
 
-        TTL = 300 # Seconds
-        prompt_lock = prompt_locks.get(prompt_type, None)
+    def _drop_guild(self, guild_id: GuildId) -> None:
+        state = self._cache[guild_id]
 
-        if prompt_lock is None:
-            prompt_locks[prompt_type] = datetime.now(timezone.utc)
-            return True
+        if state is not None:
+            for queue_name, queue in state.queues.items():
+                self._cancel_queue_expiries(guild_id, queue_name, queue.player_ids)
 
-        # TTL
-        if datetime.now(timezone.utc) - prompt_lock > timedelta(seconds=TTL):
-            prompt_locks[prompt_type] = datetime.now(timezone.utc)
-            return True
+            del self._cache[guild_id]
 
-        return False
+        self._member_permissions.invalidate_guild(guild_id)
+        self._queue_name_indexes.pop(guild_id, None)
+        self._shortcut_lookups.pop(guild_id, None)
+        self._queue_players.drop_guild(guild_id)
+        self._channel_tables.pop(guild_id, None)
 
-    def release_prompt_lease(self, guild_id: GuildId, prompt_type: ActiveGuildPrompt):
-        state = self._require_state(guild_id)
-        state.active_prompts.pop(prompt_type, None)
\ No newline at end of file
+        for guild_ids in self._shard_guilds.values():
+            guild_ids.discard(guild_id)
@@ -1,9 +1,9 @@
-from collections.abc import Collection
+from collections.abc import Callable
+from dataclasses import dataclass
 from enum import Enum, auto
 
-from domain.guild_state import GuildState
-from domain.types import RoleId
-from managers.logic.permission import has_command_permission
+from domain.guild_state import GuildSettings
+from domain.types import ChannelId
 
 
 class ChannelScope(Enum):
@@ -17,40 +17,66 @@ class PermissionScope(Enum):
     GATED = auto()
     ADMIN = auto()
 
-def check_channel_scope(
-        state: GuildState,
-        required_scope: ChannelScope,
-        current_channel_id: int,
-) -> bool:
-    pickup_channel_id = state.settings.pickup_channel_id
-    listen_channel_id = state.settings.listen_channel_id
-
-    match required_scope:
-        case ChannelScope.GLOBAL:
-            return True
-        case ChannelScope.PICKUP:
-            return pickup_channel_id == current_channel_id
-        case ChannelScope.LISTEN:
-            return listen_channel_id == current_channel_id
-        case ChannelScope.PICKUP_LISTEN:
-            return listen_channel_id == current_channel_id or current_channel_id == pickup_channel_id
-
-def check_permission_scope(
-        state: GuildState,
-        required_scope: PermissionScope,
-        role_ids: Collection[RoleId],
-        is_admin: bool,
+# Channel roles in a guild's channel table, channels without a role are OTHER
+CHANNEL_PICKUP = 1 << 0
+CHANNEL_LISTEN = 1 << 1
+CHANNEL_OTHER = 1 << 2
+
+_CHANNEL_SCOPE_MASKS: dict[ChannelScope, int] = {
+    ChannelScope.GLOBAL: CHANNEL_PICKUP | CHANNEL_LISTEN | CHANNEL_OTHER,
+    ChannelScope.PICKUP: CHANNEL_PICKUP,
+    ChannelScope.LISTEN: CHANNEL_LISTEN,
+    ChannelScope.PICKUP_LISTEN: CHANNEL_PICKUP | CHANNEL_LISTEN,
+}
+
+@dataclass(frozen=True)
+class CommandPolicy:
+    """Access requirements of a command, compiled once from the scopes of its cog."""
+    channel_mask: int
+    permission_scope: PermissionScope
+    command_bit: int
+
+def compile_command_policy(
+        channel_scope: ChannelScope,
+        permission_scope: PermissionScope,
+        command_bits: dict[str, int],
         command_name: str
+) -> CommandPolicy:
+    return CommandPolicy(
+        channel_mask=_CHANNEL_SCOPE_MASKS[channel_scope],
+        permission_scope=permission_scope,
+        command_bit=command_bits.get(command_name, 0)
+    )
+
+def build_channel_table(settings: GuildSettings) -> dict[ChannelId, int]:
+    """Maps the configured channels of a guild to their channel role."""
+    table: dict[ChannelId, int] = {}
+
+    if settings.pickup_channel_id is not None:
+        table[ChannelId(settings.pickup_channel_id)] = CHANNEL_PICKUP
+
+    if settings.listen_channel_id is not None:
+        table[ChannelId(settings.listen_channel_id)] = table.get(
+            ChannelId(settings.listen_channel_id), 0
+        ) | CHANNEL_LISTEN
+
+    return table
+
+def check_command_access(
+        policy: CommandPolicy,
+        channel_table: dict[ChannelId, int],
+        current_channel_id: ChannelId,
+        is_admin: bool,
+        command_mask: Callable[[], int]
 ) -> bool:
-    match required_scope:
-        case PermissionScope.EVERYONE:
-            return True
-        case PermissionScope.GATED:
-            return has_command_permission(
-                state=state,
-                command_name=command_name,
-                role_ids=role_ids,
-                is_admin=is_admin
-            )
-        case PermissionScope.ADMIN:
-            return is_admin
+    """Channel and permission check, command_mask is only evaluated for gated commands."""
+    if not channel_table.get(current_channel_id, CHANNEL_OTHER) & policy.channel_mask:
+        return False
+
+    if policy.permission_scope is PermissionScope.EVERYONE or is_admin:
+        return True
+
+    if policy.permission_scope is PermissionScope.ADMIN:
+        return False
+
+    return (command_mask() & policy.command_bit) != 0
@@ -15,27 +15,22 @@ def _filter_role_permissions(
         state: GuildState,
         intersection: bool,
         role_id: RoleId,
-        command_names: list[str],
-        valid_command_names: list[str]
+        command_names: Iterable[str],
+        valid_command_names: Iterable[str]
 ) -> set[str]:
     """Checks given commands for validity and performs a difference or intersection check against the given role_id."""
     # Validate command names
-    command_names = [command for command in command_names if command in valid_command_names]
+    valid_commands = set(command_names).intersection(valid_command_names)
 
-    if not command_names:
+    if not valid_commands:
         return set()
 
-    role_associated_permissions: set[str] = set()
-
-    if role_id in state.role_command_permissions:
-        role_associated_permissions = state.role_command_permissions[role_id]
+    role_associated_permissions = state.role_command_permissions.get(role_id, set())
 
     if intersection:
-        left_permissions = list(set(command_names) & role_associated_permissions)
-    else:
-        left_permissions = list(set(command_names) - role_associated_permissions)
+        return valid_commands & role_associated_permissions
 
-    return set(left_permissions)
+    return valid_commands - role_associated_permissions
 
 
 def plan_add_role_permissions(
@@ -119,8 +114,40 @@ def plan_remove_elevated_roles(
         role_ids=_filter_roles_present_in_cache(state=state, role_ids=role_ids)
     )
 
+def build_command_bits(command_names: Iterable[str]) -> dict[str, int]:
+    """Assigns one bit per gated command, sorted to keep bits stable between restarts."""
+    return {name: 1 << i for i, name in enumerate(sorted(set(command_names)))}
+
+def compile_role_mask(command_names: Iterable[str], command_bits: dict[str, int]) -> int:
+    mask = 0
+
+    for command_name in command_names:
+        mask |= command_bits.get(command_name, 0)
+
+    return mask
+
+def compile_role_permission_masks(
+        role_command_permissions: dict[RoleId, set[str]],
+        command_bits: dict[str, int]
+) -> dict[RoleId, int]:
+    return {
+        role_id: compile_role_mask(command_names, command_bits)
+        for role_id, command_names in role_command_permissions.items()
+    }
+
+def effective_command_mask(state: GuildState, role_ids: Iterable[RoleId]) -> int:
+    """Combined command mask of all given roles."""
+    mask = 0
+
+    # Lookups run in C, most member roles hold no command and are skipped before the loop body
+    for role_mask in filter(None, map(state.role_permission_masks.get, role_ids)):
+        mask |= role_mask
+
+    return mask
+
 def has_command_permission(
         state: GuildState,
+        command_bits: dict[str, int],
         command_name: str,
         role_ids: Iterable[RoleId],
         is_admin: bool
@@ -129,12 +156,26 @@ def has_command_permission(
     if is_admin:
         return True
 
-    elevated_roles = state.role_command_permissions
+    command_bit = command_bits.get(command_name, 0)
 
-    for role_id in role_ids:
-        perms = elevated_roles.get(role_id)
+    # Not a gated command
+    if not command_bit:
+        return False
 
-        if perms and command_name in perms:
+    for role_mask in filter(None, map(state.role_permission_masks.get, role_ids)):
+        if role_mask & command_bit:
             return True
 
     return False
+
+def mask_has_command_permission(
+        command_bits: dict[str, int],
+        command_name: str,
+        command_mask: int,
+        is_admin: bool
+) -> bool:
+    """Checks a precomputed effective command mask, see effective_command_mask."""
+    if is_admin:
+        return True
+
+    return (command_mask & command_bits.get(command_name, 0)) != 0
@@ -1,13 +1,16 @@
 import re
 from dataclasses import dataclass
-from typing import Iterable, Collection
+from itertools import compress
+from typing import Iterable, Collection, Sequence
 
 from core.dto.queue_config import QueueConfig
 from domain.guild_state import GuildState, QueueState
 from domain.queue_constants import MIN_QUEUE_NAME_LENGTH, MAX_QUEUE_NAME_LENGTH, MAX_PLAYER_COUNT, MIN_PLAYER_COUNT, \
-    MIN_TEAM_COUNT, MAX_TEAM_COUNT, MAX_GUILD_QUEUE_COUNT
+    MIN_TEAM_COUNT, MAX_TEAM_COUNT, MAX_GUILD_QUEUE_COUNT, MAX_QUEUE_EXPIRY
 from domain.types import GuildId
 
+_QUEUE_NAME_PATTERN = re.compile(r"^[\w\-]+$", re.UNICODE)
+
 def _filter_queue_names(
         state: GuildState,
         intersection: bool,
@@ -18,33 +21,58 @@ def _filter_queue_names(
     else:
         return [queue for queue in queue_names if queue not in state.queues.keys()]
 
-def _validate_queue_data_like(
-        data: QueueCreationData | QueueConfig
-) -> list[str]:
-    """Validate queue config like data, returns a list of possible errors."""
-    errors: list[str] = []
-
-    # Common in QueueCreationData and QueueConfig
-    if not re.compile(r"^[\w\-]+$", re.UNICODE).fullmatch(data.name):
-        errors.append(f'Queue name may contain only letters, numbers, underscores (_) and hyphens (-)')
-
-    if not (MIN_QUEUE_NAME_LENGTH <= len(data.name) <= MAX_QUEUE_NAME_LENGTH):
-        errors.append(f'Queue name length must be between {MIN_QUEUE_NAME_LENGTH} and {MAX_QUEUE_NAME_LENGTH}')
-
-    if not (MIN_PLAYER_COUNT <= data.player_count <= MAX_PLAYER_COUNT):
-        errors.append(f'Player count must be between {MIN_PLAYER_COUNT} and {MAX_PLAYER_COUNT}')
+def validate_queues_data_like(
+        data: Sequence[QueueCreationData | QueueConfig]
+) -> list[list[str]]:
+    """
+    Validate queue config like data, returns the possible errors of each entry in input order.
+        - Vectorized, each rule is one comprehension over a column of the whole input
+        - Errors are only collected for rules that failed somewhere
+    """
+    names = [entry.name for entry in data]
+    player_counts = [entry.player_count for entry in data]
+    team_counts = [entry.team_count for entry in data]
+    expiries = [entry.expire_after for entry in data]
+
+    # (failed mask, error) of every rule
+    rules: list[tuple[list[bool], str]] = [
+        (
+            [not _QUEUE_NAME_PATTERN.fullmatch(name) for name in names],
+            'Queue name may contain only letters, numbers, underscores (_) and hyphens (-)'
+        ),
+        (
+            [not MIN_QUEUE_NAME_LENGTH <= len(name) <= MAX_QUEUE_NAME_LENGTH for name in names],
+            f'Queue name length must be between {MIN_QUEUE_NAME_LENGTH} and {MAX_QUEUE_NAME_LENGTH}'
+        ),
+        (
+            [not MIN_PLAYER_COUNT <= count <= MAX_PLAYER_COUNT for count in player_counts],
+            f'Player count must be between {MIN_PLAYER_COUNT} and {MAX_PLAYER_COUNT}'
+        ),
+        (
+            [not MIN_TEAM_COUNT <= count <= MAX_TEAM_COUNT for count in team_counts],
+            f'Team count must be between {MIN_TEAM_COUNT} and {MAX_TEAM_COUNT}'
+        ),
+        (
+            # A team count of 0 fails the range rule already
+            [
+                team_count != 0 and player_count % team_count != 0
+                for player_count, team_count in zip(player_counts, team_counts)
+            ],
+            'Player count must be evenly divisible by team count'
+        ),
+        (
+            [expiry is not None and not 0 < expiry <= MAX_QUEUE_EXPIRY for expiry in expiries],
+            f'Expiry must be between 1 and {MAX_QUEUE_EXPIRY} seconds'
+        ),
+    ]
+
+    errors: list[list[str]] = [[] for _ in data]
+
+    for failed, error in rules:
+        if any(failed):
+            for i in compress(range(len(failed)), failed):
+                errors[i].append(error)
 
-    if not (MIN_TEAM_COUNT <= data.team_count <= MAX_TEAM_COUNT):
-        errors.append(f'Team count must be between {MIN_TEAM_COUNT} and {MAX_TEAM_COUNT}')
-
-    if not data.player_count % data.team_count == 0:
-        errors.append('Player count must be evenly divisible by team count')
-
-    if isinstance(data, QueueCreationData):
-        return errors
-
-    # QueueConfig extras
-    # ...
     return errors
 
 @dataclass(frozen=True)
@@ -58,6 +86,7 @@ class QueueCreationData:
     name: str
     player_count: int
     team_count: int
+    expire_after: int | None = None
 
 def plan_create_queues(
     state: GuildState,
@@ -77,16 +106,17 @@ def plan_create_queues(
                 name=name,
                 player_count=q.player_count,
                 team_count=q.team_count,
+                expire_after=q.expire_after,
             ))
 
     # Check if already stored
-    valid_queue_names = _filter_queue_names(
+    valid_queue_names = set(_filter_queue_names(
         state=state,
         intersection=False,
         queue_names=seen,
-    )
+    ))
 
-    already_stored = seen - set(valid_queue_names)
+    already_stored = seen - valid_queue_names
 
     for already_stored_queue in already_stored:
         errors.setdefault(already_stored_queue, []).append('Already stored')
@@ -96,9 +126,7 @@ def plan_create_queues(
 
     valid_queues: list[QueueCreationData] = []
 
-    for queue in pre_validated_queues:
-        validation_errors = _validate_queue_data_like(queue)
-
+    for queue, validation_errors in zip(pre_validated_queues, validate_queues_data_like(pre_validated_queues)):
         if validation_errors:
             errors.setdefault(queue.name, []).extend(validation_errors)
         else:
@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+from typing import Iterable
+
+JOIN_EVERY_TOKEN = '++'
+LEAVE_EVERY_TOKEN = '--'
+
+@dataclass(frozen=True)
+class ShortcutPlan:
+    every: bool | None  # True joins, False leaves every queue before join and leave are applied
+    join: tuple[str, ...]
+    leave: tuple[str, ...]
+
+# Key: token as typed, Value: plan of a message consisting of that token only
+ShortcutLookup = dict[str, ShortcutPlan]
+
+def build_shortcut_lookup(queue_names: Iterable[str]) -> ShortcutLookup:
+    """
+    Plans of every single token shortcut of a guild, built once per queue set.
+        - Queue names are stored lowercase, tokens are keyed lowercase
+        - A message of a single known token is served with the prebuilt plan, without splitting or lowercasing
+    """
+    lookup: ShortcutLookup = {
+        JOIN_EVERY_TOKEN: ShortcutPlan(every=True, join=(), leave=()),
+        LEAVE_EVERY_TOKEN: ShortcutPlan(every=False, join=(), leave=()),
+    }
+
+    for name in queue_names:
+        lookup[f'+{name}'] = ShortcutPlan(every=None, join=(name,), leave=())
+        lookup[f'-{name}'] = ShortcutPlan(every=None, join=(), leave=(name,))
+
+    return lookup
+
+def parse_shortcuts(content: str, lookup: ShortcutLookup) -> ShortcutPlan | None:
+    """
+    Plan of the shortcut tokens of a message, None if it has none and is chat.
+        - Tokens naming no queue are ignored, "+ctf gl hf" joins ctf
+        - Messages with a single shortcut token are served with its prebuilt plan
+    """
+    plan = lookup.get(content)
+
+    if plan is not None:
+        return plan
+
+    plans = [plan for token in content.lower().split() if (plan := lookup.get(token)) is not None]
+
+    if len(plans) > 1:
+        return _merge_plans(plans)
+
+    return plans[0] if plans else None
+
+def _merge_plans(plans: list[ShortcutPlan]) -> ShortcutPlan:
+    """A later token on the same queue overrides an earlier one, ++ and -- drop the tokens before them."""
+    every: bool | None = None
+    actions: dict[str, bool] = {}
+
+    for plan in plans:
+        if plan.every is not None:
+            every = plan.every
+            actions.clear()
+            continue
+
+        for name in plan.join:
+            actions[name] = True
+
+        for name in plan.leave:
+            actions[name] = False
+
+    return ShortcutPlan(
+        every=every,
+        join=tuple([name for name, join in actions.items() if join]),
+        leave=tuple([name for name, join in actions.items() if not join])
+    )
@@ -0,0 +1,196 @@
+import csv
+import io
+import json
+from dataclasses import dataclass
+from typing import Any, Iterator, Literal, Mapping, Sequence
+
+from domain.guild_state import GuildState
+from domain.types import RoleId
+from managers.logic.queue_config import QueueCreationData, validate_queues_data_like
+
+TransferFormat = Literal['csv', 'ndjson']
+
+# Columns of a CSV file, the keys of an NDJSON record, queue rows leave the role columns empty and vice versa
+TRANSFER_COLUMNS = ('kind', 'name', 'player_count', 'team_count', 'expire_after', 'role_id', 'role', 'permission')
+
+_FORMATS_BY_EXTENSION: dict[str, TransferFormat] = {
+    'csv': 'csv',
+    'ndjson': 'ndjson',
+    'jsonl': 'ndjson',
+}
+
+@dataclass(frozen=True)
+class PermissionRow:
+    role_id: RoleId | None  # Matched first, role ids differ between guilds
+    role_name: str | None
+    permission: str
+
+@dataclass(frozen=True)
+class TransferBatch:
+    queues: list[tuple[int, QueueCreationData]]  # (line, queue) of valid queue rows
+    permissions: list[tuple[int, PermissionRow]]
+    errors: list[tuple[int, str]]  # (line, error)
+
+def format_of(filename: str) -> TransferFormat | None:
+    return _FORMATS_BY_EXTENSION.get(filename.rpartition('.')[2].lower())
+
+def parse_csv_header(line: str) -> tuple[str, ...]:
+    """Column names of a CSV file, ValueError without a kind column."""
+    header = tuple(column.strip().lower() for column in next(csv.reader([line]), []))
+
+    if 'kind' not in header:
+        raise ValueError(f'CSV header needs a kind column, e.g. {",".join(TRANSFER_COLUMNS)}')
+
+    return header
+
+def _int(row: Mapping[str, Any], column: str, default: int | None = None) -> int | None:
+    value = row.get(column)
+
+    if value is None or value == '':
+        return default
+
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+
+    raise ValueError(f'{column} must be a whole number')
+
+def _text(row: Mapping[str, Any], column: str) -> str | None:
+    value = row.get(column)
+
+    if value is None or value == '':
+        return None
+
+    return str(value).strip()
+
+def _parse_row(row: Mapping[str, Any]) -> QueueCreationData | PermissionRow:
+    match (_text(row, 'kind') or '').lower():
+        case 'queue':
+            name = _text(row, 'name')
+            player_count = _int(row, 'player_count')
+
+            if name is None or player_count is None:
+                raise ValueError('Queue rows need a name and a player_count')
+
+            return QueueCreationData(
+                name=name,
+                player_count=player_count,
+                team_count=_int(row, 'team_count', default=2),
+                expire_after=_int(row, 'expire_after')
+            )
+        case 'permission':
+            role_id = _int(row, 'role_id')
+            role_name = _text(row, 'role')
+            command_name = _text(row, 'permission')
+
+            if (role_id is None and role_name is None) or command_name is None:
+                raise ValueError('Permission rows need a role_id or role and a permission')
+
+            return PermissionRow(
+                role_id=RoleId(role_id) if role_id is not None else None,
+                role_name=role_name,
+                permission=command_name
+            )
+        case kind:
+            raise ValueError(f'Unknown kind {kind!r}, expected queue or permission')
+
+def parse_batch(
+        lines: Sequence[tuple[int, str]],
+        transfer_format: TransferFormat,
+        header: Sequence[str] = TRANSFER_COLUMNS
+) -> TransferBatch:
+    """
+    Parses and validates a batch of (line number, line), one record per line.
+        - CSV lines are read by one csv reader per batch, NDJSON lines are JSON objects
+        - Queue rows are validated at once for the whole batch, invalid ones become errors
+    """
+    records: list[Mapping[str, Any] | None] = []
+    errors: list[tuple[int, str]] = []
+
+    if transfer_format == 'csv':
+        records.extend(dict(zip(header, values)) for values in csv.reader(line for _, line in lines))
+    else:
+        for _, line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+
+            records.append(record if isinstance(record, dict) else None)
+
+    queues: list[tuple[int, QueueCreationData]] = []
+    permissions: list[tuple[int, PermissionRow]] = []
+
+    for (line_number, _), record in zip(lines, records):
+        if record is None:
+            errors.append((line_number, 'Not a JSON object'))
+            continue
+
+        try:
+            entry = _parse_row(record)
+        except ValueError as e:
+            errors.append((line_number, str(e)))
+            continue
+
+        if isinstance(entry, QueueCreationData):
+            queues.append((line_number, entry))
+        else:
+            permissions.append((line_number, entry))
+
+    valid_queues: list[tuple[int, QueueCreationData]] = []
+
+    for (line_number, queue), queue_errors in zip(queues, validate_queues_data_like([queue for _, queue in queues])):
+        if queue_errors:
+            errors.extend((line_number, f'{queue.name}: {error}') for error in queue_errors)
+        else:
+            valid_queues.append((line_number, queue))
+
+    return TransferBatch(queues=valid_queues, permissions=permissions, errors=errors)
+
+def export_lines(
+        state: GuildState,
+        transfer_format: TransferFormat,
+        role_names: Mapping[RoleId, str]
+) -> Iterator[str]:
+    """Lines of a guild's queues and role permissions, newline terminated, importable by parse_batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+
+    def line(record: dict[str, Any]) -> str:
+        if transfer_format == 'ndjson':
+            return json.dumps({k: v for k, v in record.items() if v is not None}, separators=(',', ':')) + '\n'
+
+        writer.writerow(record.get(column, '') for column in TRANSFER_COLUMNS)
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+        return value
+
+    if transfer_format == 'csv':
+        yield ','.join(TRANSFER_COLUMNS) + '\n'
+
+    for name, queue in sorted(state.queues.items()):
+        config = queue.queue_config
+
+        yield line({
+            'kind': 'queue',
+            'name': name,
+            'player_count': config.player_count,
+            'team_count': config.team_count,
+            'expire_after': config.expire_after,
+        })
+
+    for role_id, command_names in sorted(state.role_command_permissions.items()):
+        for command_name in sorted(command_names):
+            yield line({
+                'kind': 'permission',
+                'role_id': role_id,
+                'role': role_names.get(role_id),
+                'permission': command_name,
+            })
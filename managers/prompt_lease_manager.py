@@ -0,0 +1,93 @@
+import itertools
+import logging
+from dataclasses import dataclass
+from typing import Mapping
+
+from domain.guild_state import ActiveGuildPrompt
+from domain.types import GuildId, MemberId
+from managers.timer_scheduler import TimerKey, TimerScheduler
+
+logger = logging.getLogger(__name__)
+
+TIMER_KIND = 'prompt_lease'
+
+# Seconds until an unreleased lease expires, above the timeout of the prompt's view
+PROMPT_TTLS: Mapping[ActiveGuildPrompt, float] = {
+    'QueueRemovalPrompt': 90,
+}
+
+@dataclass(frozen=True)
+class PromptLease:
+    guild_id: GuildId
+    prompt_type: ActiveGuildPrompt
+    member_id: MemberId | None  # None for guild wide prompts
+    lease_id: int
+
+class PromptLeaseManager:
+    """
+    Leases of interactive prompts, e.g. one queue removal confirmation per guild at a time.
+        - Guild wide leases have no member, member leases allow one prompt of a type per member
+        - Leases expire after their type's TTL on the shared timer scheduler, also if the prompt never releases them
+        - Releasing checks the lease id, a prompt outliving its lease can't release its successor's lease
+    """
+
+    def __init__(self, timer_scheduler: TimerScheduler, ttls: Mapping[ActiveGuildPrompt, float] = PROMPT_TTLS) -> None:
+        self._scheduler = timer_scheduler
+        self._ttls = dict(ttls)
+        self._lease_ids = itertools.count(1)
+
+        # Key: (guild, prompt type, member), Value: lease id
+        self._leases: dict[tuple[GuildId, ActiveGuildPrompt, MemberId | None], int] = {}
+        self._counts: dict[ActiveGuildPrompt, int] = dict.fromkeys(self._ttls, 0)
+
+        timer_scheduler.add_handler(TIMER_KIND, self._on_expired)
+
+    def try_acquire(
+            self,
+            guild_id: GuildId,
+            prompt_type: ActiveGuildPrompt,
+            member_id: MemberId | None = None
+    ) -> PromptLease | None:
+        """Leases a prompt, None while it is leased."""
+        key = (guild_id, prompt_type, member_id)
+
+        if key in self._leases:
+            return None
+
+        lease = PromptLease(guild_id=guild_id, prompt_type=prompt_type, member_id=member_id, lease_id=next(self._lease_ids))
+
+        self._leases[key] = lease.lease_id
+        self._counts[prompt_type] += 1
+        self._scheduler.schedule((TIMER_KIND, *key), self._ttls[prompt_type])
+
+        return lease
+
+    def release(self, lease: PromptLease) -> bool:
+        """Ends a lease, False if it expired already."""
+        key = (lease.guild_id, lease.prompt_type, lease.member_id)
+
+        if self._leases.get(key) != lease.lease_id:
+            return False
+
+        del self._leases[key]
+        self._counts[lease.prompt_type] -= 1
+        self._scheduler.cancel((TIMER_KIND, *key))
+
+        return True
+
+    def is_leased(self, guild_id: GuildId, prompt_type: ActiveGuildPrompt, member_id: MemberId | None = None) -> bool:
+        return (guild_id, prompt_type, member_id) in self._leases
+
+    def counts(self) -> dict[ActiveGuildPrompt, int]:
+        """Active leases per prompt type."""
+        return dict(self._counts)
+
+    def __len__(self) -> int:
+        return len(self._leases)
+
+    async def _on_expired(self, keys: list[TimerKey]) -> None:
+        for _, guild_id, prompt_type, member_id in keys:
+            if self._leases.pop((guild_id, prompt_type, member_id), None) is not None:  # type: ignore[arg-type]
+                self._counts[prompt_type] -= 1  # type: ignore[index]
+
+        logger.debug('prompt leases expired', extra={'leases': len(keys)})
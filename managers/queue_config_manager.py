@@ -1,9 +1,13 @@
 import asyncio
+import logging
 
 from domain.types import GuildId
 from managers.guild_state_manager import GuildStateManager
 from services.guild_queue_service import GuildQueueService
 
+logger = logging.getLogger(__name__)
+
+
 class QueueConfigManager:
     def __init__(self, guild_queue_service: GuildQueueService, guild_state_manager: GuildStateManager):
         self._guild_queue_service = guild_queue_service
@@ -36,6 +40,6 @@ class QueueConfigManager:
             queue_names=set(queues.keys())
         )
 
-        print(valid_queues)
+        logger.debug('queues to create', extra={'guild_id': guild_id, 'queues': valid_queues})
 
         # TODO: Cache check
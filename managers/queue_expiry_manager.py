@@ -0,0 +1,59 @@
+import logging
+from typing import Awaitable, Callable
+
+from domain.queue_constants import QUEUE_EXPIRY_TIMER
+from domain.types import GuildId, MemberId
+from managers.guild_state_manager import GuildStateManager
+from managers.queue_presence_manager import QueueRemoval
+from managers.timer_scheduler import TimerKey, TimerScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class QueueExpiryManager:
+    """
+    Removes players from queues with expire_after once they were queued that long.
+        - Timers live on the shared timer scheduler, started and cancelled by the queue player facade
+        - Timers of one tick arrive as one batch, removals are merged into one announcement per guild
+        - Without an announcement callback players are still removed
+    """
+
+    def __init__(self, guild_state_manager: GuildStateManager, timer_scheduler: TimerScheduler) -> None:
+        self._sm = guild_state_manager
+        self._on_expired: Callable[[dict[GuildId, list[QueueRemoval]]], Awaitable[None]] | None = None
+
+        timer_scheduler.add_handler(QUEUE_EXPIRY_TIMER, self._on_timers)
+
+    def start(self, on_expired: Callable[[dict[GuildId, list[QueueRemoval]]], Awaitable[None]]) -> None:
+        self._on_expired = on_expired
+
+    def stop(self) -> None:
+        self._on_expired = None
+
+    def expire(self, keys: list[TimerKey]) -> dict[GuildId, list[QueueRemoval]]:
+        """Removes the players of fired timers, returns the removals per guild."""
+        by_guild: dict[GuildId, list[tuple[MemberId, str]]] = {}
+
+        for _, guild_id, member_id, queue_name in keys:
+            by_guild.setdefault(guild_id, []).append((member_id, queue_name))  # type: ignore[arg-type]
+
+        removals: dict[GuildId, list[QueueRemoval]] = {}
+
+        for guild_id, expired in by_guild.items():
+            removed = self._sm.queue_players.expire_players(guild_id, expired)
+
+            if removed:
+                removals[guild_id] = [
+                    QueueRemoval(member_id=member_id, queue_names=queue_names, reason='expired')
+                    for member_id, queue_names in removed.items()
+                ]
+
+        return removals
+
+    async def _on_timers(self, keys: list[TimerKey]) -> None:
+        removals = self.expire(keys)
+
+        logger.debug('queue players expired', extra={'timers': len(keys), 'guilds': len(removals)})
+
+        if removals and self._on_expired is not None:
+            await self._on_expired(removals)
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Literal
+
+from domain.types import GuildId, MemberId
+from managers.guild_state_manager import GuildStateManager
+
+logger = logging.getLogger(__name__)
+
+RemovalReason = Literal['away', 'left', 'expired']
+
+@dataclass(frozen=True)
+class QueueRemoval:
+    member_id: MemberId
+    queue_names: frozenset[str]
+    reason: RemovalReason
+
+@dataclass(frozen=True)
+class PresenceTickResult:
+    events: int  # Presence and member remove events received since the previous tick
+    removals: dict[GuildId, list[QueueRemoval]]
+
+class QueuePresenceManager:
+    """
+    Removes queued players who stay offline or idle for away_timeout seconds, or who leave the guild.
+        - Events only record the latest state of a queued member, the work happens once per tick
+        - Presence updates of members outside of queues are dropped by a player index lookup, unless still tracked
+        - Joining a queue restarts the timeout, members joining while away are tracked from the next tick
+        - Away members are kept in the order they went away, expired ones are a prefix of that order
+        - An away_timeout of 0 only removes members leaving the guild
+    """
+
+    def __init__(
+            self,
+            guild_state_manager: GuildStateManager,
+            away_timeout: float = 600,
+            tick_interval: float = 1.0
+    ) -> None:
+        self._sm = guild_state_manager
+        self._away_timeout = away_timeout
+        self._tick_interval = tick_interval
+        self._task: asyncio.Task | None = None
+
+        # Buffered until the next tick, key: (guild, member) value: away
+        self._pending_presences: dict[tuple[GuildId, MemberId], bool] = {}
+        self._pending_joins: set[tuple[GuildId, MemberId]] = set()
+        self._pending_leaves: set[tuple[GuildId, MemberId]] = set()
+        self._events = 0
+
+        # Monotonic time each queued member went away, in insertion order
+        self._away_since: dict[tuple[GuildId, MemberId], float] = {}
+
+    def on_presence(self, guild_id: GuildId, member_id: MemberId, away: bool) -> None:
+        self._events += 1
+        key = (guild_id, member_id)
+
+        # Tracked members who left their queues are cleared by their next presence update
+        if self._away_timeout and (self._sm.queue_players.is_queued(guild_id, member_id) or key in self._away_since):
+            self._pending_presences[key] = away
+
+    def on_join(self, guild_id: GuildId, member_id: MemberId, away: bool) -> None:
+        """Seeds the state of a member who joined a queue, away is their current status."""
+        if self._away_timeout:
+            key = (guild_id, member_id)
+            self._pending_presences[key] = away
+            self._pending_joins.add(key)
+
+    def on_member_remove(self, guild_id: GuildId, member_id: MemberId) -> None:
+        self._events += 1
+
+        if self._sm.queue_players.is_queued(guild_id, member_id):
+            self._pending_leaves.add((guild_id, member_id))
+
+    def start(self, on_tick: Callable[[PresenceTickResult], Awaitable[None]]) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(on_tick))
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, on_tick: Callable[[PresenceTickResult], Awaitable[None]]) -> None:
+        while True:
+            await asyncio.sleep(self._tick_interval)
+
+            try:
+                await on_tick(self.process_tick(time.monotonic()))
+            except Exception:
+                logger.exception('presence tick failed')
+
+    def process_tick(self, now: float) -> PresenceTickResult:
+        """Applies the buffered events and removes expired away members and members who left."""
+        presences, self._pending_presences = self._pending_presences, {}
+        joins, self._pending_joins = self._pending_joins, set()
+        leaves, self._pending_leaves = self._pending_leaves, set()
+        events, self._events = self._events, 0
+
+        away_since = self._away_since
+        is_queued = self._sm.queue_players.is_queued
+
+        for key, away in presences.items():
+            # Re-inserted at the end, now is never earlier than the kept times
+            if key in joins:
+                away_since.pop(key, None)
+
+            if away and is_queued(*key):
+                away_since.setdefault(key, now)
+            else:
+                away_since.pop(key, None)
+
+        reasons: dict[tuple[GuildId, MemberId], RemovalReason] = dict.fromkeys(leaves, 'left')
+        deadline = now - self._away_timeout
+
+        for key, since in away_since.items():
+            if since > deadline:
+                break
+
+            reasons.setdefault(key, 'away')
+
+        by_guild: dict[GuildId, list[MemberId]] = {}
+
+        for key in reasons:
+            away_since.pop(key, None)
+            by_guild.setdefault(key[0], []).append(key[1])
+
+        removals: dict[GuildId, list[QueueRemoval]] = {}
+
+        for guild_id, member_ids in by_guild.items():
+            removed = self._sm.queue_players.remove_players(guild_id, member_ids)
+
+            if removed:
+                removals[guild_id] = [
+                    QueueRemoval(member_id=member_id, queue_names=queue_names, reason=reasons[(guild_id, member_id)])
+                    for member_id, queue_names in removed.items()
+                ]
+
+        return PresenceTickResult(events=events, removals=removals)
+
+    def __len__(self) -> int:
+        """Queued members currently away."""
+        return len(self._away_since)
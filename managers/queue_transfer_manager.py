@@ -0,0 +1,200 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterable, Callable, Iterator, Mapping
+
+from domain.queue_constants import MAX_GUILD_QUEUE_COUNT
+from domain.types import GuildId, RoleId
+from managers.guild_state_manager import GuildStateManager
+from managers.logic import queue_transfer
+from managers.logic.queue_config import QueueCreationData
+from managers.logic.queue_transfer import PermissionRow, TransferFormat
+
+logger = logging.getLogger(__name__)
+
+# Errors kept for the report, the rest is only counted
+MAX_REPORTED_ERRORS = 20
+
+@dataclass(frozen=True)
+class ImportResult:
+    rows: int
+    queues_created: int
+    permissions_added: int
+    errors: list[str]  # First MAX_REPORTED_ERRORS, prefixed with their line
+    error_count: int
+    incomplete: bool = False  # The lines could not be read to the end, see ImportSourceError
+
+class ImportSourceError(RuntimeError):
+    """Raised by the lines of an import that can't be read to the end, e.g. a failed download."""
+    pass
+
+class QueueTransferManager:
+    """
+    Streaming import and export of queue configs and role permissions, e.g. to copy them between guilds.
+        - Lines are consumed in batches of batch_size, memory is bounded by a batch and not by the file
+        - Each batch is parsed and validated at once, its permissions are written in one bulk insert
+        - Queues are created once at the end, a guild can't hold more than MAX_GUILD_QUEUE_COUNT of them anyway
+        - The loop gets control back after every batch
+    """
+
+    def __init__(self, guild_state_manager: GuildStateManager, batch_size: int = 500) -> None:
+        self._sm = guild_state_manager
+        self._batch_size = batch_size
+
+    def export_lines(
+            self,
+            guild_id: GuildId,
+            transfer_format: TransferFormat,
+            role_names: Mapping[RoleId, str]
+    ) -> Iterator[str]:
+        """Lines of the guild's queues and role permissions, generated lazily from the cached state."""
+        return queue_transfer.export_lines(self._sm.get_guild_state(guild_id), transfer_format, role_names)
+
+    async def import_lines(
+            self,
+            guild_id: GuildId,
+            lines: AsyncIterable[str],
+            transfer_format: TransferFormat,
+            valid_command_names: list[str],
+            resolve_role: Callable[[PermissionRow], RoleId | None],
+            allow_permissions: bool
+    ) -> ImportResult:
+        """
+        Imports queue and permission rows, rows failing validation are reported and skipped.
+            - resolve_role maps a row to a role of the guild, None for unknown roles
+            - Permission rows are rejected unless allow_permissions, granting needs the permission command
+            - CSV files start with a header naming their columns
+            - An ImportSourceError of the lines stops the import, permissions of the batches written so far stay,
+              the pending batch is dropped, no queues are created and the result is marked incomplete
+        """
+        errors: list[str] = []
+        error_count = 0
+
+        def report(line_number: int, error: str) -> None:
+            nonlocal error_count
+            error_count += 1
+
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(f'line {line_number}: {error}')
+
+        header = queue_transfer.TRANSFER_COLUMNS
+        header_pending = transfer_format == 'csv'
+        known_commands = set(valid_command_names)
+        queues: dict[str, QueueCreationData] = {}
+        queue_lines: dict[str, int] = {}
+        permissions_added = 0
+        rows = 0
+
+        async def flush(batch: list[tuple[int, str]]) -> None:
+            nonlocal permissions_added
+            parsed = queue_transfer.parse_batch(batch, transfer_format, header)
+
+            for line_number, error in parsed.errors:
+                report(line_number, error)
+
+            # Distinct queues only, the guild's limit bounds what has to be kept until the end
+            for line_number, queue in parsed.queues:
+                name = queue.name.lower()
+
+                if name in queues:
+                    report(line_number, f'{name}: Duplicate of line {queue_lines[name]}')
+                elif len(queues) >= MAX_GUILD_QUEUE_COUNT:
+                    report(line_number, f'{name}: Exceeded total queue amount of {MAX_GUILD_QUEUE_COUNT}')
+                else:
+                    queues[name] = queue
+                    queue_lines[name] = line_number
+
+            grants: dict[RoleId, set[str]] = {}
+
+            for line_number, row in parsed.permissions:
+                if not allow_permissions:
+                    report(line_number, 'Permission rows need the permission command')
+                    continue
+
+                role_id = resolve_role(row)
+
+                if role_id is None:
+                    report(line_number, f'Unknown role {row.role_name or row.role_id}')
+                elif row.permission not in known_commands:
+                    report(line_number, f'Unknown permission {row.permission}')
+                else:
+                    grants.setdefault(role_id, set()).add(row.permission)
+
+            if grants:
+                added = await self._sm.permissions.import_role_permissions(
+                    guild_id=guild_id,
+                    grants=grants,
+                    valid_command_names=valid_command_names
+                )
+                permissions_added += sum(len(command_names) for command_names in added.values())
+
+            await asyncio.sleep(0)
+
+        batch: list[tuple[int, str]] = []
+        line_number = 0
+        incomplete = False
+
+        try:
+            async for line in lines:
+                line_number += 1
+                line = line.rstrip('\r\n')
+
+                if not line.strip():
+                    continue
+
+                if header_pending:
+                    header_pending = False
+
+                    try:
+                        header = queue_transfer.parse_csv_header(line)
+                    except ValueError as e:
+                        report(line_number, str(e))
+                        break
+
+                    continue
+
+                rows += 1
+                batch.append((line_number, line))
+
+                if len(batch) >= self._batch_size:
+                    await flush(batch)
+                    batch = []
+        except ImportSourceError:
+            logger.warning('import source failed', extra={'guild_id': guild_id, 'line': line_number}, exc_info=True)
+            incomplete = True
+
+            # The last lines read might be cut off, the pending batch is not imported
+            rows -= len(batch)
+            batch = []
+
+        if batch:
+            await flush(batch)
+
+        queues_created = 0
+
+        if queues and not incomplete:
+            result = await self._sm.queue_configs.create_queues(guild_id=guild_id, queues=list(queues.values()))
+            queues_created = len(result.added_queues)
+
+            for name, queue_errors in sorted(result.errors.items()):
+                for error in queue_errors:
+                    report(queue_lines.get(name, 0), f'{name}: {error}')
+
+        logger.info('queues imported', extra={
+            'guild_id': guild_id,
+            'format': transfer_format,
+            'rows': rows,
+            'queues_created': queues_created,
+            'permissions_added': permissions_added,
+            'errors': error_count,
+            'incomplete': incomplete
+        })
+
+        return ImportResult(
+            rows=rows,
+            queues_created=queues_created,
+            permissions_added=permissions_added,
+            errors=errors,
+            error_count=error_count,
+            incomplete=incomplete
+        )
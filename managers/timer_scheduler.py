@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Hashable
+
+from services.timer_wheel import TimerWheel
+
+logger = logging.getLogger(__name__)
+
+# First element is the timer kind, selecting the handler, e.g. ('prompt_lease', guild_id, prompt_type, member_id)
+TimerKey = tuple[Hashable, ...]
+TimerHandler = Callable[[list[TimerKey]], Awaitable[None]]
+
+
+class TimerScheduler:
+    """
+    Timers of the whole process on one timer wheel, advanced by a single task.
+        - Expired timers are handed to the handler of their kind, one batch per kind and tick
+        - No task or sleep per timer, a timer costs its wheel entries only
+        - A failing handler is logged, the other kinds and later ticks still run
+    """
+
+    def __init__(self, resolution: float = 1.0, slots: int = 8192) -> None:
+        self._resolution = resolution
+        self._wheel: TimerWheel[TimerKey] = TimerWheel(resolution=resolution, slots=slots)
+        self._handlers: dict[Hashable, TimerHandler] = {}
+        self._task: asyncio.Task | None = None
+
+    def add_handler(self, kind: Hashable, handler: TimerHandler) -> None:
+        self._handlers[kind] = handler
+
+    def schedule(self, key: TimerKey, delay: float) -> None:
+        self._wheel.schedule(key, delay)
+
+    def cancel(self, key: TimerKey) -> bool:
+        return self._wheel.cancel(key)
+
+    def __contains__(self, key: TimerKey) -> bool:
+        return key in self._wheel
+
+    def __len__(self) -> int:
+        return len(self._wheel)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._resolution)
+            await self.process_tick(time.monotonic())
+
+    async def process_tick(self, now: float) -> int:
+        """Dispatches the timers due until now, returns their number."""
+        expired = self._wheel.advance(now)
+        batches: dict[Hashable, list[TimerKey]] = {}
+
+        for key in expired:
+            batches.setdefault(key[0], []).append(key)
+
+        for kind, keys in batches.items():
+            try:
+                await self._handlers[kind](keys)
+            except Exception:
+                logger.exception('timer handler failed', extra={'kind': kind, 'timers': len(keys)})
+
+        return len(expired)
@@ -0,0 +1,101 @@
+"""
+Micro-benchmark of queue name autocomplete, one call per keystroke.
+
+Compares the indexed and cached lookup against the previous scan and sort of all queue names.
+
+Usage (from the project root):
+    python -m scripts.bench_autocomplete --queues 2000
+"""
+import argparse
+import random
+import string
+import time
+
+from core.dto.queue_config import QueueConfig
+from domain.guild_state import GuildState, GuildSettings, QueueState
+from domain.types import GuildId
+from managers.guild_state_manager import GuildStateManager
+
+
+def scan_and_sort(names: list[str], current: str, excluded_lc: set[str]) -> list[str]:
+    """Reference implementation, lowercases and filters every name, sorts all candidates."""
+    current_lc = current.lower()
+
+    candidates = [
+        name
+        for name in names
+        if current_lc in name.lower() and name.lower() not in excluded_lc
+    ]
+
+    candidates.sort(key=lambda n: (not n.lower().startswith(current_lc), n.lower()))
+    return candidates[:25]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--queues', type=int, default=2000)
+    parser.add_argument('--inputs', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    names = list({
+        ''.join(rng.choices(string.ascii_letters + string.digits, k=rng.randint(3, 12)))
+        for _ in range(args.queues)
+    })
+
+    state = GuildState(
+        settings=GuildSettings(guild_id=GuildId(1), prefix='!'),
+        queues={
+            name: QueueState(queue_config=QueueConfig(name=name, player_count=8, team_count=2))
+            for name in names
+        }
+    )
+
+    # Only the cache is used, services are never touched
+    sm = GuildStateManager(guild_repository_service=None, guild_queue_service=None)  # type: ignore[arg-type]
+    sm._cache[GuildId(1)] = state
+
+    # Users typing queue names, every prefix of a name is one autocomplete call
+    inputs: list[str] = []
+    while len(inputs) < args.inputs:
+        name = rng.choice(names)
+        inputs.extend(name[:i] for i in range(len(name) + 1))
+
+    excluded_lc = {name.lower() for name in rng.sample(names, 3)}
+
+    start = time.perf_counter()
+    for current in inputs:
+        scan_and_sort(names, current, excluded_lc)
+    scan_time = time.perf_counter() - start
+
+    # Distinct inputs only, nothing is served from the result cache
+    distinct_inputs = list(dict.fromkeys(inputs))
+
+    start = time.perf_counter()
+    for current in distinct_inputs:
+        sm.autocomplete.queue_names(GuildId(1), current, excluded_lc)
+    cold_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for current in inputs:
+        sm.autocomplete.queue_names(GuildId(1), current, excluded_lc)
+    warm_time = time.perf_counter() - start
+
+    for current in distinct_inputs:
+        assert scan_and_sort(names, current, excluded_lc) == sm.autocomplete.queue_names(
+            GuildId(1), current, excluded_lc
+        ), current
+
+    scan_per_call = scan_time / len(inputs)
+    cold_per_call = cold_time / len(distinct_inputs)
+    warm_per_call = warm_time / len(inputs)
+
+    print(
+        f'{len(names)} queues, {len(inputs)} inputs'
+        f' | scan and sort {scan_per_call * 1e6:>7.1f} us'
+        f' | index {cold_per_call * 1e6:>7.1f} us ({scan_per_call / cold_per_call:>5.1f}x)'
+        f' | cached {warm_per_call * 1e6:>7.1f} us ({scan_per_call / warm_per_call:>5.1f}x)'
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+Memory and event throughput of the full and the lean gateway mode.
+
+Each mode runs in its own process, a PickupBot without a gateway connection is fed synthetic gateway payloads
+through discord.py's parsers, its event handlers run as they would on a live connection.
+    - Hydration: GUILD_CREATE per guild with every member, the state full mode reaches after member chunking
+    - Traffic: a stream of gateway events, events of intents the mode does not subscribe to are not delivered
+    - RSS is the resident set size of the process after hydration and after the event stream, freed payloads
+      stay with the allocator, the difference between the modes is what counts
+
+Usage (from the project root):
+    python -m scripts.bench_gateway_modes
+    python -m scripts.bench_gateway_modes --guilds 10 --members 20000 --events 500000
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import discord
+
+from bot.gateway import gateway_options
+from bot.pickupbot import PickupBot
+from core.app_context import setup
+from core.dto.guild_info import GuildInfo
+from db.init_tables import init_db
+from domain.types import GuildId, MemberId
+from managers.logic.queue_config import QueueCreationData
+
+# Share of each event type in the offered traffic and the intent Discord requires to send it
+EVENT_MIX: dict[str, tuple[int, str]] = {
+    'PRESENCE_UPDATE': (60, 'presences'),
+    'TYPING_START': (12, 'guild_typing'),
+    'MESSAGE_CREATE': (12, 'guild_messages'),
+    'MESSAGE_REACTION_ADD': (6, 'guild_reactions'),
+    'VOICE_STATE_UPDATE': (5, 'voice_states'),
+    'GUILD_MEMBER_UPDATE': (5, 'members'),
+}
+
+# Share of members in a queue, their presence updates reach the queue presence manager
+QUEUED_SHARE = 0.01
+
+GUILD_ID_BASE = 1 << 40
+MEMBER_ID_BASE = 1 << 41
+TIMESTAMP = '2024-01-01T00:00:00+00:00'
+BOT_USER_ID = 1 << 39
+
+
+def current_rss_mib() -> float:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def user_payload(member_id: int) -> dict:
+    return {'id': str(member_id), 'username': f'user{member_id}', 'discriminator': '0', 'avatar': None,
+            'global_name': None}
+
+
+def member_payload(member_id: int, role_ids: list[int]) -> dict:
+    return {'user': user_payload(member_id), 'roles': [str(role_id) for role_id in role_ids], 'joined_at': TIMESTAMP,
+            'deaf': False, 'mute': False, 'flags': 0}
+
+
+def guild_payload(guild_id: int, member_ids: range, role_ids: list[int]) -> dict:
+    return {
+        'id': str(guild_id), 'name': f'guild-{guild_id}', 'owner_id': str(member_ids[0]),
+        'member_count': len(member_ids), 'large': True,
+        'roles': [
+            {'id': str(role_id), 'name': f'role{role_id}', 'permissions': '0', 'position': i, 'color': 0,
+             'hoist': False, 'managed': False, 'mentionable': False, 'flags': 0}
+            for i, role_id in enumerate([guild_id] + role_ids)
+        ],
+        'channels': [
+            {'id': str(guild_id + 1), 'type': 0, 'name': 'pickup', 'position': 0, 'permission_overwrites': []}
+        ],
+        'members': [member_payload(member_id, role_ids[:member_id % 3]) for member_id in member_ids],
+        'presences': [
+            {'user': {'id': str(member_id)}, 'status': 'online', 'activities': [], 'client_status': {'desktop': 'online'}}
+            for member_id in member_ids
+        ],
+        'voice_states': [], 'emojis': [], 'stickers': [], 'features': [], 'threads': []
+    }
+
+
+def event_payload(event: str, guild_id: int, member_id: int, role_ids: list[int], rng: random.Random) -> dict:
+    channel_id = str(guild_id + 1)
+    member = member_payload(member_id, role_ids[:member_id % 3])
+
+    match event:
+        case 'PRESENCE_UPDATE':
+            status = rng.choice(('online', 'online', 'idle', 'dnd', 'offline'))
+            return {'user': {'id': str(member_id)}, 'guild_id': str(guild_id), 'status': status,
+                    'activities': [], 'client_status': {'desktop': status}}
+        case 'TYPING_START':
+            return {'channel_id': channel_id, 'guild_id': str(guild_id), 'user_id': str(member_id),
+                    'timestamp': int(time.time()), 'member': member}
+        case 'MESSAGE_CREATE':
+            return {'id': str(rng.getrandbits(60)), 'channel_id': channel_id, 'guild_id': str(guild_id),
+                    'author': member['user'], 'member': member, 'content': 'gg', 'timestamp': TIMESTAMP,
+                    'edited_timestamp': None, 'tts': False, 'mention_everyone': False, 'mentions': [],
+                    'mention_roles': [], 'attachments': [], 'embeds': [], 'pinned': False, 'type': 0}
+        case 'MESSAGE_REACTION_ADD':
+            return {'user_id': str(member_id), 'channel_id': channel_id, 'message_id': str(rng.getrandbits(60)),
+                    'guild_id': str(guild_id), 'emoji': {'id': None, 'name': '+'}, 'member': member,
+                    'burst': False, 'type': 0}
+        case 'VOICE_STATE_UPDATE':
+            return {'guild_id': str(guild_id), 'channel_id': None, 'user_id': str(member_id), 'member': member,
+                    'session_id': 'session', 'deaf': False, 'mute': False, 'self_deaf': False,
+                    'self_mute': False, 'self_video': False, 'suppress': False,
+                    'request_to_speak_timestamp': None}
+        case _:
+            return {'guild_id': str(guild_id), **member}
+
+
+async def run_mode(lean: bool, guilds: int, members: int, events: int, seed: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        app_context = setup(f'sqlite+aiosqlite:///{os.path.join(tmp, "gateway.db")}')
+
+        bot = PickupBot(
+            manager_context=app_context.manager_context,
+            engine=app_context.engine,
+            metrics=app_context.metrics,
+            command_prefix='!',
+            **gateway_options(lean)
+        )
+
+        # Sets the loop discord.py dispatches events on, normally done by login
+        await bot._async_setup_hook()
+        await init_db(app_context.engine, [])
+
+        state = bot._connection
+        # Members are part of GUILD_CREATE here, full mode would request them in chunks
+        state._chunk_guilds = False
+        # Set by READY on a live connection
+        state.user = discord.ClientUser(state=state, data={**user_payload(BOT_USER_ID), 'bot': True})
+
+        sm = app_context.manager_context.guild_state_manager
+        rng = random.Random(seed)
+        guild_ids = [GUILD_ID_BASE + i * 1_000 for i in range(guilds)]
+        guild_members = {
+            guild_id: range(MEMBER_ID_BASE + i * members, MEMBER_ID_BASE + (i + 1) * members)
+            for i, guild_id in enumerate(guild_ids)
+        }
+        guild_roles = {guild_id: [guild_id + 10 + r for r in range(3)] for guild_id in guild_ids}
+
+        await sm.register_guilds([GuildInfo(guild_id=GuildId(guild_id), name='') for guild_id in guild_ids])
+
+        for guild_id in guild_ids:
+            await sm.queue_configs.create_queues(GuildId(guild_id), [QueueCreationData('ctf', 10 ** 9, 2)])
+
+            for member_id in rng.sample(guild_members[guild_id], int(members * QUEUED_SHARE)):
+                sm.queue_players.join_queue(GuildId(guild_id), MemberId(member_id), 'ctf')
+
+        gc.collect()
+        rss_idle = current_rss_mib()
+        started_at = time.perf_counter()
+
+        for guild_id in guild_ids:
+            state.parse_guild_create(guild_payload(guild_id, guild_members[guild_id], guild_roles[guild_id]))
+            await asyncio.sleep(0)
+
+        hydration_seconds = time.perf_counter() - started_at
+        gc.collect()
+        rss_hydrated = current_rss_mib()
+
+        # The event stream, built up front so payload construction is not measured
+        intents = bot.intents
+        names = rng.choices(list(EVENT_MIX), weights=[weight for weight, _ in EVENT_MIX.values()], k=events)
+        delivered = [name for name in names if getattr(intents, EVENT_MIX[name][1])]
+        stream = []
+
+        for name in delivered:
+            guild_id = rng.choice(guild_ids)
+            stream.append((state.parsers[name], event_payload(
+                name, guild_id, rng.choice(guild_members[guild_id]), guild_roles[guild_id], rng
+            )))
+
+        cpu_started_at = time.process_time()
+        started_at = time.perf_counter()
+
+        for i, (parser, payload) in enumerate(stream):
+            parser(payload)
+
+            # Runs the dispatched handlers now and then, as the gateway reader yields between frames
+            if i % 500 == 0:
+                await asyncio.sleep(0)
+
+        while len(asyncio.all_tasks()) > 1:
+            await asyncio.sleep(0)
+
+        elapsed = time.perf_counter() - started_at
+        cpu = time.process_time() - cpu_started_at
+        tick = app_context.manager_context.queue_presence_manager.process_tick(time.monotonic())
+
+        del stream
+        gc.collect()
+        rss_after = current_rss_mib()
+
+        await app_context.engine.dispose()
+
+        return {
+            'mode': 'lean' if lean else 'full',
+            'intents': intents.value,
+            'discord_members': sum(len(guild._members) for guild in bot.guilds),
+            'rss_idle': rss_idle,
+            'rss_hydrated': rss_hydrated,
+            'rss_after': rss_after,
+            'hydration_seconds': hydration_seconds,
+            'offered': len(names),
+            'delivered': len(delivered),
+            'seconds': elapsed,
+            'cpu_seconds': cpu,
+            'presence_events': tick.events
+        }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--guilds', type=int, default=5)
+    parser.add_argument('--members', type=int, default=20_000, help='Members per guild')
+    parser.add_argument('--events', type=int, default=200_000, help='Offered gateway events')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--child', choices=('full', 'lean'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = asyncio.run(run_mode(args.child == 'lean', args.guilds, args.members, args.events, args.seed))
+        print(json.dumps(result))
+        return 0
+
+    results = []
+
+    for mode in ('full', 'lean'):
+        child = subprocess.run(
+            [sys.executable, '-m', 'scripts.bench_gateway_modes', '--child', mode, '--guilds', str(args.guilds),
+             '--members', str(args.members), '--events', str(args.events), '--seed', str(args.seed)],
+            capture_output=True, text=True
+        )
+
+        if child.returncode != 0:
+            print(child.stderr, file=sys.stderr)
+            return 1
+
+        results.append(json.loads(child.stdout.strip().splitlines()[-1]))
+
+    print(f'{args.guilds} guilds x {args.members} members, {args.events} offered events\n')
+    print(f'{"mode":<6}{"cached members":>16}{"RSS idle":>10}{"hydrated":>10}{"after":>10}{"hydrate s":>11}'
+          f'{"delivered":>11}{"events/s":>10}{"CPU s":>8}{"presences":>11}')
+
+    for r in results:
+        print(
+            f'{r["mode"]:<6}{r["discord_members"]:>16}{r["rss_idle"]:>10.1f}'
+            f'{r["rss_hydrated"]:>10.1f}{r["rss_after"]:>10.1f}{r["hydration_seconds"]:>11.2f}'
+            f'{r["delivered"]:>11}{r["delivered"] / r["seconds"]:>10.0f}{r["cpu_seconds"]:>8.2f}'
+            f'{r["presence_events"]:>11}'
+        )
+
+    full, lean = results
+    print(
+        f'\nlean: {lean["rss_hydrated"] - lean["rss_idle"]:.1f} MiB instead of '
+        f'{full["rss_hydrated"] - full["rss_idle"]:.1f} MiB for the hydrated guilds, '
+        f'{lean["delivered"] / full["delivered"]:.0%} of the events delivered, '
+        f'{lean["cpu_seconds"] / full["cpu_seconds"]:.0%} of the CPU time for the same traffic'
+    )
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Hydration read path benchmark, ORM entities vs column only Core selects.
+
+Usage (from the project root):
+    python -m scripts.bench_hydration --guilds 2000 --roles 10 --queues 20
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Awaitable, Callable
+
+from sqlalchemy import insert, select
+
+from core.app_context import setup
+from core.dto.queue_config import QueueConfig
+from db.init_tables import init_db
+from db.models.guild import Guild
+from db.models.guild_role_permission import GuildRolePermission
+from db.models.queue_config import QueueConfigModel
+from db.models.role_permission import RolePermission
+from domain.types import GuildId, RoleId
+
+COMMANDS = ['manage_queues', 'permission']
+
+
+async def seed(app_context, guilds: int, roles: int, queues: int) -> None:
+    async with app_context.engine.begin() as conn:
+        await conn.execute(insert(Guild), [
+            {'guild_id': g, 'name': f'guild-{g}', 'prefix': '!'} for g in range(guilds)
+        ])
+        await conn.execute(insert(GuildRolePermission), [
+            {'guild_id': g, 'role_id': r} for g in range(guilds) for r in range(roles)
+        ])
+        await conn.execute(insert(RolePermission), [
+            {'guild_id': g, 'role_id': r, 'permission_key': c}
+            for g in range(guilds) for r in range(roles) for c in COMMANDS
+        ])
+        await conn.execute(insert(QueueConfigModel), [
+            {'guild_id': g, 'name': f'queue{q}', 'player_count': 8, 'team_count': 2}
+            for g in range(guilds) for q in range(queues)
+        ])
+
+
+def orm_readers(sessionmaker):
+    """Reference implementation materialising full ORM entities."""
+    async def fetch_role_permissions(guild_id: GuildId) -> dict[RoleId, set[str]]:
+        async with sessionmaker() as session:
+            async with session.begin():
+                stmt = select(RolePermission).where(RolePermission.guild_id == guild_id)
+                fetched_roles: dict[RoleId, set[str]] = {}
+
+                for role_permission in (await session.execute(stmt)).scalars().all():
+                    fetched_roles.setdefault(RoleId(role_permission.role_id), set()).add(role_permission.permission_key)
+
+                return fetched_roles
+
+    async def fetch_queues(guild_id: GuildId) -> list[QueueConfig]:
+        async with sessionmaker() as session:
+            async with session.begin():
+                stmt = select(QueueConfigModel).where(QueueConfigModel.guild_id == guild_id)
+
+                return [
+                    QueueConfig(name=q.name, player_count=q.player_count, team_count=q.team_count)
+                    for q in (await session.execute(stmt)).scalars().all()
+                ]
+
+    return fetch_role_permissions, fetch_queues
+
+
+async def measure(
+        label: str,
+        guilds: int,
+        rows_per_guild: int,
+        fetch: Callable[[GuildId], Awaitable[object]]
+) -> None:
+    # Warm up statement caches and the connection pool
+    await fetch(GuildId(0))
+
+    start = time.perf_counter()
+    for guild_id in range(guilds):
+        await fetch(GuildId(guild_id))
+    elapsed = time.perf_counter() - start
+
+    # Allocation profile on a separate pass, tracemalloc skews timings
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [await fetch(GuildId(guild_id)) for guild_id in range(guilds)]
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    diff = after.compare_to(before, 'filename')
+    retained_blocks = sum(stat.count_diff for stat in diff if stat.count_diff > 0)
+    rows = guilds * rows_per_guild
+
+    print(
+        f'{label:<28} {rows / elapsed:>12,.0f} rows/s'
+        f' {retained_blocks / rows:>8.2f} retained allocs/row'
+        f' {peak / rows:>10,.1f} peak B/row'
+    )
+    del results
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--guilds', type=int, default=1000)
+    parser.add_argument('--roles', type=int, default=10)
+    parser.add_argument('--queues', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app_context = setup(f'sqlite+aiosqlite:///{os.path.join(tmp, "bench.db")}')
+        await init_db(engine=app_context.engine, gated_command_names=COMMANDS)
+        await seed(app_context, args.guilds, args.roles, args.queues)
+
+        repo_service = app_context.service_context.guild_repository_service
+        queue_service = app_context.service_context.guild_queue_service
+        orm_fetch_role_permissions, orm_fetch_queues = orm_readers(repo_service._sessionmaker)
+
+        role_rows = args.roles * len(COMMANDS)
+        await measure('role permissions (ORM)', args.guilds, role_rows, orm_fetch_role_permissions)
+        await measure('role permissions (Core)', args.guilds, role_rows, repo_service.fetch_guild_role_permissions)
+        await measure('queues (ORM)', args.guilds, args.queues, orm_fetch_queues)
+        await measure('queues (Core)', args.guilds, args.queues, queue_service.fetch_queues)
+
+        await app_context.engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Benchmark of the caller side cost of logging, the part paid on the event loop.
+
+Compares a direct stream handler with the queue handler while the sink is slow, e.g. a blocked stderr pipe.
+The queue run uses a small queue so records are dropped, the caller must never wait for the sink.
+
+Usage (from the project root):
+    python -m scripts.bench_logging --records 50000 --sink-delay-us 200
+"""
+import argparse
+import io
+import logging
+import time
+
+from core.log import JsonFormatter, DroppingQueueHandler, configure_logging
+
+logger = logging.getLogger('bench')
+
+
+class SlowSink(io.StringIO):
+    def __init__(self, delay: float) -> None:
+        super().__init__()
+        self._delay = delay
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        time.sleep(self._delay)
+        self.lines += 1
+        return len(text)
+
+
+def log_records(count: int) -> float:
+    """Worst caller side latency in microseconds, the mean is printed by the caller."""
+    worst = 0.0
+
+    for i in range(count):
+        start = time.perf_counter()
+        logger.info('command finished', extra={'guild_id': i % 100, 'command': 'queue join', 'latency_ms': 1.5})
+        worst = max(worst, time.perf_counter() - start)
+
+    return worst * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--records', type=int, default=50_000)
+    parser.add_argument('--sink-delay-us', type=float, default=200)
+    parser.add_argument('--queue-size', type=int, default=1_000)
+    args = parser.parse_args()
+
+    delay = args.sink_delay_us / 1e6
+    root = logging.getLogger()
+
+    # Direct, the caller formats and writes every record
+    direct_records = min(args.records, 2_000)
+    sink = SlowSink(delay)
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(JsonFormatter())
+    root.handlers[:] = [handler]
+    root.setLevel(logging.INFO)
+
+    start = time.perf_counter()
+    worst = log_records(direct_records)
+    elapsed = time.perf_counter() - start
+    print(f'direct           {elapsed / direct_records * 1e6:>9.1f} us/record, worst {worst:>9.1f} us')
+
+    # Queued, the listener formats and writes behind a bounded queue
+    for sampling in ({}, {logging.INFO: 10}):
+        listener = configure_logging(json_format=True, queue_size=args.queue_size, sample_every=sampling)
+        sink = SlowSink(delay)
+        listener.handlers[0].setStream(sink)  # type: ignore[attr-defined]
+        queue_handler = root.handlers[0]
+        assert isinstance(queue_handler, DroppingQueueHandler)
+
+        start = time.perf_counter()
+        worst = log_records(args.records)
+        elapsed = time.perf_counter() - start
+        listener.stop()
+
+        label = 'queued' if not sampling else 'queued, INFO/10'
+        print(
+            f'{label:<16} {elapsed / args.records * 1e6:>9.1f} us/record, worst {worst:>9.1f} us, '
+            f'written {sink.lines}, dropped {queue_handler.dropped}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Micro-benchmark of has_command_permission for members with many roles.
+
+Compares the compiled role bitmasks and the memoized per member masks against the previous per role set lookup.
+    - Walks stop at the first granting role, a denied gated command walks every role of the member
+    - A memo miss combines the masks of every role, the cost of the first check after a role or permission change
+    - Ungated commands return before any role is looked at, they only show the fixed overhead
+
+Usage (from the project root):
+    python -m scripts.bench_permission_check --member-roles 150 --elevated-roles 250
+"""
+import argparse
+import timeit
+from array import array
+from typing import Iterable
+
+from domain.guild_state import GuildState, GuildSettings
+from domain.types import GuildId, RoleId, MemberId
+from managers.guild_state_manager import GuildStateManager
+from managers.logic.permission import (
+    build_command_bits,
+    compile_role_permission_masks,
+    effective_command_mask,
+    has_command_permission,
+    mask_has_command_permission
+)
+
+COMMANDS = ['manage_queues', 'permission', 'queue', 'setup', 'stats', 'match', 'rating', 'ban']
+
+
+def set_lookup(state: GuildState, command_name: str, role_ids: Iterable[RoleId]) -> bool:
+    """Reference implementation, dict lookup plus set membership test per role."""
+    elevated_roles = state.role_command_permissions
+
+    for role_id in role_ids:
+        perms = elevated_roles.get(role_id)
+
+        if perms and command_name in perms:
+            return True
+
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--member-roles', type=int, default=150)
+    parser.add_argument('--elevated-roles', type=int, default=250)
+    parser.add_argument('--number', type=int, default=20_000)
+    args = parser.parse_args()
+
+    command_bits = build_command_bits(COMMANDS)
+
+    # Every elevated role holds two commands, 'ban' is held by the last role only
+    role_command_permissions = {
+        RoleId(role_id): {COMMANDS[role_id % 7], COMMANDS[(role_id + 1) % 7]}
+        for role_id in range(args.elevated_roles)
+    }
+    role_command_permissions[RoleId(args.elevated_roles - 1)].add('ban')
+
+    state = GuildState(
+        settings=GuildSettings(guild_id=GuildId(1), prefix='!'),
+        role_command_permissions=role_command_permissions,
+        role_permission_masks=compile_role_permission_masks(role_command_permissions, command_bits)
+    )
+
+    # Member roles, mostly unelevated with the matching role last, the worst case for both variants
+    member_roles = [RoleId(10_000 + i) for i in range(args.member_roles - 1)] + [RoleId(args.elevated_roles - 1)]
+
+    # Same layout discord.py keeps member roles in
+    member_role_array = array('Q', sorted(member_roles))
+
+    # Only the cache is used, services are never touched
+    sm = GuildStateManager(guild_repository_service=None, guild_queue_service=None)  # type: ignore[arg-type]
+    sm.set_gated_commands(COMMANDS)
+    sm._cache[GuildId(1)] = state
+
+    # The matching role holds 'stats', 'match' and 'ban', 'setup' is gated and held by other roles only
+    cases = {
+        'granted (last role)': 'ban',
+        'denied (gated)': 'setup',
+        'ungated': 'unknown',
+    }
+
+    for label, command_name in cases.items():
+        assert set_lookup(state, command_name, member_roles) == has_command_permission(
+            state, command_bits, command_name, member_roles, is_admin=False
+        )
+
+        set_time = timeit.timeit(lambda: set_lookup(state, command_name, member_roles), number=args.number)
+        mask_time = timeit.timeit(
+            lambda: has_command_permission(state, command_bits, command_name, member_roles, is_admin=False),
+            number=args.number
+        )
+        miss_time = timeit.timeit(
+            lambda: mask_has_command_permission(
+                command_bits, command_name, effective_command_mask(state, member_role_array), is_admin=False
+            ),
+            number=args.number
+        )
+        memo_time = timeit.timeit(
+            lambda: sm.permissions.has_command_permission(
+                guild_id=GuildId(1),
+                command_name=command_name,
+                member_id=MemberId(1),
+                role_ids=member_role_array,
+                is_admin=False
+            ),
+            number=args.number
+        )
+
+        print(
+            f'{label:<20} set lookup {set_time / args.number * 1e6:>7.2f} us'
+            f' | bitmask {mask_time / args.number * 1e6:>7.2f} us ({set_time / mask_time:>5.2f}x)'
+            f' | memo miss {miss_time / args.number * 1e6:>7.2f} us ({set_time / miss_time:>5.2f}x)'
+            f' | memoized {memo_time / args.number * 1e6:>7.2f} us ({set_time / memo_time:>5.2f}x)'
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Micro-benchmark suite of the pure planners in managers.logic, guards against quadratic regressions.
+
+Every benchmark runs on a small and a ten times larger synthetic guild. Two gates fail the run:
+    - Growth, time of the large input over the small one, linear code stays near 10x
+    - Regression against a stored baseline, in percent per benchmark
+
+Baselines are machine specific, save one before a change and compare after it.
+
+Usage (from the project root):
+    python -m scripts.bench_planners --save
+    python -m scripts.bench_planners --threshold 20
+    python -m scripts.bench_planners --filter permission --baseline .benchmarks/planners.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from core.dto.queue_config import QueueConfig
+from domain.guild_state import GuildState, GuildSettings, QueueState
+from domain.types import GuildId, RoleId
+from managers.logic.permission import (
+    _filter_role_permissions, plan_add_role_permissions, plan_remove_role_permissions
+)
+from managers.logic.queue_config import plan_create_queues, plan_remove_queues, QueueCreationData
+
+DEFAULT_BASELINE = os.path.join('.benchmarks', 'planners.json')
+
+SMALL = 100
+LARGE = SMALL * 10
+
+
+def make_state(queues: int, roles: int, commands: int) -> GuildState:
+    """Guild with queue0..queueN and roles holding every other command."""
+    command_names = make_commands(commands)
+
+    return GuildState(
+        settings=GuildSettings(guild_id=GuildId(1), prefix='!'),
+        role_command_permissions={
+            RoleId(r): set(command_names[r % 2::2]) for r in range(roles)
+        },
+        queues={
+            f'queue{q}': QueueState(queue_config=QueueConfig(name=f'queue{q}', player_count=8, team_count=2))
+            for q in range(queues)
+        }
+    )
+
+
+def make_commands(count: int) -> list[str]:
+    return [f'command{c}' for c in range(count)]
+
+
+def create_queues_input(size: int) -> tuple[tuple, dict]:
+    # Half of the requested queues are stored already
+    queues = [
+        QueueCreationData(name=f'Queue{q}', player_count=8, team_count=2)
+        for q in range(size // 2, size + size // 2)
+    ]
+
+    return (make_state(queues=size, roles=10, commands=10), queues), {}
+
+
+def remove_queues_input(size: int) -> tuple[tuple, dict]:
+    names = [f'queue{q}' for q in range(size // 2, size + size // 2)]
+    return (make_state(queues=size, roles=10, commands=10), names), {}
+
+
+def role_permissions_input(size: int) -> tuple[tuple, dict]:
+    commands = make_commands(size)
+
+    return (), {
+        'state': make_state(queues=10, roles=size, commands=size),
+        'role_id': RoleId(0),
+        'command_names': commands,
+        'valid_command_names': commands,
+    }
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    func: Callable[..., Any]
+    make_input: Callable[[int], tuple[tuple, dict]]
+
+
+BENCHMARKS = [
+    Benchmark('plan_create_queues', plan_create_queues, create_queues_input),
+    Benchmark('plan_remove_queues', plan_remove_queues, remove_queues_input),
+    Benchmark('plan_add_role_permissions', plan_add_role_permissions, role_permissions_input),
+    Benchmark('plan_remove_role_permissions', plan_remove_role_permissions, role_permissions_input),
+    Benchmark(
+        '_filter_role_permissions',
+        lambda **kwargs: _filter_role_permissions(intersection=False, **kwargs),
+        role_permissions_input
+    ),
+]
+
+
+def measure(benchmark: Benchmark, size: int, repeat: int) -> float:
+    """Best seconds per call out of repeat rounds, each round runs at least 0.2 seconds."""
+    args, kwargs = benchmark.make_input(size)
+    timer = timeit.Timer(lambda: benchmark.func(*args, **kwargs))
+
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save', action='store_true', help='Store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=25.0, help='Allowed slowdown against the baseline in percent')
+    parser.add_argument('--max-growth', type=float, default=30.0, help=f'Allowed time ratio of size {LARGE} over {SMALL}')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', default='', help='Only run benchmarks containing this substring')
+    args = parser.parse_args()
+
+    baseline: dict[str, float] = {}
+
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    results: dict[str, float] = {}
+    failures: list[str] = []
+
+    print(f'{"benchmark":<40}{"us/call":>12}{"baseline":>12}{"change":>9}{"growth":>9}')
+
+    for benchmark in BENCHMARKS:
+        if args.filter not in benchmark.name:
+            continue
+
+        for size in (SMALL, LARGE):
+            key = f'{benchmark.name}[{size}]'
+            results[key] = seconds = measure(benchmark, size, args.repeat)
+
+            baseline_seconds = baseline.get(key)
+            change = (seconds / baseline_seconds - 1) * 100 if baseline_seconds else None
+            growth = seconds / results[f'{benchmark.name}[{SMALL}]'] if size == LARGE else None
+
+            print(
+                f'{key:<40}{seconds * 1e6:>12.2f}'
+                f'{baseline_seconds * 1e6 if baseline_seconds else float("nan"):>12.2f}'
+                f'{f"{change:+.1f}%" if change is not None else "":>9}'
+                f'{f"{growth:.1f}x" if growth is not None else "":>9}'
+            )
+
+            if change is not None and change > args.threshold:
+                failures.append(f'{key} is {change:.1f}% slower than the baseline, allowed {args.threshold}%')
+
+            if growth is not None and growth > args.max_growth:
+                failures.append(
+                    f'{benchmark.name} takes {growth:.1f}x longer for {LARGE // SMALL}x the input, '
+                    f'allowed {args.max_growth}x'
+                )
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+
+        with open(args.baseline, 'w') as f:
+            json.dump({'python': platform.python_version(), 'results': results}, f, indent=2, sort_keys=True)
+
+        print(f'\nbaseline saved to {args.baseline}')
+
+    for failure in failures:
+        print(failure)
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
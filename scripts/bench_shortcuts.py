@@ -0,0 +1,169 @@
+"""
+Benchmark of +queue / -queue shortcut messages in the pickup channel, in messages per second.
+
+Parsing is compared against the previous per token slicing and exact name check, which neither folded case nor
+merged tokens. The dispatch run covers the whole message path, channel lookup, parsing, the locked join / leave
+mutation and the reply.
+
+Usage (from the project root):
+    python -m scripts.bench_shortcuts --queues 30 --messages 200000
+    python -m scripts.bench_shortcuts --min-rate 100000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from bot.message_dispatcher import MessageDispatcher
+from core.dto.queue_config import QueueConfig
+from domain.guild_state import GuildState, GuildSettings, QueueState
+from domain.types import GuildId
+from managers.guild_state_manager import GuildStateManager
+from managers.logic.queue_shortcuts import build_shortcut_lookup, parse_shortcuts
+
+GUILD_ID = GuildId(1)
+PICKUP_CHANNEL_ID = 10
+
+# Chat in the pickup channel starting like a shortcut
+CHAT = ['+1', '-_-', '+rep gg', '- no', '++ nice', '-1 that was close', '+ wp all', '--']
+
+
+def reference_parse(content: str, queues: dict) -> list[tuple[bool, str]]:
+    """Previous parsing, slices every token and checks the exact queue name."""
+    actions = []
+
+    for token in content.split():
+        queue_name = token[1:]
+
+        if token[0] not in '+-' or queue_name not in queues:
+            continue
+
+        actions.append((token[0] == '+', queue_name))
+
+    return actions
+
+
+def make_corpus(names: list[str], count: int, rng: random.Random) -> list[str]:
+    corpus = []
+
+    for _ in range(count):
+        roll = rng.random()
+
+        if roll < 0.35:
+            corpus.append(f'+{rng.choice(names)}')
+        elif roll < 0.50:
+            corpus.append(f'-{rng.choice(names)}')
+        elif roll < 0.55:
+            corpus.append(f'+{rng.choice(names).upper()}')
+        elif roll < 0.65:
+            a, b, c = rng.sample(names, 3)
+            corpus.append(f'+{a} +{b} -{c}')
+        elif roll < 0.70:
+            corpus.append(rng.choice(('++', '--')))
+        else:
+            corpus.append(rng.choice(CHAT))
+
+    return corpus
+
+
+class Channel:
+    def __init__(self) -> None:
+        self.id = PICKUP_CHANNEL_ID
+        self.sent = 0
+
+    async def send(self, content: str, **kwargs) -> None:
+        self.sent += 1
+
+
+async def run_dispatch(sm: GuildStateManager, corpus: list[str], members: int, rng: random.Random) -> tuple[float, int]:
+    async def process_commands(message) -> None:
+        pass
+
+    bot = SimpleNamespace(
+        command_prefix='!',
+        managers=SimpleNamespace(guild_state_manager=sm),
+        process_commands=process_commands,
+        on_queue_join=lambda guild_id, member_id: None
+    )
+    dispatcher = MessageDispatcher(bot)  # type: ignore[arg-type]
+
+    channel = Channel()
+    guild = SimpleNamespace(id=GUILD_ID)
+    authors = [SimpleNamespace(id=1000 + m, bot=False, mention=f'<@{1000 + m}>') for m in range(members)]
+    messages = [
+        SimpleNamespace(content=content, author=rng.choice(authors), guild=guild, channel=channel)
+        for content in corpus
+    ]
+
+    start = time.perf_counter()
+    for message in messages:
+        await dispatcher.dispatch(message)  # type: ignore[arg-type]
+    elapsed = time.perf_counter() - start
+
+    return elapsed, channel.sent
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--queues', type=int, default=30)
+    parser.add_argument('--members', type=int, default=2000)
+    parser.add_argument('--messages', type=int, default=200_000)
+    parser.add_argument('--min-rate', type=float, default=None, help='fail below this many dispatched messages/s')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    names = [f'{mode}{size}v{size}' for mode in ('ctf', 'tdm', 'duel', 'ca', 'ffa', 'ictf') for size in range(1, 9)]
+    names = names[:args.queues]
+
+    state = GuildState(
+        settings=GuildSettings(guild_id=GUILD_ID, prefix='!', pickup_channel_id=PICKUP_CHANNEL_ID),
+        queues={
+            name: QueueState(queue_config=QueueConfig(name=name, player_count=64, team_count=2))
+            for name in names
+        }
+    )
+
+    # Only the cache is used, services are never touched
+    sm = GuildStateManager(guild_repository_service=None, guild_queue_service=None)  # type: ignore[arg-type]
+    sm._cache[GUILD_ID] = state
+
+    corpus = make_corpus(names, args.messages, rng)
+
+    start = time.perf_counter()
+    for content in corpus:
+        reference_parse(content, state.queues)
+    reference_time = time.perf_counter() - start
+
+    lookup = build_shortcut_lookup(names)
+
+    start = time.perf_counter()
+    for content in corpus:
+        parse_shortcuts(content, lookup)
+    parse_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for content in corpus:
+        sm.queue_players.parse_shortcuts(GUILD_ID, content)
+    facade_time = time.perf_counter() - start
+
+    dispatch_time, replies = asyncio.run(run_dispatch(sm, corpus, args.members, rng))
+    dispatch_rate = len(corpus) / dispatch_time
+
+    print(f'{len(corpus)} messages, {len(names)} queues, {args.members} members')
+    print(f'reference parse    {len(corpus) / reference_time:>12,.0f} msg/s')
+    print(f'lookup parse       {len(corpus) / parse_time:>12,.0f} msg/s ({reference_time / parse_time:.1f}x)')
+    print(f'  through facade   {len(corpus) / facade_time:>12,.0f} msg/s')
+    print(f'dispatch + mutate  {dispatch_rate:>12,.0f} msg/s, {replies} replies')
+    print(f'queued players     {sum(len(queue.player_ids) for queue in state.queues.values())}')
+
+    if args.min_rate is not None and dispatch_rate < args.min_rate:
+        print(f'FAIL: {dispatch_rate:,.0f} msg/s below {args.min_rate:,.0f}', file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
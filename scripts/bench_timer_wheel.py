@@ -0,0 +1,126 @@
+"""
+Benchmark of the timer wheel behind prompt leases and queue expiry, with up to millions of timers.
+
+Schedules timers with delays spread over two hours, then advances the wheel one tick at a time until all of them
+fired. Reports the cost of scheduling, rescheduling and cancelling, the memory per timer and the per tick cost.
+A heap with lazy cancellation is measured as reference.
+
+Usage (from the project root):
+    python -m scripts.bench_timer_wheel --timers 1000000
+    python -m scripts.bench_timer_wheel --timers 200000 --max-delay 600 --slots 1024
+"""
+import argparse
+import heapq
+import random
+import time
+import tracemalloc
+
+from services.timer_wheel import TimerWheel
+
+
+def run_wheel(delays: list[float], max_delay: float, slots: int) -> None:
+    keys = [('queue_expiry', 1, member, 'ctf') for member in range(len(delays))]
+
+    # Memory of the wheel's entries, the keys exist anyway, e.g. in the queue's player set
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    wheel: TimerWheel[tuple] = TimerWheel(resolution=1.0, slots=slots, now=0.0)
+
+    for key, delay in zip(keys, delays):
+        wheel.schedule(key, delay, now=0.0)
+
+    memory = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    wheel = TimerWheel(resolution=1.0, slots=slots, now=0.0)
+
+    start = time.perf_counter()
+    for key, delay in zip(keys, delays):
+        wheel.schedule(key, delay, now=0.0)
+    schedule_time = time.perf_counter() - start
+
+    # Every tenth timer is rescheduled, e.g. a player rejoining, and every tenth cancelled, a player leaving
+    start = time.perf_counter()
+    for key, delay in zip(keys[::10], delays[::10]):
+        wheel.schedule(key, delay, now=0.0)
+    reschedule_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in keys[5::10]:
+        wheel.cancel(key)
+    cancel_time = time.perf_counter() - start
+
+    remaining = len(wheel)
+    fired = 0
+    worst_tick = 0.0
+
+    start = time.perf_counter()
+    for now in range(1, int(max_delay) + 2):
+        tick_start = time.perf_counter()
+        fired += len(wheel.advance(float(now)))
+        worst_tick = max(worst_tick, time.perf_counter() - tick_start)
+    advance_time = time.perf_counter() - start
+
+    ticks = int(max_delay) + 1
+    count = len(delays)
+
+    print(f'wheel ({slots} slots)')
+    print(f'  schedule    {schedule_time / count * 1e9:>8.0f} ns/timer')
+    print(f'  reschedule  {reschedule_time / len(keys[::10]) * 1e9:>8.0f} ns/timer')
+    print(f'  cancel      {cancel_time / len(keys[5::10]) * 1e9:>8.0f} ns/timer')
+    print(f'  memory      {memory / count:>8.0f} bytes/timer, keys excluded')
+    print(f'  ticks       {advance_time / ticks * 1e6:>8.1f} us/tick mean, {worst_tick * 1e3:.2f} ms worst, '
+          f'{advance_time / max(fired, 1) * 1e9:.0f} ns/fired timer')
+    print(f'  fired       {fired} of {remaining}')
+
+
+def run_heap(delays: list[float], max_delay: float) -> None:
+    keys = [('queue_expiry', 1, member, 'ctf') for member in range(len(delays))]
+    heap: list[tuple[float, int, tuple]] = []
+    generations: dict[tuple, int] = {}
+
+    start = time.perf_counter()
+    for key, delay in zip(keys, delays):
+        generations[key] = 0
+        heapq.heappush(heap, (delay, 0, key))
+    schedule_time = time.perf_counter() - start
+
+    # Cancelled entries stay in the heap until they surface
+    for key in keys[5::10]:
+        del generations[key]
+
+    fired = 0
+
+    start = time.perf_counter()
+    for now in range(1, int(max_delay) + 2):
+        while heap and heap[0][0] <= now:
+            _, generation, key = heapq.heappop(heap)
+
+            if generations.get(key) == generation:
+                del generations[key]
+                fired += 1
+    advance_time = time.perf_counter() - start
+
+    print('heap (reference)')
+    print(f'  schedule    {schedule_time / len(delays) * 1e9:>8.0f} ns/timer')
+    print(f'  ticks       {advance_time / (int(max_delay) + 1) * 1e6:>8.1f} us/tick mean, '
+          f'{advance_time / max(fired, 1) * 1e9:.0f} ns/fired timer')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--timers', type=int, default=1_000_000)
+    parser.add_argument('--max-delay', type=float, default=7200, help='Seconds, delays are uniform up to this')
+    parser.add_argument('--slots', type=int, default=8192)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    delays = [rng.uniform(1, args.max_delay) for _ in range(args.timers)]
+
+    print(f'{args.timers} timers over {args.max_delay:.0f} s, 1 s resolution')
+    run_wheel(delays, args.max_delay, args.slots)
+    run_heap(delays, args.max_delay)
+
+
+if __name__ == '__main__':
+    main()
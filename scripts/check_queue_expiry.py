@@ -0,0 +1,151 @@
+"""
+Checks the expiry of queued players at scale, hundreds of thousands of timers on the shared timer scheduler.
+
+Fills every queue of many guilds, with expiries spread over two hours, then advances the scheduler one tick at a
+time until every player expired. Each guild must get at most one announcement per tick, the scheduler and the
+player index must end up empty. Leaving, disabling the expiry, removing a queue and evicting a guild must cancel
+the timers of their players.
+
+Usage (from the project root):
+    python -m scripts.check_queue_expiry
+    python -m scripts.check_queue_expiry --guilds 5000 --queues 10 --players 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from core.app_context import setup
+from core.dto.guild_info import GuildInfo
+from db.init_tables import init_db
+from domain.queue_constants import QUEUE_EXPIRY_TIMER
+from domain.types import GuildId, MemberId
+from managers.logic.queue_config import QueueCreationData
+from managers.queue_presence_manager import QueueRemoval
+from scripts.check_statement_cache import COMMANDS
+
+MAX_EXPIRY = 7200
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--guilds', type=int, default=2000)
+    parser.add_argument('--queues', type=int, default=10, help='Queues per guild')
+    parser.add_argument('--players', type=int, default=16, help='Players per queue')
+    args = parser.parse_args()
+
+    failures: list[str] = []
+
+    def check(condition: bool, message: str) -> None:
+        print(f'{"ok  " if condition else "FAIL"} {message}')
+
+        if not condition:
+            failures.append(message)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app_context = setup(f'sqlite+aiosqlite:///{os.path.join(tmp, "expiry.db")}')
+        managers = app_context.manager_context
+        sm = managers.guild_state_manager
+        scheduler = managers.timer_scheduler
+
+        await init_db(engine=app_context.engine, gated_command_names=COMMANDS)
+
+        guild_ids = [GuildId(g) for g in range(1, args.guilds + 1)]
+        await sm.register_guilds([GuildInfo(guild_id=guild_id, name='guild') for guild_id in guild_ids])
+
+        for guild_id in guild_ids:
+            await sm.queue_configs.create_queues(guild_id, [
+                QueueCreationData(name=f'queue{q}', player_count=args.players, team_count=2) for q in range(args.queues)
+            ])
+
+            # Expiries spread over two hours, one per queue
+            for q in range(args.queues):
+                expire_after = 60 + (guild_id * args.queues + q) * 37 % (MAX_EXPIRY - 60)
+                await sm.queue_configs.set_queue_expiry(guild_id, f'queue{q}', expire_after)
+
+        # Join, traced, the memory includes the queue state and player index entries next to the timers
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        join_started_at = time.perf_counter()
+
+        for guild_id in guild_ids:
+            for q in range(args.queues):
+                for p in range(args.players):
+                    sm.queue_players.join_queue(guild_id, MemberId(q * args.players + p), f'queue{q}')
+
+        join_time = time.perf_counter() - join_started_at
+        total_memory = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+
+        timers = len(scheduler)
+        check(timers == args.guilds * args.queues * args.players, f'{timers} timers pending')
+        print(f'     join {join_time / timers * 1e6:.1f} us/player traced, {total_memory / timers:.0f} bytes/player')
+
+        # Cancellation paths, on the first guild
+        first = guild_ids[0]
+        sm.queue_players.leave_queue(first, MemberId(0), 'queue0')
+        check((QUEUE_EXPIRY_TIMER, first, MemberId(0), 'queue0') not in scheduler, 'leaving cancels the timer')
+
+        await sm.queue_configs.set_queue_expiry(first, 'queue1', None)
+        check(not any(
+            (QUEUE_EXPIRY_TIMER, first, MemberId(m), 'queue1') in scheduler for m in range(args.queues * args.players)
+        ), 'disabling the expiry cancels the timers of the queue')
+
+        await sm.queue_configs.apply_remove_queues(first, ['queue2'])
+        check(not any(
+            (QUEUE_EXPIRY_TIMER, first, MemberId(m), 'queue2') in scheduler for m in range(args.queues * args.players)
+        ), 'removing a queue cancels the timers of its players')
+
+        last = guild_ids[-1]
+        await sm.evict_guild_state(last)
+        check(not any(key[1] == last for key in scheduler._wheel._deadlines), 'evicting a guild cancels its timers')
+
+        expected = len(scheduler)
+
+        # Expire everything, tick by tick
+        announcements: list[dict[GuildId, list[QueueRemoval]]] = []
+
+        async def on_expired(removals: dict[GuildId, list[QueueRemoval]]) -> None:
+            announcements.append(removals)
+
+        managers.queue_expiry_manager.start(on_expired=on_expired)
+
+        # Ticks from the last join on, every deadline is within MAX_EXPIRY of it
+        started_at = time.monotonic()
+        fired = 0
+        worst_tick = 0.0
+        ticks_started_at = time.perf_counter()
+
+        for second in range(1, MAX_EXPIRY + 2):
+            tick_started_at = time.perf_counter()
+            fired += await scheduler.process_tick(started_at + second)
+            worst_tick = max(worst_tick, time.perf_counter() - tick_started_at)
+
+        elapsed = time.perf_counter() - ticks_started_at
+        removed = sum(
+            len(removal.queue_names) for batch in announcements for removals in batch.values() for removal in removals
+        )
+
+        print(f'     {fired} timers in {MAX_EXPIRY + 1} ticks, {elapsed / max(fired, 1) * 1e6:.1f} us/expired player, '
+              f'{worst_tick * 1e3:.2f} ms worst tick')
+        check(fired == expected and removed == expected, f'{removed} of {expected} players removed')
+        check(
+            len(scheduler) == 0 and len(sm._queue_players) == len(sm.get_guild_state(first).queues['queue1'].player_ids),
+            'scheduler empty, only players of the queue without expiry still queued'
+        )
+        check(all(
+            len({removal.member_id for removal in removals}) == len(removals)
+            for batch in announcements for removals in batch.values()
+        ), 'one removal per member, its queues merged')
+        print(f'     {sum(len(batch) for batch in announcements)} guild announcements in {len(announcements)} ticks')
+
+        await app_context.engine.dispose()
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,236 @@
+"""
+Checks the streaming queue import and export, bounded memory, loop responsiveness and a lossless round trip.
+
+Generates a file of queue and permission rows, including invalid and duplicate ones, and imports it into a guild
+while a ticker task measures the longest event loop stall. The file is read line by line like the attachment
+stream, the import holds one batch of it at a time, the traced peak also contains the cached permissions it adds.
+The guild is then exported and imported into a second guild with other role ids, nothing may get lost. Importing
+it without the permission command must create the queues and reject every permission row. An import whose
+download fails halfway must keep only the batches it wrote and report itself incomplete.
+
+Usage (from the project root):
+    python -m scripts.check_queue_import
+    python -m scripts.check_queue_import --rows 100000 --format ndjson --batch-size 1000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import AsyncIterator
+
+from sqlalchemy import func, select
+
+from core.app_context import setup
+from core.dto.guild_info import GuildInfo
+from db.init_tables import init_db
+from db.models.role_permission import RolePermission
+from domain.types import GuildId, RoleId
+from managers.logic.queue_transfer import PermissionRow, TransferFormat
+from managers.queue_transfer_manager import ImportSourceError, QueueTransferManager
+from scripts.check_statement_cache import COMMANDS
+
+SOURCE = GuildId(1)
+TARGET = GuildId(2)
+RESTRICTED = GuildId(3)
+INTERRUPTED = GuildId(4)
+
+
+def write_file(path: str, rows: int, transfer_format: TransferFormat) -> int:
+    """Writes rows with 40 valid queues, a few invalid and duplicate ones and permissions, returns the invalid rows."""
+    invalid = 0
+
+    with open(path, 'w') as fp:
+        if transfer_format == 'csv':
+            fp.write('kind,name,player_count,team_count,expire_after,role_id,role,permission\n')
+
+        for i in range(rows):
+            if i < 40:
+                record = ('queue', f'queue{i}', 8, 2, 3600 if i % 2 else None, None, None, None)
+            elif i < 45:
+                record = ('queue', f'queue{i}', 7, 2, None, None, None, None)  # Not divisible
+                invalid += 1
+            elif i < 50:
+                record = ('queue', 'queue0', 8, 2, None, None, None, None)  # Duplicate
+                invalid += 1
+            else:
+                role = (i - 50) // len(COMMANDS)
+                record = ('permission', None, None, None, None, 1000 + role, f'role{role}', COMMANDS[i % len(COMMANDS)])
+
+            kind, name, player_count, team_count, expire_after, role_id, role_name, permission = record
+
+            if transfer_format == 'csv':
+                fp.write(','.join('' if value is None else str(value) for value in record) + '\n')
+            elif kind == 'queue':
+                expiry = f',"expire_after":{expire_after}' if expire_after else ''
+                fp.write(f'{{"kind":"queue","name":"{name}","player_count":{player_count},"team_count":{team_count}{expiry}}}\n')
+            else:
+                fp.write(f'{{"kind":"permission","role_id":{role_id},"role":"{role_name}","permission":"{permission}"}}\n')
+
+    return invalid
+
+
+async def file_lines(path: str) -> AsyncIterator[str]:
+    with open(path) as fp:
+        for line in fp:
+            yield line
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--format', choices=('csv', 'ndjson'), default='csv')
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    failures: list[str] = []
+
+    def check(condition: bool, message: str) -> None:
+        print(f'{"ok  " if condition else "FAIL"} {message}')
+
+        if not condition:
+            failures.append(message)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app_context = setup(f'sqlite+aiosqlite:///{os.path.join(tmp, "import.db")}')
+        sm = app_context.manager_context.guild_state_manager
+        transfer = QueueTransferManager(sm, batch_size=args.batch_size)
+
+        await init_db(engine=app_context.engine, gated_command_names=COMMANDS)
+        sm.set_gated_commands(COMMANDS)
+
+        for guild_id in (SOURCE, TARGET, RESTRICTED, INTERRUPTED):
+            await sm.register_guild(GuildInfo(guild_id=guild_id, name='guild'))
+
+        path = os.path.join(tmp, f'import.{args.format}')
+        invalid = write_file(path, args.rows, args.format)
+        file_size = os.path.getsize(path)
+
+        # Roles of the source guild are matched by id
+        def source_role(row: PermissionRow) -> RoleId | None:
+            return row.role_id
+
+        # Event loop stalls while importing
+        worst_gap = 0.0
+        running = True
+
+        async def ticker() -> None:
+            nonlocal worst_gap
+            last = time.perf_counter()
+
+            while running:
+                await asyncio.sleep(0)
+                now = time.perf_counter()
+                worst_gap = max(worst_gap, now - last)
+                last = now
+
+        ticker_task = asyncio.create_task(ticker())
+
+        tracemalloc.start()
+        started_at = time.perf_counter()
+        result = await transfer.import_lines(SOURCE, file_lines(path), args.format, COMMANDS, source_role, True)
+        elapsed = time.perf_counter() - started_at
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        running = False
+        await ticker_task
+
+        print(f'     {result.rows} rows, {file_size / 2**20:.2f} MiB in {elapsed:.2f} s, '
+              f'{elapsed / max(result.rows, 1) * 1e6:.0f} us/row, traced peak {peak / 2**20:.2f} MiB, '
+              f'longest loop stall {worst_gap * 1e3:.1f} ms')
+
+        permission_rows = args.rows - 50
+        state = sm.get_guild_state(SOURCE)
+
+        check(result.rows == args.rows, f'{result.rows} rows read')
+        check(result.queues_created == 40 and len(state.queues) == 40, f'{result.queues_created} queues created')
+        check(result.error_count == invalid, f'{result.error_count} invalid or duplicate rows reported')
+        check(result.permissions_added == permission_rows, f'{result.permissions_added} permissions added')
+        check(sum(len(perms) for perms in state.role_command_permissions.values()) == permission_rows,
+              'cached permissions match')
+
+        async with app_context.engine.connect() as conn:
+            stored = await conn.scalar(
+                select(func.count()).select_from(RolePermission).where(RolePermission.guild_id == SOURCE)
+            )
+
+        check(stored == permission_rows, f'{stored} permissions stored')
+        check(state.queues['queue1'].queue_config.expire_after == 3600, 'queue expiry imported')
+
+        # Round trip, the target guild has the same role names under other ids
+        role_names = {role_id: f'role{role_id - 1000}' for role_id in state.role_command_permissions}
+        target_roles = {name: RoleId(role_id + 10_000) for role_id, name in role_names.items()}
+
+        def target_role(row: PermissionRow) -> RoleId | None:
+            return target_roles.get(row.role_name)
+
+        exported = list(transfer.export_lines(SOURCE, args.format, role_names))
+
+        async def exported_lines() -> AsyncIterator[str]:
+            for line in exported:
+                yield line
+
+        round_trip = await transfer.import_lines(TARGET, exported_lines(), args.format, COMMANDS, target_role, True)
+        reexported = list(transfer.export_lines(
+            TARGET, args.format, {role_id: name for name, role_id in target_roles.items()}
+        ))
+
+        check(round_trip.error_count == 0, 'round trip import without errors')
+        check(
+            len(reexported) == len(exported)
+            and sm.get_guild_state(TARGET).queues.keys() == state.queues.keys()
+            and sorted(map(len, sm.get_guild_state(TARGET).role_command_permissions.values()))
+            == sorted(map(len, state.role_command_permissions.values())),
+            'round trip keeps every queue and permission'
+        )
+
+        # Without the permission command, manage_queues alone must not grant anything
+        restricted = await transfer.import_lines(
+            RESTRICTED, exported_lines(), args.format, COMMANDS, target_role, False
+        )
+        restricted_state = sm.get_guild_state(RESTRICTED)
+
+        check(
+            restricted.permissions_added == 0 and not restricted_state.role_command_permissions
+            and restricted.error_count == permission_rows and restricted_state.queues.keys() == state.queues.keys(),
+            'import without the permission command rejects permission rows'
+        )
+
+        # The download fails halfway, e.g. a reset connection
+        async def interrupted_lines() -> AsyncIterator[str]:
+            for i, line in enumerate(exported):
+                if i == len(exported) // 2:
+                    raise ImportSourceError('connection reset')
+
+                yield line
+
+        interrupted = await transfer.import_lines(
+            INTERRUPTED, interrupted_lines(), args.format, COMMANDS, target_role, True
+        )
+        interrupted_state = sm.get_guild_state(INTERRUPTED)
+        cached = sum(len(perms) for perms in interrupted_state.role_command_permissions.values())
+
+        check(
+            interrupted.incomplete and interrupted.queues_created == 0 and not interrupted_state.queues
+            and interrupted.rows % args.batch_size == 0 and 0 < interrupted.permissions_added == cached,
+            f'interrupted import reports {interrupted.rows} rows and {interrupted.permissions_added} permissions written'
+        )
+
+        retried = await transfer.import_lines(INTERRUPTED, exported_lines(), args.format, COMMANDS, target_role, True)
+
+        check(
+            not retried.incomplete and retried.queues_created == 40
+            and interrupted.permissions_added + retried.permissions_added == permission_rows,
+            'retried import adds the rest'
+        )
+
+        await app_context.engine.dispose()
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,175 @@
+"""
+Offline stand-ins for the discord.py objects the cogs touch, used by the load test.
+
+Only what the cogs and views read is implemented, responses are recorded instead of sent.
+"""
+import itertools
+from array import array
+from types import SimpleNamespace
+from typing import Any
+
+import discord
+
+# Snowflakes are unique across all fake objects of a run
+_snowflakes = itertools.count(1_000_000)
+
+
+def next_snowflake() -> int:
+    return next(_snowflakes)
+
+
+class FakeRole:
+    def __init__(self, name: str) -> None:
+        self.id = next_snowflake()
+        self.name = name
+
+
+class FakeChannel:
+    def __init__(self, name: str) -> None:
+        self.id = next_snowflake()
+        self.name = name
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, name: str, roles: list[FakeRole], channels: list[FakeChannel]) -> None:
+        self.id = guild_id
+        self.name = name
+        self.shard_id = 0
+        self.roles = roles
+        self.channels = channels
+        self._roles_by_id = {role.id: role for role in roles}
+
+    def get_role(self, role_id: int) -> FakeRole | None:
+        return self._roles_by_id.get(role_id)
+
+
+class FakeMember(discord.Member):
+    """Passes the isinstance checks of the cogs, role ids live in the same sorted array discord.py uses."""
+
+    def __init__(self, guild: FakeGuild, roles: list[FakeRole], is_admin: bool) -> None:
+        self._fake_id = next_snowflake()
+        self._fake_roles = roles
+        self._fake_permissions = discord.Permissions(administrator=is_admin)
+        self.guild = guild  # type: ignore[misc]
+        self._roles = array('Q', sorted(role.id for role in roles))  # type: ignore[assignment]
+
+    @property
+    def id(self) -> int:  # type: ignore[override]
+        return self._fake_id
+
+    @property
+    def roles(self) -> list[FakeRole]:  # type: ignore[override]
+        return self._fake_roles
+
+    @property
+    def guild_permissions(self) -> discord.Permissions:  # type: ignore[override]
+        return self._fake_permissions
+
+    @property
+    def mention(self) -> str:  # type: ignore[override]
+        return f'<@{self._fake_id}>'
+
+    @property
+    def bot(self) -> bool:  # type: ignore[override]
+        return False
+
+    def __repr__(self) -> str:
+        return f'<FakeMember id={self._fake_id}>'
+
+
+class FakeResponse:
+    """Records InteractionResponse calls, the first response completes the interaction like on Discord."""
+
+    def __init__(self) -> None:
+        self.sent: list[dict[str, Any]] = []
+        self.choices: list[discord.app_commands.Choice] | None = None
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    def _respond(self, kind: str, **kwargs: Any) -> None:
+        if self._done:
+            raise discord.InteractionResponded(None)  # type: ignore[arg-type]
+
+        self._done = True
+        self.sent.append({'kind': kind, **kwargs})
+
+    async def send_message(self, content: str | None = None, **kwargs: Any) -> None:
+        self._respond('send_message', content=content, **kwargs)
+
+    async def edit_message(self, **kwargs: Any) -> None:
+        self._respond('edit_message', **kwargs)
+
+    async def defer(self, **kwargs: Any) -> None:
+        self._respond('defer', **kwargs)
+
+    async def autocomplete(self, choices: list[discord.app_commands.Choice]) -> None:
+        self._respond('autocomplete')
+        self.choices = choices
+
+
+class FakeMessage:
+    def __init__(self) -> None:
+        self.id = next_snowflake()
+        self.edits: list[dict[str, Any]] = []
+
+    async def edit(self, **kwargs: Any) -> 'FakeMessage':
+        self.edits.append(kwargs)
+        return self
+
+
+class FakeFollowup:
+    def __init__(self) -> None:
+        self.sent: list[dict[str, Any]] = []
+
+    async def send(self, content: str | None = None, **kwargs: Any) -> FakeMessage:
+        self.sent.append({'content': content, **kwargs})
+        return FakeMessage()
+
+
+class FakeInteraction(discord.Interaction):
+    """Slash command or autocomplete interaction of a member in a guild channel, passes the isinstance checks."""
+
+    def __init__(
+            self,
+            client: discord.Client,
+            guild: FakeGuild,
+            channel: FakeChannel,
+            user: FakeMember,
+            command: discord.app_commands.Command,
+            namespace: dict[str, Any] | None = None
+    ) -> None:
+        self.id = next_snowflake()
+        self._fake_client = client
+        self._fake_guild = guild
+        self.guild_id = guild.id
+        self.channel = channel  # type: ignore[assignment]
+        self.user = user
+        self.extras = {}
+        self.command_failed = False
+        self._original_response = FakeMessage()  # type: ignore[assignment]
+
+        # Cached slots behind the command, namespace, response and followup properties
+        self._cs_command = command
+        self._cs_namespace = SimpleNamespace(**(namespace or {}))
+        self._cs_response = FakeResponse()
+        self._cs_followup = FakeFollowup()
+
+    @property
+    def client(self) -> discord.Client:  # type: ignore[override]
+        return self._fake_client
+
+    @property
+    def guild(self) -> FakeGuild:  # type: ignore[override]
+        return self._fake_guild
+
+    @property
+    def channel_id(self) -> int:  # type: ignore[override]
+        return self.channel.id
+
+    async def original_response(self) -> FakeMessage:  # type: ignore[override]
+        return self._original_response  # type: ignore[return-value]
+
+    def __repr__(self) -> str:
+        return f'<FakeInteraction id={self.id} command={self.command.qualified_name!r}>'
@@ -0,0 +1,22 @@
+"""
+Local invalidation broker for multi process deployments without Postgres.
+
+Start it once per host, then run every bot process with INVALIDATION_URL=unix:///path/to/broker.sock
+
+Usage (from the project root):
+    python -m scripts.invalidation_broker /tmp/pugmaster-invalidation.sock
+"""
+import asyncio
+import sys
+
+from services.invalidation_channel import InvalidationBroker
+
+
+async def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else '/tmp/pugmaster-invalidation.sock'
+    print(f'Invalidation broker listening on {path}')
+
+    await InvalidationBroker(path).serve_forever()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+"""
+Schema reset of the database a check or benchmark runs against.
+
+The scripts start from an empty schema, a database that already holds tables is only dropped with
+--recreate-schema, never point them at production.
+"""
+import argparse
+import sys
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from db.base import Base
+
+
+def add_recreate_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        '--recreate-schema',
+        action='store_true',
+        help='Drop the tables of a database that already has them, the database is a scratch copy'
+    )
+
+
+async def reset_schema(engine: AsyncEngine, recreate: bool) -> bool:
+    """
+    Prepares a scratch database for init_db, False if the database is not empty and recreate is not set.
+        - An empty database is left as is, init_db creates the schema
+        - With recreate every table of the models is dropped, data of other tables is kept
+    """
+    async with engine.begin() as conn:
+        tables = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+
+        if tables and not recreate:
+            print(
+                f'{engine.url} already has tables ({", ".join(sorted(tables))}), '
+                f'pass --recreate-schema to drop them',
+                file=sys.stderr
+            )
+            return False
+
+        await conn.run_sync(Base.metadata.drop_all)
+
+    return True
@@ -0,0 +1,41 @@
+import time
+from collections import OrderedDict
+
+from domain.types import GuildId
+
+AutocompleteKey = tuple[GuildId, str, str]
+
+
+class AutocompleteCache:
+    """
+    Short lived cache of ranked autocomplete matches per (guild, field, input).
+        - Entries are bound to the NameIndex version they were computed from
+        - Bounded, the least recently used entry is dropped first
+    """
+
+    def __init__(self, ttl: float = 5.0, max_size: int = 4096) -> None:
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: OrderedDict[AutocompleteKey, tuple[float, int, list[tuple[str, str]]]] = OrderedDict()
+
+    def get(self, key: AutocompleteKey, version: int) -> list[tuple[str, str]] | None:
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        expires_at, entry_version, results = entry
+
+        if entry_version != version or expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return results
+
+    def set(self, key: AutocompleteKey, version: int, results: list[tuple[str, str]]) -> None:
+        self._entries[key] = (time.monotonic() + self._ttl, version, results)
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
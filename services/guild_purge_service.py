@@ -0,0 +1,109 @@
+from datetime import datetime
+from typing import Collection
+
+from sqlalchemy import Table, delete, select, bindparam, tuple_
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from sqlalchemy.sql.dml import Delete
+
+from core.dto.purge_chunk_result import PurgeChunkResult
+from db.dialect import insert_ignore, chunked
+from db.models.guild import Guild
+from db.models.guild_purge import GuildPurge
+from db.models.guild_role_permission import GuildRolePermission
+from db.models.queue_config import QueueConfigModel
+from db.models.role_permission import RolePermission
+from domain.types import GuildId
+
+_guilds = Guild.__table__
+_guild_purges = GuildPurge.__table__
+
+# Children first, the guild row goes last so its cascades find nothing left to delete
+_PURGED_TABLES: tuple[tuple[Table, tuple[str, ...]], ...] = (
+    (RolePermission.__table__, ('guild_id', 'role_id', 'permission_key')),
+    (GuildRolePermission.__table__, ('guild_id', 'role_id')),
+    (QueueConfigModel.__table__, ('id',)),
+)
+
+# Locks the purge row, a rejoin cancelling the purge waits for the running chunk
+_LOCK_DUE_PURGE = (
+    select(_guild_purges.c.guild_id)
+    .where(_guild_purges.c.guild_id == bindparam('guild_id'), _guild_purges.c.purge_after <= bindparam('now'))
+    .with_for_update()
+)
+
+_FETCH_DUE_PURGES = (
+    select(_guild_purges.c.guild_id)
+    .where(_guild_purges.c.purge_after <= bindparam('now'))
+    .order_by(_guild_purges.c.purge_after)
+    .limit(bindparam('limit'))
+)
+
+_DELETE_GUILD = delete(_guilds).where(_guilds.c.guild_id == bindparam('guild_id'))
+_DELETE_PURGE = delete(_guild_purges).where(_guild_purges.c.guild_id == bindparam('guild_id'))
+_CANCEL_PURGES = delete(_guild_purges).where(_guild_purges.c.guild_id.in_(bindparam('guild_ids', expanding=True)))
+
+
+def _delete_chunk(table: Table, key_columns: tuple[str, ...], chunk_size: int) -> Delete:
+    """Deletes up to chunk_size rows of a guild, selected by primary key."""
+    keys = [table.c[column] for column in key_columns]
+    chunk = select(*keys).where(table.c.guild_id == bindparam('guild_id')).limit(chunk_size)
+
+    key = tuple_(*keys) if len(keys) > 1 else keys[0]
+
+    return delete(table).where(key.in_(chunk))
+
+
+class GuildPurgeService:
+    def __init__(self, sessionmaker: async_sessionmaker[AsyncSession], chunk_size: int = 500):
+        self._sessionmaker = sessionmaker
+        self._delete_chunks = [_delete_chunk(table, keys, chunk_size) for table, keys in _PURGED_TABLES]
+
+    async def schedule(self, guild_id: GuildId, purge_after: datetime) -> None:
+        """Stores a pending purge, a purge already pending keeps its time."""
+        async with self._sessionmaker() as session:
+            async with session.begin():
+                conn = await session.connection()
+
+                await conn.execute(
+                    insert_ignore(conn.dialect, _guild_purges),
+                    {'guild_id': guild_id, 'purge_after': purge_after}
+                )
+
+    async def cancel(self, guild_ids: Collection[GuildId]) -> None:
+        """Drops pending purges, e.g. of guilds the bot rejoined, rows deleted by a started purge stay deleted."""
+        if not guild_ids:
+            return
+
+        async with self._sessionmaker() as session:
+            async with session.begin():
+                for chunk in chunked(list(guild_ids)):
+                    await session.execute(_CANCEL_PURGES, {'guild_ids': chunk})
+
+    async def fetch_due(self, now: datetime, limit: int = 100) -> list[GuildId]:
+        async with self._sessionmaker() as session:
+            async with session.begin():
+                rows = await session.execute(_FETCH_DUE_PURGES, {'now': now, 'limit': limit})
+                return [GuildId(guild_id) for guild_id in rows.scalars()]
+
+    async def purge_chunk(self, guild_id: GuildId, now: datetime) -> PurgeChunkResult:
+        """
+        Deletes one chunk of a guild's rows in its own transaction.
+            - Tables are emptied in order, a chunk never spans two tables
+            - Once every table is empty the guild row and the purge row are deleted together
+            - A purge cancelled or not yet due deletes nothing and is done
+        """
+        async with self._sessionmaker() as session:
+            async with session.begin():
+                if (await session.execute(_LOCK_DUE_PURGE, {'guild_id': guild_id, 'now': now})).first() is None:
+                    return PurgeChunkResult(deleted=0, done=True)
+
+                for delete_chunk in self._delete_chunks:
+                    deleted = (await session.execute(delete_chunk, {'guild_id': guild_id})).rowcount
+
+                    if deleted:
+                        return PurgeChunkResult(deleted=deleted, done=False)
+
+                deleted = (await session.execute(_DELETE_GUILD, {'guild_id': guild_id})).rowcount
+                await session.execute(_DELETE_PURGE, {'guild_id': guild_id})
+
+                return PurgeChunkResult(deleted=deleted, done=True)
@@ -1,15 +1,51 @@
 import asyncio
-from typing import cast, Collection, Iterable
+import logging
+from typing import Collection, Iterable, cast
 
-from sqlalchemy import insert, select, delete
+from sqlalchemy import insert, select, delete, update, bindparam, CursorResult
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 
 from core.dto.queue_config import QueueConfig
+from db.dialect import stream_partitions, chunked
 from db.models.queue_config import QueueConfigModel
 from domain.types import GuildId
 from managers.logic.queue_config import QueueCreationData
 
+logger = logging.getLogger(__name__)
+
+_queue_configs = QueueConfigModel.__table__
+
+_INSERT_QUEUES = insert(_queue_configs)
+
+_FETCH_QUEUES = select(
+    _queue_configs.c.name,
+    _queue_configs.c.player_count,
+    _queue_configs.c.team_count,
+    _queue_configs.c.expire_after
+).where(_queue_configs.c.guild_id == bindparam('guild_id'))
+
+_FETCH_GUILDS_QUEUES = select(
+    _queue_configs.c.guild_id,
+    _queue_configs.c.name,
+    _queue_configs.c.player_count,
+    _queue_configs.c.team_count,
+    _queue_configs.c.expire_after
+).where(_queue_configs.c.guild_id.in_(bindparam('guild_ids', expanding=True)))
+
+_UPDATE_QUEUE_EXPIRY = (
+    update(_queue_configs)
+    .where(
+        _queue_configs.c.guild_id == bindparam('b_guild_id'),
+        _queue_configs.c.name == bindparam('b_name')
+    )
+    .values(expire_after=bindparam('b_expire_after'))
+)
+
+_DELETE_QUEUES_BY_NAME = delete(_queue_configs).where(
+    _queue_configs.c.guild_id == bindparam('guild_id'),
+    _queue_configs.c.name.in_(bindparam('names', expanding=True))
+).returning(_queue_configs.c.name)
 
 class GuildQueueService:
     """Handles queue configuration and queue state on database level."""
@@ -26,63 +62,83 @@ class GuildQueueService:
         async with self._sessionmaker() as session:
             async with session.begin():
                 try:
-                    stmt = insert(QueueConfigModel).values(
+                    await session.execute(
+                        _INSERT_QUEUES,
                         [
                             {
                                 'guild_id': guild_id,
                                 'name': queue.name,
                                 'player_count': queue.player_count,
-                                'team_count': queue.team_count
+                                'team_count': queue.team_count,
+                                'expire_after': queue.expire_after
                             }
                             for queue in queues
-                        ],
+                        ]
                     )
-
-                    await session.execute(stmt)
                 except IntegrityError:
-                    # Todo: log it
+                    # Created concurrently by another process, the planner only checked this process' cache
+                    logger.warning('queue insert conflict', extra={
+                        'guild_id': guild_id,
+                        'queues': [queue.name for queue in queues]
+                    })
                     return []
 
         return [
-            QueueConfig(name=queue.name, player_count=queue.player_count, team_count=queue.team_count)
+            QueueConfig(
+                name=queue.name,
+                player_count=queue.player_count,
+                team_count=queue.team_count,
+                expire_after=queue.expire_after
+            )
             for queue in queues
         ]
 
     async def fetch_queues(self, guild_id: GuildId) -> list[QueueConfig]:
         """Fetches queue configurations for a guild"""
-        fetched_queues: list[QueueConfig] = []
+        async with self._sessionmaker() as session:
+            async with session.begin():
+                rows = (await session.execute(_FETCH_QUEUES, {'guild_id': guild_id})).tuples()
+
+                return [
+                    QueueConfig(name=name, player_count=player_count, team_count=team_count, expire_after=expire_after)
+                    for name, player_count, team_count, expire_after in rows
+                ]
+
+    async def fetch_guilds_queues(self, guild_ids: Collection[GuildId]) -> dict[GuildId, list[QueueConfig]]:
+        """Bulk variant of fetch_queues, streams the queue configurations of all given guilds."""
+        fetched_queues: dict[GuildId, list[QueueConfig]] = {}
 
         async with self._sessionmaker() as session:
             async with session.begin():
-                stmt = select(QueueConfigModel).where(QueueConfigModel.guild_id == guild_id)
-                queues: list[QueueConfigModel] = cast(list[QueueConfigModel], (await session.execute(stmt)).scalars().all())
-
-                for queue in queues:
-                    fetched_queues.append(
-                        QueueConfig(
-                            name=queue.name,
-                            player_count=queue.player_count,
-                            team_count=queue.team_count
-                        )
-                    )
+                conn = await session.connection()
 
-        return fetched_queues
+                for chunk in chunked(list(guild_ids)):
+                    async for rows in stream_partitions(conn, _FETCH_GUILDS_QUEUES, {'guild_ids': list(chunk)}):
+                        for guild_id, name, player_count, team_count, expire_after in rows:
+                            fetched_queues.setdefault(GuildId(guild_id), []).append(QueueConfig(
+                                name=name, player_count=player_count, team_count=team_count, expire_after=expire_after
+                            ))
 
-    async def remove_queues(self, guild_id: GuildId, queues: Iterable[str]) -> frozenset[str]:
-        """Remove queues from a guild"""
-        removed_queues: list[str] = []
+        return fetched_queues
 
+    async def update_queue_expiry(self, guild_id: GuildId, name: str, expire_after: int | None) -> bool:
+        """Sets the seconds until players of a queue are removed, None disables it. False if the queue is gone."""
         async with self._sessionmaker() as session:
             async with session.begin():
-                stmt = select(QueueConfigModel).where(
-                    QueueConfigModel.guild_id == guild_id,
-                    QueueConfigModel.name.in_(queues)
-                )
+                result = cast(CursorResult, await session.execute(
+                    _UPDATE_QUEUE_EXPIRY,
+                    {'b_guild_id': guild_id, 'b_name': name, 'b_expire_after': expire_after}
+                ))
 
-                db_queues = (await session.execute(stmt)).scalars().all()
+        return result.rowcount > 0
 
-                for queue in db_queues:
-                    removed_queues.append(queue.name)
-                    await session.delete(queue)
+    async def remove_queues(self, guild_id: GuildId, queues: Iterable[str]) -> frozenset[str]:
+        """Remove queues from a guild"""
+        async with self._sessionmaker() as session:
+            async with session.begin():
+                removed_queues = (await session.execute(
+                    _DELETE_QUEUES_BY_NAME,
+                    {'guild_id': guild_id, 'names': list(queues)}
+                )).scalars().all()
 
         return frozenset(removed_queues)
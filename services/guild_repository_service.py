@@ -1,12 +1,14 @@
 import asyncio
+import logging
 from typing import cast, Sequence, Collection
 
-from sqlalchemy import update, CursorResult, select, delete
+from sqlalchemy import update, CursorResult, select, delete, bindparam
 from sqlalchemy.engine.result import Result
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 
 from core.dto.guild_info import GuildInfo
+from db.dialect import insert_ignore, stream_partitions, chunked
 from db.models.guild import Guild
 from db.models.guild_role_permission import GuildRolePermission
 from db.models.role_permission import RolePermission
@@ -14,6 +16,54 @@ from domain.guild_state import GuildSettings
 from domain.types import GuildId, RoleId
 from services.guild_state_cache import GuildStateCache
 
+logger = logging.getLogger(__name__)
+
+_guilds = Guild.__table__
+_role_permissions = RolePermission.__table__
+_guild_role_permissions = GuildRolePermission.__table__
+
+# Rows per INSERT of a bulk import, bounds the statement and parameter size
+IMPORT_CHUNK_SIZE = 1000
+
+# Prebuilt statements, parameters are bound on execution so compiled SQL is always served from the cache
+_UPDATE_GUILD_CHANNELS = (
+    update(_guilds)
+    .where(_guilds.c.guild_id == bindparam('b_guild_id'))
+    .values(
+        pickup_channel_id=bindparam('b_pickup_channel_id'),
+        listen_channel_id=bindparam('b_listen_channel_id')
+    )
+)
+
+_DELETE_ROLE_PERMISSIONS = delete(_role_permissions).where(
+    _role_permissions.c.guild_id == bindparam('guild_id'),
+    _role_permissions.c.role_id == bindparam('role_id'),
+    _role_permissions.c.permission_key.in_(bindparam('command_names', expanding=True))
+).returning(_role_permissions.c.permission_key)
+
+_FETCH_GUILDS_SETTINGS = select(
+    _guilds.c.guild_id,
+    _guilds.c.prefix,
+    _guilds.c.pickup_channel_id,
+    _guilds.c.listen_channel_id
+).where(_guilds.c.guild_id.in_(bindparam('guild_ids', expanding=True)))
+
+_FETCH_GUILDS_ROLE_PERMISSIONS = select(
+    _role_permissions.c.guild_id,
+    _role_permissions.c.role_id,
+    _role_permissions.c.permission_key
+).where(_role_permissions.c.guild_id.in_(bindparam('guild_ids', expanding=True)))
+
+_FETCH_GUILD_ROLE_PERMISSIONS = select(
+    _role_permissions.c.role_id,
+    _role_permissions.c.permission_key
+).where(_role_permissions.c.guild_id == bindparam('guild_id'))
+
+_DELETE_ELEVATED_ROLES = delete(_guild_role_permissions).where(
+    _guild_role_permissions.c.guild_id == bindparam('guild_id'),
+    _guild_role_permissions.c.role_id.in_(bindparam('role_ids', expanding=True))
+)
+
 class GuildNotCachedError(RuntimeError):
     pass
 
@@ -41,19 +91,52 @@ class GuildRepositoryService:
                     pickup_channel_id=db_guild.pickup_channel_id
                 )
 
-    async def update_guild_settings(self, guild_settings: GuildSettings) -> bool:
+    async def fetch_guilds_settings(
+            self,
+            guild_infos: Collection[GuildInfo],
+            create_missing: bool = True
+    ) -> dict[GuildId, GuildSettings]:
+        """Bulk variant of fetch_guild_settings, stores guilds not present in the database yet if requested."""
+        fetched_settings: dict[GuildId, GuildSettings] = {}
+
         async with self._sessionmaker() as session:
             async with session.begin():
-                stmt = (
-                    update(Guild)
-                    .where(Guild.guild_id == guild_settings.guild_id)
-                    .values(
-                        pickup_channel_id=guild_settings.pickup_channel_id,
-                        listen_channel_id=guild_settings.listen_channel_id
+                conn = await session.connection()
+
+                for guild_ids in chunked([guild.guild_id for guild in guild_infos]):
+                    async for rows in stream_partitions(conn, _FETCH_GUILDS_SETTINGS, {'guild_ids': list(guild_ids)}):
+                        for guild_id, prefix, pickup_channel_id, listen_channel_id in rows:
+                            fetched_settings[GuildId(guild_id)] = GuildSettings(
+                                guild_id=GuildId(guild_id),
+                                prefix=prefix,
+                                pickup_channel_id=pickup_channel_id,
+                                listen_channel_id=listen_channel_id
+                            )
+
+                missing_guilds = [guild for guild in guild_infos if guild.guild_id not in fetched_settings]
+
+                if create_missing and missing_guilds:
+                    await conn.execute(
+                        insert_ignore(conn.dialect, _guilds),
+                        [{'guild_id': guild.guild_id, 'name': guild.name, 'prefix': '!'} for guild in missing_guilds]
                     )
-                )
 
-                result: Result = await session.execute(stmt)
+                    for guild in missing_guilds:
+                        fetched_settings[guild.guild_id] = GuildSettings(guild_id=guild.guild_id, prefix='!')
+
+        return fetched_settings
+
+    async def update_guild_settings(self, guild_settings: GuildSettings) -> bool:
+        async with self._sessionmaker() as session:
+            async with session.begin():
+                result: Result = await session.execute(
+                    _UPDATE_GUILD_CHANNELS,
+                    {
+                        'b_guild_id': guild_settings.guild_id,
+                        'b_pickup_channel_id': guild_settings.pickup_channel_id,
+                        'b_listen_channel_id': guild_settings.listen_channel_id
+                    }
+                )
                 cursor_result = cast(CursorResult, result)
 
                 # In case the dbms did not update any data, should not happen
@@ -85,8 +168,35 @@ class GuildRepositoryService:
                             permission_key=command
                         ))
             except IntegrityError:
-                # Not supposed to happen, TODO: Log it
-                pass
+                # Not supposed to happen, the planner filters granted permissions
+                logger.warning('role permission insert conflict', extra={
+                    'guild_id': guild_id,
+                    'role_id': role_id,
+                    'commands': list(command_names)
+                }, exc_info=True)
+
+    async def import_role_permissions(self, guild_id: GuildId, grants: dict[RoleId, Collection[str]]) -> None:
+        """
+        Bulk variant of add_role_permissions, one transaction for many roles.
+            - Rows are written with one executemany per chunk, rows granted already are skipped
+        """
+        async with self._sessionmaker() as session:
+            async with session.begin():
+                conn = await session.connection()
+
+                await conn.execute(
+                    insert_ignore(conn.dialect, _guild_role_permissions),
+                    [{'guild_id': guild_id, 'role_id': role_id} for role_id in grants]
+                )
+
+                rows = [
+                    {'guild_id': guild_id, 'role_id': role_id, 'permission_key': command_name}
+                    for role_id, command_names in grants.items()
+                    for command_name in command_names
+                ]
+
+                for chunk in chunked(rows, size=IMPORT_CHUNK_SIZE):
+                    await conn.execute(insert_ignore(conn.dialect, _role_permissions), list(chunk))
 
     async def remove_role_permissions(
             self,
@@ -95,40 +205,49 @@ class GuildRepositoryService:
             role_id: RoleId
     ) -> list[str]:
         """Removes permissions from a guild role on database level."""
-        removed_permissions: list[str] = []
-
         async with self._sessionmaker() as session:
             async with session.begin():
-                stmt = select(RolePermission).where(
-                    RolePermission.guild_id == guild_id,
-                    RolePermission.role_id == role_id,
-                    RolePermission.permission_key.in_(command_names)
-                )
-
-                role_permissions = (await session.execute(stmt)).scalars().all()
-
-                for role_permission in role_permissions:
-                    removed_permissions.append(role_permission.permission_key)
-                    await session.delete(role_permission)
+                removed_permissions = (await session.execute(
+                    _DELETE_ROLE_PERMISSIONS,
+                    {'guild_id': guild_id, 'role_id': role_id, 'command_names': list(command_names)}
+                )).scalars().all()
 
-        return removed_permissions
+        return list(removed_permissions)
 
     async def fetch_guild_role_permissions(self, guild_id: GuildId) -> dict[RoleId, set[str]]:
         """Fetches all elevated roles for a guild, used for caching."""
         async with self._sessionmaker() as session:
             async with session.begin():
-                stmt = select(RolePermission).where(
-                    RolePermission.guild_id == guild_id
-                )
-
+                # Column only Core select, rows are plain tuples without ORM identity overhead
+                rows = (await session.execute(_FETCH_GUILD_ROLE_PERMISSIONS, {'guild_id': guild_id})).tuples()
                 fetched_roles: dict[RoleId, set[str]] = {}
-                role_permissions: list[RolePermission] = (await session.execute(stmt)).scalars().all()
 
-                for role_permission in role_permissions:
-                    fetched_roles.setdefault(RoleId(role_permission.role_id), set()).add(role_permission.permission_key)
+                for role_id, permission_key in rows:
+                    fetched_roles.setdefault(RoleId(role_id), set()).add(permission_key)
 
                 return fetched_roles
 
+    async def fetch_guilds_role_permissions(
+            self,
+            guild_ids: Collection[GuildId]
+    ) -> dict[GuildId, dict[RoleId, set[str]]]:
+        """Bulk variant of fetch_guild_role_permissions, streams the rows of all given guilds."""
+        fetched_guilds: dict[GuildId, dict[RoleId, set[str]]] = {}
+
+        async with self._sessionmaker() as session:
+            async with session.begin():
+                conn = await session.connection()
+
+                for chunk in chunked(list(guild_ids)):
+                    async for rows in stream_partitions(conn, _FETCH_GUILDS_ROLE_PERMISSIONS, {'guild_ids': list(chunk)}):
+                        for guild_id, role_id, permission_key in rows:
+                            (fetched_guilds
+                             .setdefault(GuildId(guild_id), {})
+                             .setdefault(RoleId(role_id), set())
+                             .add(permission_key))
+
+        return fetched_guilds
+
     async def remove_elevated_roles(self, guild_id: GuildId, role_ids: Collection[RoleId]) -> None:
         """Removes elevated roles for a guild, usually used for stale roles."""
         if not role_ids:
@@ -137,9 +256,6 @@ class GuildRepositoryService:
         async with self._sessionmaker() as session:
             async with session.begin():
                 await session.execute(
-                    delete(GuildRolePermission)
-                    .where(
-                        GuildRolePermission.guild_id == guild_id,
-                        GuildRolePermission.role_id.in_(role_ids)
-                    )
+                    _DELETE_ELEVATED_ROLES,
+                    {'guild_id': guild_id, 'role_ids': list(role_ids)}
                 )
\ No newline at end of file
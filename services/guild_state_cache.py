@@ -15,6 +15,9 @@ class GuildStateCache:
     def __delitem__(self, guild_id: int) -> None:
         del self._guilds[guild_id]
 
+    def guild_ids(self) -> list[int]:
+        return list(self._guilds.keys())
+
     def update(self, items: Dict[int, GuildState]) -> None:
         for guild_id, guild_settings in items.items():
             self._guilds[guild_id] = guild_settings
\ No newline at end of file
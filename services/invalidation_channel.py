@@ -0,0 +1,309 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncConnection
+
+from core.dto.invalidation_event import InvalidationEvent
+from domain.guild_state import GuildStateField
+from domain.types import GuildId
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[InvalidationEvent], Awaitable[None]]
+ResyncHandler = Callable[[], Awaitable[None]]
+
+_NOTIFY = text('SELECT pg_notify(:channel, :payload)')
+
+# Line of the unix socket protocol asking every other client to resync, sent after a client reconnected
+_RESYNC_PREFIX = b'{"resync":'
+
+def _resync_line(origin: str) -> bytes:
+    return json.dumps({'resync': origin}, separators=(',', ':')).encode() + b'\n'
+
+
+class InvalidationChannel:
+    """
+    Propagates guild state mutations between processes sharing one database.
+        - Default implementation is a no-op, used for single process deployments
+        - publish never blocks, events are sent in the background
+        - on_resync is called whenever events could have been missed, e.g. after a reconnect
+    """
+
+    def __init__(self) -> None:
+        self.origin = uuid.uuid4().hex
+        self._tasks: set[asyncio.Task] = set()
+
+    async def start(self, on_event: EventHandler, on_resync: ResyncHandler) -> None:
+        pass
+
+    def publish(self, event: InvalidationEvent) -> None:
+        pass
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+    def _spawn(self, coro: Awaitable) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._on_task_done)
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+
+        if not task.cancelled() and task.exception() is not None:
+            logger.error('invalidation task failed', exc_info=task.exception())
+
+
+class PostgresNotifyChannel(InvalidationChannel):
+    """Postgres LISTEN/NOTIFY based channel, requires the asyncpg driver."""
+
+    def __init__(self, engine: AsyncEngine, channel: str = 'guild_state_invalidation') -> None:
+        super().__init__()
+        self._engine = engine
+        self._channel = channel
+        self._outbox: asyncio.Queue[InvalidationEvent] = asyncio.Queue()
+        self._listen_conn: AsyncConnection | None = None
+        self._on_event: EventHandler | None = None
+        self._on_resync: ResyncHandler | None = None
+        self._closed = False
+
+    async def start(self, on_event: EventHandler, on_resync: ResyncHandler) -> None:
+        self._on_event = on_event
+        self._on_resync = on_resync
+
+        await self._listen()
+        self._spawn(self._send_loop())
+
+    def publish(self, event: InvalidationEvent) -> None:
+        self._outbox.put_nowait(event)
+
+    async def close(self) -> None:
+        self._closed = True
+        await super().close()
+
+        if self._listen_conn is not None:
+            await self._listen_conn.close()
+
+    async def _listen(self) -> None:
+        self._listen_conn = await self._engine.connect()
+        raw_connection = await self._listen_conn.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+
+        await driver_connection.add_listener(self._channel, self._on_notify)
+        driver_connection.add_termination_listener(self._on_termination)
+
+    def _on_termination(self, connection) -> None:
+        if not self._closed:
+            self._spawn(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = 1.0
+
+        while True:
+            try:
+                await self._listen()
+                break
+            except (OSError, DBAPIError):
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+        # Notifications sent while disconnected are lost
+        await self._on_resync()
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        event = InvalidationEvent.from_json(payload)
+
+        if event.origin != self.origin:
+            self._spawn(self._on_event(event))
+
+    async def _send_loop(self) -> None:
+        while True:
+            events = [await self._outbox.get()]
+
+            # Everything queued in the meantime goes out in the same transaction
+            while not self._outbox.empty():
+                events.append(self._outbox.get_nowait())
+
+            params = [{'channel': self._channel, 'payload': event.to_json()} for event in events]
+            delay = 1.0
+
+            while True:
+                try:
+                    async with self._engine.begin() as conn:
+                        await conn.execute(_NOTIFY, params)
+                    break
+                except (OSError, DBAPIError):
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 30.0)
+
+
+class UnixSocketInvalidationChannel(InvalidationChannel):
+    """
+    Client of an InvalidationBroker, stand-in for deployments without Postgres.
+        - Pending events are keyed by (guild, field) and keep the highest version, memory is bounded by the keys
+        - A send loop writes them and waits for the socket to drain, events of a failed write are queued again
+        - After a reconnect a resync marker goes out first, events written before the drop might not have arrived
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self._path = path
+        self._writer: asyncio.StreamWriter | None = None
+        self._pending: dict[tuple[GuildId, GuildStateField], InvalidationEvent] = {}
+        self._send_wakeup = asyncio.Event()
+        self._resync_pending = False
+
+    async def start(self, on_event: EventHandler, on_resync: ResyncHandler) -> None:
+        reader, self._writer = await asyncio.open_unix_connection(self._path)
+        self._spawn(self._read_loop(reader, on_event, on_resync))
+        self._spawn(self._send_loop())
+
+    def publish(self, event: InvalidationEvent) -> None:
+        key = (event.guild_id, event.field)
+        pending = self._pending.get(key)
+
+        if pending is None or pending.version < event.version:
+            self._pending[key] = event
+
+        self._send_wakeup.set()
+
+    async def _send_loop(self) -> None:
+        while True:
+            await self._send_wakeup.wait()
+            self._send_wakeup.clear()
+
+            writer = self._writer
+
+            # Flushed once reconnected
+            if writer is None or writer.is_closing() or not (self._pending or self._resync_pending):
+                continue
+
+            events, self._pending = self._pending, {}
+            resync, self._resync_pending = self._resync_pending, False
+
+            lines = [_resync_line(self.origin)] if resync else []
+            lines.extend(event.to_json().encode() + b'\n' for event in events.values())
+
+            try:
+                writer.write(b''.join(lines))
+                await writer.drain()
+            except ConnectionError:
+                # Sent again after the read loop reconnected, receivers skip versions they already have
+                self._resync_pending |= resync
+
+                for event in events.values():
+                    self.publish(event)
+
+    async def close(self) -> None:
+        await super().close()
+
+        if self._writer is not None:
+            self._writer.close()
+
+    async def _read_loop(self, reader: asyncio.StreamReader, on_event: EventHandler, on_resync: ResyncHandler) -> None:
+        while True:
+            try:
+                line = await reader.readline()
+            except ConnectionError:
+                line = b''
+
+            if not line:
+                reader = await self._reconnect()
+                await on_resync()
+                continue
+
+            if line.startswith(_RESYNC_PREFIX):
+                if json.loads(line)['resync'] != self.origin:
+                    await on_resync()
+
+                continue
+
+            event = InvalidationEvent.from_json(line)
+
+            if event.origin != self.origin:
+                self._spawn(on_event(event))
+
+    async def _reconnect(self) -> asyncio.StreamReader:
+        self._writer = None
+        delay = 0.5
+
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self._path)
+                break
+            except OSError:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+        self._writer = writer
+        self._resync_pending = True
+        self._send_wakeup.set()
+
+        return reader
+
+
+class InvalidationBroker:
+    """
+    Fans out newline delimited invalidation events between UnixSocketInvalidationChannel clients.
+        - Clients whose unsent output exceeds MAX_CLIENT_BUFFER are disconnected, their reconnect resyncs them
+    """
+
+    MAX_CLIENT_BUFFER = 2**20
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._server: asyncio.Server | None = None
+
+    async def serve_forever(self) -> None:
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self._path)
+
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients.add(writer)
+
+        try:
+            while line := await reader.readline():
+                for client in list(self._clients):
+                    if client is writer or client.is_closing():
+                        continue
+
+                    if client.transport.get_write_buffer_size() > self.MAX_CLIENT_BUFFER:
+                        logger.warning('slow invalidation client disconnected')
+                        self._clients.discard(client)
+                        client.close()
+                        continue
+
+                    client.write(line)
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+
+def create_invalidation_channel(url: str | None, engine: AsyncEngine) -> InvalidationChannel:
+    """Creates the channel for INVALIDATION_URL: unset, 'postgres' or 'unix:///path/to/broker.sock'."""
+    if not url:
+        return InvalidationChannel()
+
+    if url == 'postgres':
+        if engine.dialect.driver != 'asyncpg':
+            raise RuntimeError('Postgres invalidation requires the asyncpg driver')
+
+        return PostgresNotifyChannel(engine)
+
+    if url.startswith('unix://'):
+        return UnixSocketInvalidationChannel(url.removeprefix('unix://'))
+
+    raise RuntimeError(f'Unsupported INVALIDATION_URL {url}')
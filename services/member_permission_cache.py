@@ -0,0 +1,60 @@
+from array import array
+from collections import OrderedDict
+from typing import Iterable
+
+from domain.types import GuildId, MemberId, RoleId
+
+
+def role_fingerprint(role_ids: Iterable[RoleId]) -> int:
+    """Hash of a member's role set, discord.py keeps member roles in a sorted array."""
+    if isinstance(role_ids, array):
+        return hash(role_ids.tobytes())
+
+    return hash(tuple(sorted(role_ids)))
+
+
+class MemberPermissionCache:
+    """
+    Bounded LRU memo of effective command masks per guild member.
+        - Entries are only valid for the role fingerprint they were computed for
+        - Invalidating a guild bumps its generation instead of scanning the entries
+    """
+
+    def __init__(self, max_size: int = 10_000) -> None:
+        self._max_size = max_size
+        self._entries: OrderedDict[tuple[GuildId, MemberId], tuple[int, int, int]] = OrderedDict()
+        self._generations: dict[GuildId, int] = {}
+
+    def get(self, guild_id: GuildId, member_id: MemberId, fingerprint: int) -> int | None:
+        key = (guild_id, member_id)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        entry_fingerprint, generation, mask = entry
+
+        if entry_fingerprint != fingerprint or generation != self._generations.get(guild_id, 0):
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return mask
+
+    def set(self, guild_id: GuildId, member_id: MemberId, fingerprint: int, mask: int) -> None:
+        key = (guild_id, member_id)
+
+        self._entries[key] = (fingerprint, self._generations.get(guild_id, 0), mask)
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_member(self, guild_id: GuildId, member_id: MemberId) -> None:
+        self._entries.pop((guild_id, member_id), None)
+
+    def invalidate_guild(self, guild_id: GuildId) -> None:
+        self._generations[guild_id] = self._generations.get(guild_id, 0) + 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,75 @@
+import itertools
+from bisect import bisect_left
+from typing import Iterable
+
+# Versions are unique across indexes, a rebuilt index never matches results cached for its predecessor
+_versions = itertools.count(1)
+
+
+class NameIndex:
+    """
+    Case-insensitive prefix/substring index over a set of names, used for autocomplete.
+        - Names are kept sorted by their lowercase form, prefix matches are a bisect away
+        - Substring matches scan the precomputed lowercase names
+        - version changes with every mutation
+    """
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self._entries: list[tuple[str, str]] = sorted({(name.lower(), name) for name in names})
+        self.version = next(_versions)
+
+    def add(self, name: str) -> None:
+        entry = (name.lower(), name)
+        i = bisect_left(self._entries, entry)
+
+        if i < len(self._entries) and self._entries[i] == entry:
+            return
+
+        self._entries.insert(i, entry)
+        self.version = next(_versions)
+
+    def remove(self, name: str) -> None:
+        entry = (name.lower(), name)
+        i = bisect_left(self._entries, entry)
+
+        if i < len(self._entries) and self._entries[i] == entry:
+            del self._entries[i]
+            self.version = next(_versions)
+
+    def update(self, added: Iterable[str], removed: Iterable[str]) -> None:
+        for name in removed:
+            self.remove(name)
+
+        for name in added:
+            self.add(name)
+
+    def search(self, current_lc: str, limit: int | None = None) -> list[tuple[str, str]]:
+        """(lowercase, name) pairs containing current_lc, prefix matches first, each group sorted."""
+        entries = self._entries
+        results: list[tuple[str, str]] = []
+
+        for i in range(bisect_left(entries, (current_lc,)), len(entries)):
+            entry = entries[i]
+
+            if not entry[0].startswith(current_lc):
+                break
+
+            results.append(entry)
+
+            if limit is not None and len(results) >= limit:
+                return results
+
+        if not current_lc:
+            return results
+
+        for entry in entries:
+            if current_lc in entry[0] and not entry[0].startswith(current_lc):
+                results.append(entry)
+
+                if limit is not None and len(results) >= limit:
+                    break
+
+        return results
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,57 @@
+from typing import Iterable
+
+from domain.types import GuildId, MemberId
+
+
+class QueuePlayerIndex:
+    """
+    Queues of every queued member per guild, the inverse of QueueState.player_ids.
+        - Members are looked up by id, removing a member from all queues never scans the queues
+        - Members without queues have no entry, membership doubles as the "is queued" check
+    """
+
+    def __init__(self) -> None:
+        self._guilds: dict[GuildId, dict[MemberId, set[str]]] = {}
+
+    def add(self, guild_id: GuildId, member_id: MemberId, queue_name: str) -> None:
+        self._guilds.setdefault(guild_id, {}).setdefault(member_id, set()).add(queue_name)
+
+    def discard(self, guild_id: GuildId, member_id: MemberId, queue_name: str) -> None:
+        members = self._guilds.get(guild_id)
+
+        if members is None:
+            return
+
+        queue_names = members.get(member_id)
+
+        if queue_names is None:
+            return
+
+        queue_names.discard(queue_name)
+
+        if not queue_names:
+            del members[member_id]
+
+    def pop_member(self, guild_id: GuildId, member_id: MemberId) -> set[str]:
+        """Queues of the member, the member is dropped from the index."""
+        members = self._guilds.get(guild_id)
+        return members.pop(member_id, set()) if members is not None else set()
+
+    def queues(self, guild_id: GuildId, member_id: MemberId) -> frozenset[str]:
+        members = self._guilds.get(guild_id)
+        return frozenset(members.get(member_id, ())) if members is not None else frozenset()
+
+    def is_queued(self, guild_id: GuildId, member_id: MemberId) -> bool:
+        members = self._guilds.get(guild_id)
+        return members is not None and member_id in members
+
+    def drop_queue(self, guild_id: GuildId, queue_name: str, player_ids: Iterable[MemberId]) -> None:
+        """Removes a deleted queue from the entries of its players."""
+        for member_id in player_ids:
+            self.discard(guild_id, member_id, queue_name)
+
+    def drop_guild(self, guild_id: GuildId) -> None:
+        self._guilds.pop(guild_id, None)
+
+    def __len__(self) -> int:
+        return sum(len(members) for members in self._guilds.values())
@@ -0,0 +1,80 @@
+import math
+import time
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+
+
+class TimerWheel(Generic[K]):
+    """
+    Hashed timing wheel on the monotonic clock, timers are keys with a deadline.
+        - Deadlines are ticks of `resolution` seconds rounded up, timers never fire early
+        - A timer lives in the slot of its deadline tick, advancing visits each passed tick's slot once
+        - Timers longer than one revolution (slots * resolution) stay in their slot and are skipped until due
+        - schedule, reschedule and cancel are O(1), memory is two dict entries per timer
+    """
+
+    def __init__(self, resolution: float = 1.0, slots: int = 8192, now: float | None = None) -> None:
+        self._resolution = resolution
+        self._slots: list[dict[K, int]] = [{} for _ in range(slots)]
+        self._deadlines: dict[K, int] = {}
+
+        # Last processed tick
+        self._tick = math.floor((time.monotonic() if now is None else now) / resolution)
+
+    def schedule(self, key: K, delay: float, now: float | None = None) -> None:
+        """Starts a timer, a running timer of the same key is replaced."""
+        now = time.monotonic() if now is None else now
+        tick = max(math.ceil((now + delay) / self._resolution), self._tick + 1)
+        slots = self._slots
+
+        previous = self._deadlines.get(key)
+
+        if previous is not None:
+            del slots[previous % len(slots)][key]
+
+        self._deadlines[key] = tick
+        slots[tick % len(slots)][key] = tick
+
+    def cancel(self, key: K) -> bool:
+        tick = self._deadlines.pop(key, None)
+
+        if tick is None:
+            return False
+
+        del self._slots[tick % len(self._slots)][key]
+        return True
+
+    def advance(self, now: float | None = None) -> list[K]:
+        """Removes and returns the timers due until now, in deadline order across slots."""
+        target = math.floor((time.monotonic() if now is None else now) / self._resolution)
+
+        if target <= self._tick:
+            return []
+
+        slot_count = len(self._slots)
+        expired: list[K] = []
+
+        # Every slot is visited at most once, a gap longer than a revolution visits all of them
+        for tick in range(max(self._tick + 1, target - slot_count + 1), target + 1):
+            slot = self._slots[tick % slot_count]
+
+            if not slot:
+                continue
+
+            due = [key for key, deadline in slot.items() if deadline <= target]
+
+            for key in due:
+                del slot[key]
+                del self._deadlines[key]
+
+            expired.extend(due)
+
+        self._tick = target
+        return expired
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._deadlines
+
+    def __len__(self) -> int:
+        return len(self._deadlines)